@@ -0,0 +1,118 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.seed import base_price
+
+# The note Alpha Vantage answers with, HTTP 200, once a key is over its limit
+RATE_LIMIT_NOTE = (
+    "Thank you for using Alpha Vantage! Our standard API rate limit is "
+    "25 requests per day. Please subscribe to any of the premium plans to "
+    "instantly remove all daily rate limits."
+)
+
+
+class FakeQuoteServer:
+    """
+    Local stand-in for the Alpha Vantage GLOBAL_QUOTE endpoint.
+
+    Every response is delayed by latency_second plus up to jitter_second.
+    After limit_after quotes, and for a random limited_share of the ones
+    before, it answers with the "Information" rate-limit note that
+    `is_limited` detects instead of a quote.
+    """
+
+    def __init__(
+        self,
+        latency_second=0.05,
+        jitter_second=0.0,
+        limit_after=None,
+        limited_share=0.0,
+        seed=0,
+    ):
+        self.latency_second = latency_second
+        self.jitter_second = jitter_second
+        self.limit_after = limit_after
+        self.limited_share = limited_share
+        self.requests = 0
+        self.limited = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/query"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-quote-server", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self):
+        return {
+            "latency_second": self.latency_second,
+            "jitter_second": self.jitter_second,
+            "limit_after": self.limit_after,
+            "limited_share": self.limited_share,
+            "requests": self.requests,
+            "limited": self.limited,
+        }
+
+    def respond(self, params):
+        """Return the JSON body answering the query params, and wait the latency."""
+        with self._lock:
+            self.requests += 1
+            over_limit = (
+                self.limit_after is not None and self.requests > self.limit_after
+            ) or self._rng.random() < self.limited_share
+            if over_limit:
+                self.limited += 1
+            delay = self.latency_second + self._rng.uniform(0, self.jitter_second)
+
+        time.sleep(delay)
+        if over_limit:
+            return {"Information": RATE_LIMIT_NOTE}
+
+        symbol = params.get("symbol", [""])[0].upper()
+        if params.get("function", [""])[0] != "GLOBAL_QUOTE" or not symbol:
+            return {"Error Message": "Invalid API call."}
+        return {
+            "Global Quote": {
+                "01. symbol": symbol,
+                "05. price": f"{base_price(symbol):.4f}",
+            }
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(server.respond(parse_qs(urlparse(self.path).query)))
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,224 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+import requests
+from werkzeug.serving import make_server
+
+from benchmarks.seed import PASSWORD, USERNAME_FORMAT, symbol_universe
+
+ROUTE_HOME = "/home"
+ROUTE_BUY = "/buy"
+ROUTE_SELL = "/sell"
+ROUTE_QUOTE = "/quote"
+ROUTE_HISTORY = "/history"
+
+# Share of the requests sent to each route, roughly a browsing session
+DEFAULT_MIX = {
+    ROUTE_HOME: 40,
+    ROUTE_QUOTE: 20,
+    ROUTE_HISTORY: 15,
+    ROUTE_BUY: 15,
+    ROUTE_SELL: 10,
+}
+PERCENTILES = (50, 95, 99)
+
+SELECT_HOLDINGS = (
+    "SELECT stock_symbol, shares_amount FROM user_stocks WHERE user_id = "
+    "(SELECT id FROM users WHERE username = ?)"
+)
+
+
+class RouteStats:
+    """Latencies and status codes of the requests sent to one route."""
+
+    def __init__(self):
+        self.seconds = []
+        self.statuses = Counter()
+
+    def add(self, seconds, status):
+        self.seconds.append(seconds)
+        self.statuses[status] += 1
+
+    def merge(self, other):
+        self.seconds.extend(other.seconds)
+        self.statuses.update(other.statuses)
+
+    def summary(self):
+        seconds = sorted(self.seconds)
+        count = len(seconds)
+        summary = {
+            "count": count,
+            "errors": sum(n for status, n in self.statuses.items() if status >= 400),
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+        }
+        if count:
+            summary["mean_ms"] = round(sum(seconds) / count * 1000, 3)
+            for p in PERCENTILES:
+                summary[f"p{p}_ms"] = round(percentile(seconds, p) * 1000, 3)
+            summary["max_ms"] = round(seconds[-1] * 1000, 3)
+        return summary
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+class LocalServer:
+    """
+    Serves app over HTTP on a free local port from a background thread,
+    one thread per connection like the development server.
+    """
+
+    def __init__(self, app):
+        self._server = make_server("127.0.0.1", 0, app, threaded=True)
+        # One access log line per request would dominate the timings
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="bench-server", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._thread.join()
+        self._thread = None
+
+
+class Session:
+    """
+    One simulated user: a logged-in HTTP session sending the request mix.
+    Tracks the shares it holds so that sells are for shares it owns.
+    """
+
+    def __init__(self, base_url, conn, user_number, symbols, mix, rng):
+        self.base_url = base_url
+        self.client = requests.Session()
+        self.username = USERNAME_FORMAT.format(user_number)
+        self.symbols = symbols
+        self.routes = list(mix)
+        self.weights = list(mix.values())
+        self.rng = rng
+        self.held = Counter(dict(conn.execute(SELECT_HOLDINGS, (self.username,))))
+
+    def login(self):
+        response = self.post(
+            "/login", {"username": self.username, "password": PASSWORD}
+        )
+        if response.status_code != 302:
+            raise RuntimeError(f"Could not log in as {self.username}")
+
+    def send(self):
+        """Send one request of the mix and return (route, seconds, status)."""
+        route = self.rng.choices(self.routes, self.weights)[0]
+        if route == ROUTE_SELL and not +self.held:
+            route = ROUTE_BUY
+
+        symbol = self.rng.choice(self.symbols)
+        started = time.perf_counter()
+        if route == ROUTE_BUY:
+            response = self.post(route, {"symbol": symbol, "shares": 1})
+        elif route == ROUTE_SELL:
+            symbol = self.rng.choice(list(+self.held))
+            response = self.post(route, {"symbol": symbol, "shares": 1})
+        elif route == ROUTE_QUOTE:
+            response = self.post(route, {"symbol": symbol})
+        else:
+            response = self.client.get(self.base_url + route)
+        seconds = time.perf_counter() - started
+
+        # Trades redirect to /home when they went through
+        if response.status_code == 302 and route == ROUTE_BUY:
+            self.held[symbol] += 1
+        elif response.status_code == 302 and route == ROUTE_SELL:
+            self.held[symbol] -= 1
+        return route, seconds, response.status_code
+
+    def post(self, route, data):
+        return self.client.post(self.base_url + route, data=data, allow_redirects=False)
+
+    def close(self):
+        self.client.close()
+
+
+def run_load(
+    app, conn, users, request_count, workers, symbols, mix=None, warmup=0, seed=0
+):
+    """
+    Send requests to app over local HTTP from workers threads.
+
+    Each worker logs in as its own seeded user and sends its share of the
+    request_count requests, after warmup untimed ones. users is the number
+    of seeded accounts, workers pick distinct ones among them.
+
+    Returns:
+        a tuple (stats, seconds): stats maps each route to its RouteStats,
+        seconds is the wall time of the timed requests
+    """
+    mix = mix or DEFAULT_MIX
+    universe = symbol_universe(symbols)
+    rng = random.Random(seed)
+    server = LocalServer(app)
+    server.start()
+    sessions = [
+        Session(server.url, conn, number, universe, mix, random.Random(rng.random()))
+        for number in rng.sample(range(users), workers)
+    ]
+    try:
+        stats, seconds = _drive(sessions, request_count, warmup)
+    finally:
+        for session in sessions:
+            session.close()
+        server.stop()
+
+    merged = {route: RouteStats() for route in mix}
+    for worker_stats in stats:
+        for route, route_stats in worker_stats.items():
+            merged[route].merge(route_stats)
+    return merged, seconds
+
+
+def _drive(sessions, request_count, warmup):
+    """Run the sessions concurrently, returning their stats and the wall time."""
+    workers = len(sessions)
+    for session in sessions:
+        session.login()
+        for _ in range(warmup):
+            session.send()
+
+    per_worker = [request_count // workers] * workers
+    for i in range(request_count % workers):
+        per_worker[i] += 1
+    results = [dict() for _ in sessions]
+    barrier = threading.Barrier(workers + 1)
+
+    def work(session, count, stats):
+        barrier.wait()
+        for _ in range(count):
+            route, seconds, status = session.send()
+            stats.setdefault(route, RouteStats()).add(seconds, status)
+
+    threads = [
+        threading.Thread(target=work, args=args, name=f"bench-worker-{i}")
+        for i, args in enumerate(zip(sessions, per_worker, results))
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, ".")
+
+from benchmarks.fake_quote_server import FakeQuoteServer
+from benchmarks.load import DEFAULT_MIX, run_load
+from benchmarks.seed import SeedConfig, seed_database
+from internal.server.api.rate_limiter import rate_budget
+from internal.server.api.upstream_client import UpstreamClient, set_upstream_client
+from internal.server.config import CONFIG
+import internal.server.model.sqlite_connection as sqlite_connection
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def parse_mix(text):
+    """Parse `home=40,quote=20,...` into a {route: weight} mix."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        route = "/" + name.strip().lstrip("/")
+        if route not in DEFAULT_MIX or not weight:
+            raise argparse.ArgumentTypeError(f"Expected ROUTE=WEIGHT, got {part!r}")
+        mix[route] = float(weight)
+    return mix
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the portfolio routes against a fake quote API."
+    )
+    parser.add_argument(
+        "--db", help="reuse or create this database instead of a temporary one"
+    )
+    parser.add_argument(
+        "--out", help="the JSON result file, defaults to benchmarks/results/"
+    )
+    parser.add_argument(
+        "--compare", help="a previous result file to print the change against"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--warmup", type=int, default=5, help="untimed requests per worker"
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="e.g. home=40,quote=20,history=15,buy=15,sell=10",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+    seed = parser.add_argument_group("database")
+    seed.add_argument("--users", type=int, default=1000)
+    seed.add_argument("--symbols", type=int, default=500)
+    seed.add_argument("--holdings-per-user", type=int, default=8)
+    seed.add_argument("--trades-per-user", type=int, default=50)
+    seed.add_argument(
+        "--cold-share",
+        type=float,
+        default=0.1,
+        help="share of symbols with a stale price",
+    )
+
+    upstream = parser.add_argument_group("fake quote API")
+    upstream.add_argument(
+        "--latency", type=float, default=0.05, help="seconds per upstream call"
+    )
+    upstream.add_argument("--jitter", type=float, default=0.0)
+    upstream.add_argument(
+        "--limit-after", type=int, help="answer with the rate-limit note after N calls"
+    )
+    upstream.add_argument("--limited-share", type=float, default=0.0)
+    upstream.add_argument(
+        "--requests-per-minute",
+        type=int,
+        help="override api.rate_limit.requests_per_minute of the server",
+    )
+    upstream.add_argument(
+        "--daily-quota", type=int, help="override api.rate_limit.daily_quota"
+    )
+    return parser.parse_args()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_app(db_path, base_url):
+    """
+    Create the server app on db_path with the upstream client pointed at
+    base_url. Background jobs that would also call the API are disabled.
+    """
+    sqlite_connection.DB_PATH = db_path
+    os.environ.setdefault("API_KEY", "benchmark")
+    CONFIG.api.refresher.enabled = False
+    set_upstream_client(
+        UpstreamClient(
+            base_url=base_url,
+            pool_size=CONFIG.api.pool_size,
+            max_retries=CONFIG.api.max_retries,
+            retry_backoff_second=CONFIG.api.retry_backoff_second,
+            connect_timeout_second=CONFIG.api.connect_timeout_second,
+            read_timeout_second=CONFIG.api.request_timeout_second,
+        )
+    )
+
+    # Imported here, the module builds its app on DB_PATH when first imported
+    from cmd.server.server import app
+
+    return app
+
+
+def print_summary(result, previous=None):
+    print(
+        f"{'route':<10} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    for route, summary in result["routes"].items():
+        line = (
+            f"{route:<10} {summary['count']:>6} {summary['errors']:>6} "
+            f"{summary.get('p50_ms', 0):>9.2f} {summary.get('p95_ms', 0):>9.2f} "
+            f"{summary.get('p99_ms', 0):>9.2f}"
+        )
+        before = (previous or {}).get("routes", {}).get(route, {})
+        if before.get("p95_ms") and summary.get("p95_ms"):
+            change = (summary["p95_ms"] / before["p95_ms"] - 1) * 100
+            line += f"   p95 {change:+.1f}% vs {previous['run'].get('commit')}"
+        print(line)
+    total = result["total"]
+    print(
+        f"{total['count']} requests in {total['seconds']}s, {total['requests_per_second']} req/s"
+    )
+
+
+# Seeds a database, starts the fake quote API and drives the routes, e.g.
+# `python benchmarks/run.py --requests 5000 --workers 8 --latency 0.2`.
+# Results are written as JSON; pass --compare with an older file to see the change.
+if __name__ == "__main__":
+    args = parse_args()
+    seed_config = SeedConfig(
+        users=args.users,
+        symbols=args.symbols,
+        holdings_per_user=args.holdings_per_user,
+        trades_per_user=args.trades_per_user,
+        cold_share=args.cold_share,
+        seed=args.seed,
+    )
+    if args.workers > args.users:
+        sys.exit("--workers cannot exceed --users, each worker logs in as its own user")
+
+    db_path = args.db or os.path.join(
+        tempfile.mkdtemp(prefix="finance-bench-"), "bench.db"
+    )
+    if os.path.exists(db_path):
+        seeded = {"reused": db_path}
+    else:
+        print(f"Seeding {db_path}...")
+        seeded = seed_database(db_path, seed_config)
+
+    if args.requests_per_minute is not None:
+        rate_budget.requests_per_minute = args.requests_per_minute
+    if args.daily_quota is not None:
+        rate_budget.daily_quota = args.daily_quota
+
+    upstream = FakeQuoteServer(
+        latency_second=args.latency,
+        jitter_second=args.jitter,
+        limit_after=args.limit_after,
+        limited_share=args.limited_share,
+        seed=args.seed,
+    )
+    upstream.start()
+    conn = sqlite3.connect(db_path)
+    try:
+        app = build_app(db_path, upstream.url)
+        stats, seconds = run_load(
+            app,
+            conn,
+            users=args.users,
+            request_count=args.requests,
+            workers=args.workers,
+            symbols=args.symbols,
+            mix=args.mix,
+            warmup=args.warmup,
+            seed=args.seed,
+        )
+    finally:
+        conn.close()
+        upstream.stop()
+
+    result = {
+        "run": {
+            "commit": git_commit(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "requests": args.requests,
+            "workers": args.workers,
+            "warmup": args.warmup,
+            "mix": args.mix,
+            "rate_limit": {
+                "requests_per_minute": rate_budget.requests_per_minute,
+                "daily_quota": rate_budget.daily_quota,
+            },
+        },
+        "database": {**seed_config.to_dict(), **seeded},
+        "upstream": upstream.stats(),
+        "routes": {
+            route: route_stats.summary() for route, route_stats in stats.items()
+        },
+        "total": {
+            "count": args.requests,
+            "seconds": round(seconds, 3),
+            "requests_per_second": round(args.requests / seconds, 1),
+        },
+    }
+
+    out = args.out or os.path.join(
+        RESULTS_DIR,
+        f"{time.strftime('%Y%m%d-%H%M%S')}-{result['run']['commit'] or 'local'}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_summary(result, previous)
+    print(f"Results written to {out}")
@@ -0,0 +1,169 @@
+import random
+import sqlite3
+import string
+import time
+from datetime import datetime, timedelta
+from itertools import product
+
+from werkzeug.security import generate_password_hash
+
+from internal.core.trade.trade_engine import TRADE_BUY, TRADE_SELL, apply_trade
+from internal.server.api.API_handlers import STOCK_TIME_FORMAT
+from internal.server.model.migrations import migrate
+from internal.server.model.symbols import store_symbols
+
+USERNAME_FORMAT = "bench{:06d}"
+PASSWORD = "bench-password"
+INITIAL_CASH = 1_000_000.0
+
+INSERT_USER = "INSERT INTO users (username, hash, cash) VALUES (?, ?, ?)"
+UPSERT_STOCK_STATUS = (
+    "INSERT OR REPLACE INTO stock_status (stock_symbol, stock_price, time) "
+    "VALUES (?, ?, ?)"
+)
+
+
+class SeedConfig:
+    """
+    Volumes of a seeded database.
+    Args:
+        users: the number of accounts
+        symbols: the size of the listed universe
+        holdings_per_user: the distinct symbols each user trades
+        trades_per_user: the rows of `history_logs` per user
+        history_days: how far back the trades go
+        cold_share: the share of symbols whose `stock_status` price is stale,
+            so that looking them up goes to the upstream API
+        seed: the random seed, the same seed builds the same database
+    """
+
+    def __init__(
+        self,
+        users=1000,
+        symbols=500,
+        holdings_per_user=8,
+        trades_per_user=50,
+        history_days=365,
+        cold_share=0.1,
+        seed=0,
+    ):
+        self.users = users
+        self.symbols = symbols
+        self.holdings_per_user = holdings_per_user
+        self.trades_per_user = trades_per_user
+        self.history_days = history_days
+        self.cold_share = cold_share
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def symbol_universe(count):
+    """Return count distinct ticker-like symbols: AAA, AAB, ..., AAAA, ..."""
+    symbols = []
+    for length in (3, 4):
+        for letters in product(string.ascii_uppercase, repeat=length):
+            if len(symbols) == count:
+                return symbols
+            symbols.append("".join(letters))
+    return symbols
+
+
+def base_price(symbol):
+    """A stable price between 5 and 500 for symbol, shared with the fake API."""
+    return 5 + sum(ord(c) * 7919 for c in symbol) % 49500 / 100
+
+
+def seed_database(path, config):
+    """
+    Build a benchmark database at path from config.
+
+    The schema comes from the migrations, and every trade goes through
+    `apply_trade`, so holdings, positions, cash and leaderboard totals are
+    exactly what the server itself would have written.
+
+    Returns:
+        a dictionary of row counts and the seconds it took
+    """
+    started = time.perf_counter()
+    rng = random.Random(config.seed)
+    symbols = symbol_universe(config.symbols)
+    now = datetime.now()
+
+    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        migrate(conn)
+
+        listings = (
+            (symbol, f"{symbol} Inc", "NYSE", "Stock", None, "Active")
+            for symbol in symbols
+        )
+        store_symbols(conn, listings, time.time(), batch_size=1000)
+
+        cold = set(rng.sample(symbols, int(len(symbols) * config.cold_share)))
+        fresh_time = now.strftime(STOCK_TIME_FORMAT)
+        stale_time = (now - timedelta(days=7)).strftime(STOCK_TIME_FORMAT)
+        with conn:
+            conn.executemany(
+                UPSERT_STOCK_STATUS,
+                (
+                    (
+                        symbol,
+                        base_price(symbol),
+                        stale_time if symbol in cold else fresh_time,
+                    )
+                    for symbol in symbols
+                ),
+            )
+
+        # Hashing is deliberately slow, every account shares one password
+        password_hash = generate_password_hash(PASSWORD)
+        with conn:
+            conn.executemany(
+                INSERT_USER,
+                (
+                    (USERNAME_FORMAT.format(n), password_hash, INITIAL_CASH)
+                    for n in range(config.users)
+                ),
+            )
+
+        trades = 0
+        user_ids = [row[0] for row in conn.execute("SELECT id FROM users")]
+        for user_id in user_ids:
+            with conn:
+                trades += seed_trades(conn, rng, user_id, symbols, now, config)
+    finally:
+        conn.close()
+
+    return {
+        "users": config.users,
+        "symbols": len(symbols),
+        "cold_symbols": len(cold),
+        "trades": trades,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def seed_trades(conn, rng, user_id, symbols, now, config):
+    """Trade a random handful of symbols for one user, oldest trade first."""
+    held = {symbol: 0 for symbol in rng.sample(symbols, config.holdings_per_user)}
+    start = now - timedelta(days=config.history_days)
+    step = timedelta(days=config.history_days) / max(1, config.trades_per_user)
+
+    for n in range(config.trades_per_user):
+        symbol = rng.choice(list(held))
+        price = round(base_price(symbol) * rng.uniform(0.8, 1.2), 2)
+        trade_time = start + step * n
+        # Mostly buys, so that holdings grow over time like a real account
+        if held[symbol] > 1 and rng.random() < 0.3:
+            shares = rng.randint(1, held[symbol] - 1)
+            apply_trade(conn, TRADE_SELL, user_id, symbol, price, shares, trade_time)
+            held[symbol] -= shares
+        else:
+            shares = rng.randint(1, 20)
+            apply_trade(conn, TRADE_BUY, user_id, symbol, price, shares, trade_time)
+            held[symbol] += shares
+    return config.trades_per_user
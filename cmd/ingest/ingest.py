@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, ".")
+from dotenv import load_dotenv
+
+from internal.server.api.price_ingest import ingest_csv_file, ingest_upstream
+from internal.server.model.migrations import migrate
+from internal.server.model.price_history import INTERVAL_DAILY
+from internal.server.model.sqlite_connection import connect
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load OHLCV bars into price_history.")
+    parser.add_argument("symbols", nargs="+", help="stock symbols to load")
+    parser.add_argument(
+        "--csv",
+        help="load the bars of a single symbol from this CSV file instead of the API",
+    )
+    parser.add_argument(
+        "--interval",
+        default=INTERVAL_DAILY,
+        help='"daily" (default) or an intraday interval such as "5min"',
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="only download the latest 100 bars of each symbol",
+    )
+    return parser.parse_args()
+
+
+# Loads historical prices into the price store, from Alpha Vantage or from
+# local CSV files, e.g. `python cmd/ingest/ingest.py AAPL --csv aapl.csv`.
+if __name__ == "__main__":
+    load_dotenv()
+    args = parse_args()
+    if args.csv and len(args.symbols) != 1:
+        sys.exit("--csv takes exactly one symbol")
+
+    conn = connect()
+    try:
+        migrate(conn)
+        for symbol in args.symbols:
+            if args.csv:
+                stored = ingest_csv_file(conn, symbol, args.csv, args.interval)
+            else:
+                stored = ingest_upstream(
+                    conn,
+                    symbol,
+                    os.getenv("API_KEY"),
+                    args.interval,
+                    "compact" if args.compact else "full",
+                )
+            print(f"{symbol.upper()}: {stored} bars")
+    finally:
+        conn.close()
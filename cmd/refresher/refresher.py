@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, ".")
+from dotenv import load_dotenv
+
+from internal.server.api.quote_refresher import build_quote_refresher
+from internal.server.config import CONFIG
+
+# Runs the quote refresher as its own process. Requires api.refresher.standalone
+# in config.yaml, which also keeps the web workers from starting their own copy.
+if __name__ == "__main__":
+    load_dotenv()
+    if not CONFIG.api.refresher.enabled:
+        sys.exit("The quote refresher is disabled, see api.refresher.enabled")
+    if not CONFIG.api.refresher.standalone:
+        sys.exit(
+            "Set api.refresher.standalone to true first, "
+            "or the web workers refresh quotes too"
+        )
+    build_quote_refresher(os.getenv("API_KEY")).run_forever()
@@ -1,14 +1,29 @@
 import os
+import secrets
 from flask import Flask
-from flask_session import Session
 from dotenv import load_dotenv
 
-from internal.server.model.sqlite_connection import close_db
+from internal.server.model.sqlite_connection import close_db, connect
+from internal.server.model.migrations import migrate
+from internal.server.api.quote_refresher import build_quote_refresher
+from internal.core.trade import build_order_queue
 from internal.server.routes.auth.auth_routes import auth_bp
 from internal.server.routes.portfolio.portforlio_routes import portfolio_bp
+from internal.server.routes.metrics.metrics_routes import metrics_bp
+from internal.server.instrumentation.middleware import init_instrumentation
+from internal.server.session.sqlite_session import (
+    SESSION_SQLITE,
+    build_session_interface,
+    build_session_sweeper,
+)
 from internal.server.utils.utils import usd, time_format
+from internal.server.config import CONFIG
 from internal.core.logger import logger
 
+LOG_NO_SECRET_KEY = (
+    "SECRET_KEY is not set, signed session cookies will not survive a restart"
+)
+
 
 def create_app() -> Flask:
     """
@@ -28,11 +43,14 @@ def create_app() -> Flask:
         ),
     )
 
+    apply_migrations()
     configure_app(app)
     configure_session(app)
     register_filters(app)
     register_blueprints(app)
     register_teardown(app)
+    register_instrumentation(app)
+    start_background_jobs(app)
 
     logger.info("---------- Flask app initialized complete ----------")
 
@@ -46,20 +64,40 @@ def load_env_variables():
     load_dotenv()
 
 
+def apply_migrations():
+    """
+    Bring the database schema up to date before serving requests.
+    """
+    if not CONFIG.database.migrate_on_startup:
+        return
+
+    conn = connect()
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+
+
 def configure_app(app: Flask):
     """
     Set app config values.
     """
     app.config["SESSION_PERMANENT"] = False
-    app.config["SESSION_TYPE"] = "filesystem"
+    app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
     app.config["API_KEY"] = os.getenv("API_KEY")
 
 
 def configure_session(app: Flask):
     """
-    Initialize Flask session.
+    Initialize Flask session with the backend of CONFIG.session: server-side
+    in SQLite, or Flask's signed cookie, which needs a SECRET_KEY.
     """
-    Session(app)
+    session_interface = build_session_interface()
+    if session_interface is not None:
+        app.session_interface = session_interface
+    elif not app.config["SECRET_KEY"]:
+        logger.warning(LOG_NO_SECRET_KEY)
+        app.config["SECRET_KEY"] = secrets.token_hex(32)
 
 
 def register_filters(app: Flask):
@@ -88,5 +126,42 @@ def register_teardown(app: Flask):
         close_db(exception)
 
 
+def register_instrumentation(app: Flask):
+    """
+    Time requests and their spans and serve them on /metrics, if enabled.
+    """
+    if not CONFIG.instrumentation.enabled:
+        return
+
+    init_instrumentation(app)
+    app.register_blueprint(metrics_bp)
+
+
+def start_background_jobs(app: Flask):
+    """
+    Start the background jobs enabled in the config: the order queue writer,
+    the expired session sweeper and the quote refresher. The refresher is
+    skipped when api.refresher.standalone is set, cmd/refresher then runs
+    the only copy.
+    """
+    if CONFIG.portfolio.order_queue.enabled:
+        app.extensions["order_queue"] = build_order_queue()
+        app.extensions["order_queue"].start()
+
+    if CONFIG.session.backend == SESSION_SQLITE:
+        app.extensions["session_sweeper"] = build_session_sweeper()
+        app.extensions["session_sweeper"].start()
+
+    if not CONFIG.api.refresher.enabled or not app.config["API_KEY"]:
+        logger.info("Quote refresher disabled")
+        return
+    if CONFIG.api.refresher.standalone:
+        logger.info("Quote refresher runs as its own process")
+        return
+
+    app.extensions["quote_refresher"] = build_quote_refresher(app.config["API_KEY"])
+    app.extensions["quote_refresher"].start()
+
+
 # Entry point: create app instance
 app = create_app()
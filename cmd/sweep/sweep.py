@@ -0,0 +1,91 @@
+import argparse
+import sys
+
+sys.path.insert(0, ".")
+
+from internal.core.backtest import DEFAULT_INITIAL_CASH, STRATEGIES, load_close_prices
+from internal.core.backtest.sweep import open_sink, run_sweep
+from internal.server.model.price_history import INTERVAL_DAILY
+from internal.server.model.sqlite_connection import connect
+
+
+def parse_number(text):
+    return float(text) if any(c in text for c in ".eE") else int(text)
+
+
+def parse_grid(specs):
+    """
+    Parse NAME=VALUES arguments into a parameter grid. VALUES is either a
+    comma-separated list (`slow=50,100,200`) or an inclusive range
+    `start:stop:step` (`fast=5:50:5`).
+    """
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise argparse.ArgumentTypeError(f"Expected NAME=VALUES, got {spec!r}")
+        if ":" in values:
+            start, stop, step = (parse_number(v) for v in values.split(":"))
+            count = int(round((stop - start) / step)) + 1
+            grid[name] = [start + i * step for i in range(count)]
+        else:
+            grid[name] = [parse_number(v) for v in values.split(",")]
+    return grid
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Backtest a grid of strategy parameters across CPU cores."
+    )
+    parser.add_argument("symbol", help="the symbol whose stored prices are used")
+    parser.add_argument("strategy", choices=sorted(STRATEGIES))
+    parser.add_argument(
+        "grid", nargs="+", help="NAME=v1,v2,... or NAME=start:stop:step"
+    )
+    parser.add_argument(
+        "--out", default="db/sweeps.db", help="a .db (SQLite) or .csv result file"
+    )
+    parser.add_argument(
+        "--sweep-id",
+        help="name of the sweep, to resume it; defaults to SYMBOL-STRATEGY",
+    )
+    parser.add_argument("--start", help="first date, YYYY-MM-DD")
+    parser.add_argument("--end", help="last date, YYYY-MM-DD")
+    parser.add_argument("--interval", default=INTERVAL_DAILY)
+    parser.add_argument("--workers", type=int, help="processes, defaults to CPU count")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--initial-cash", type=float, default=DEFAULT_INITIAL_CASH)
+    return parser.parse_args()
+
+
+# Runs a parameter sweep over prices loaded with cmd/ingest, e.g.
+# `python cmd/sweep/sweep.py AAPL sma_crossover fast=5:50:5 slow=50:250:10`.
+# Rerunning the same command resumes an interrupted sweep.
+if __name__ == "__main__":
+    args = parse_args()
+    symbol = args.symbol.upper()
+    sweep_id = args.sweep_id or f"{symbol}-{args.strategy}"
+
+    conn = connect()
+    try:
+        _, close = load_close_prices(conn, symbol, args.start, args.end, args.interval)
+    finally:
+        conn.close()
+    if len(close) == 0:
+        sys.exit(f"No {args.interval} prices stored for {symbol}, run cmd/ingest first")
+
+    sink = open_sink(args.out, sweep_id)
+    try:
+        ran = run_sweep(
+            close,
+            args.strategy,
+            parse_grid(args.grid),
+            sink,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            initial_cash=args.initial_cash,
+            sweep_id=sweep_id,
+        )
+    finally:
+        sink.close()
+    print(f"{sweep_id}: ran {ran} combinations, results in {args.out}")
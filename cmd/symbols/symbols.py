@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, ".")
+from dotenv import load_dotenv
+
+from internal.server.api.API_handlers import get_all_active_stocks
+from internal.server.config import CONFIG
+from internal.server.model.migrations import migrate
+from internal.server.model.sqlite_connection import connect
+from internal.server.model.symbols import parse_listing_csv, store_symbols
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Load the listed symbols used to validate /buy, /sell and /quote."
+    )
+    parser.add_argument(
+        "csv",
+        nargs="?",
+        help="load a saved LISTING_STATUS CSV file instead of downloading it",
+    )
+    return parser.parse_args()
+
+
+# Replaces the `symbols` table with the active listings of Alpha Vantage,
+# e.g. `python cmd/symbols/symbols.py` or `... listing_status.csv`.
+if __name__ == "__main__":
+    load_dotenv()
+    args = parse_args()
+
+    conn = connect()
+    try:
+        migrate(conn)
+        if args.csv:
+            with open(args.csv, "r", newline="") as file:
+                stored = store_symbols(
+                    conn,
+                    parse_listing_csv(file),
+                    datetime.now(),
+                    CONFIG.api.ingest_batch_size,
+                )
+        else:
+            stored = get_all_active_stocks(conn, os.getenv("API_KEY"))
+        print(f"{stored} symbols")
+    finally:
+        conn.close()
@@ -0,0 +1,51 @@
+-- Baseline schema. Every statement is idempotent so databases created by the
+-- old setup/init_db.py can be brought under version control as-is.
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    hash TEXT NOT NULL,
+    cash NUMERIC NOT NULL DEFAULT 10000.00 CHECK (cash >= 0)
+);
+
+CREATE TABLE IF NOT EXISTS history_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('buy', 'sell')),
+    stock_symbol TEXT NOT NULL,
+    stock_price NUMERIC NOT NULL,
+    shares_amount INTEGER NOT NULL CHECK (shares_amount > 0),
+    time DATETIME NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS user_stocks (
+    user_id INTEGER NOT NULL,
+    stock_symbol TEXT NOT NULL,
+    shares_amount INTEGER NOT NULL CHECK (shares_amount > 0),
+    PRIMARY KEY (user_id, stock_symbol),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS stock_status (
+    stock_symbol TEXT NOT NULL PRIMARY KEY,
+    stock_price NUMERIC NOT NULL,
+    time DATETIME NOT NULL
+);
+
+-- Shared upstream call budget, see internal/server/api/rate_limiter.py
+CREATE TABLE IF NOT EXISTS api_budget (
+    name TEXT NOT NULL PRIMARY KEY,
+    tokens REAL NOT NULL,
+    refilled_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    day_count INTEGER NOT NULL,
+    blocked_until REAL NOT NULL DEFAULT 0
+);
+
+-- Cross-worker fetch leases, see internal/server/api/single_flight.py
+CREATE TABLE IF NOT EXISTS quote_leases (
+    stock_symbol TEXT NOT NULL PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
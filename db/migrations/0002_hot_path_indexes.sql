@@ -0,0 +1,15 @@
+-- /history: WHERE user_id = ? ORDER BY time DESC
+-- Lets SQLite walk the user's rows in time order instead of scanning and
+-- sorting the whole table. id is the rowid, so the index also serves
+-- (time, id) keyset pagination.
+CREATE INDEX IF NOT EXISTS idx_history_logs_user_time
+    ON history_logs (user_id, time, id);
+
+-- Quote refresher: GROUP BY stock_symbol over user_stocks. The primary key
+-- (user_id, stock_symbol) already covers every per-user lookup in
+-- portforlio_routes, but not this per-symbol aggregate.
+CREATE INDEX IF NOT EXISTS idx_user_stocks_symbol
+    ON user_stocks (stock_symbol, user_id);
+
+-- auth_routes looks users up by username, which is already served by the
+-- index behind its UNIQUE constraint, so no index is added for it here.
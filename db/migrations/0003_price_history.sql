@@ -0,0 +1,16 @@
+-- Historical OHLCV bars, loaded by internal/server/api/price_ingest.py.
+-- interval is "daily" for daily bars or the Alpha Vantage intraday interval
+-- ("1min", "5min", ...); date is "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS", so
+-- text order is time order. WITHOUT ROWID stores the rows in primary key
+-- order, so a range read for one symbol is a single contiguous scan.
+CREATE TABLE IF NOT EXISTS price_history (
+    stock_symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume INTEGER NOT NULL,
+    PRIMARY KEY (stock_symbol, interval, date)
+) WITHOUT ROWID;
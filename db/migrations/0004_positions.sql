@@ -0,0 +1,66 @@
+-- Materialized positions, maintained by internal/core/trade/trade_engine.py.
+-- Rows are kept at zero shares once a position is closed so that its
+-- realized P&L survives. avg_cost is the average cost of the open shares.
+CREATE TABLE IF NOT EXISTS positions (
+    user_id INTEGER NOT NULL,
+    stock_symbol TEXT NOT NULL,
+    shares INTEGER NOT NULL CHECK (shares >= 0),
+    avg_cost REAL NOT NULL,
+    realized_pnl REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, stock_symbol),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Finds the holders of a symbol whose cached valuation a new price invalidates
+CREATE INDEX IF NOT EXISTS idx_positions_symbol
+    ON positions (stock_symbol, user_id) WHERE shares > 0;
+
+-- Cached per-user valuation, see internal/server/model/portfolio.py. A row is
+-- deleted when its user trades or the price of a held symbol changes.
+CREATE TABLE IF NOT EXISTS portfolio_valuations (
+    user_id INTEGER NOT NULL PRIMARY KEY,
+    holdings_value REAL NOT NULL,
+    cost_basis REAL NOT NULL,
+    realized_pnl REAL NOT NULL,
+    computed_at DATETIME NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Backfill the positions of existing users by replaying their trades in
+-- order with the same average-cost rules as the trade engine.
+CREATE TEMP TABLE ordered_trades AS
+SELECT user_id, stock_symbol, type, stock_price, shares_amount,
+       ROW_NUMBER() OVER (
+           PARTITION BY user_id, stock_symbol ORDER BY time, id
+       ) AS n
+FROM history_logs;
+
+CREATE INDEX temp.idx_ordered_trades ON ordered_trades (user_id, stock_symbol, n);
+
+INSERT OR IGNORE INTO positions (user_id, stock_symbol, shares, avg_cost, realized_pnl)
+WITH RECURSIVE replay (user_id, stock_symbol, n, shares, avg_cost, realized_pnl) AS (
+    SELECT DISTINCT user_id, stock_symbol, 0, 0, 0.0, 0.0 FROM ordered_trades
+    UNION ALL
+    SELECT r.user_id, r.stock_symbol, t.n,
+           CASE WHEN t.type = 'buy' THEN r.shares + t.shares_amount
+                ELSE r.shares - t.shares_amount END,
+           CASE WHEN t.type = 'buy'
+                    THEN (r.avg_cost * r.shares + t.stock_price * t.shares_amount)
+                         / (r.shares + t.shares_amount)
+                WHEN r.shares = t.shares_amount THEN 0.0
+                ELSE r.avg_cost END,
+           CASE WHEN t.type = 'sell'
+                    THEN r.realized_pnl + (t.stock_price - r.avg_cost) * t.shares_amount
+                ELSE r.realized_pnl END
+    FROM replay r
+    JOIN ordered_trades t
+      ON t.user_id = r.user_id AND t.stock_symbol = r.stock_symbol AND t.n = r.n + 1
+)
+SELECT user_id, stock_symbol, MAX(shares, 0), avg_cost, realized_pnl
+FROM replay r
+WHERE n = (
+    SELECT MAX(n) FROM ordered_trades t
+    WHERE t.user_id = r.user_id AND t.stock_symbol = r.stock_symbol
+);
+
+DROP TABLE temp.ordered_trades;
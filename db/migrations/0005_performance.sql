@@ -0,0 +1,24 @@
+-- Daily net asset value of every user, appended by
+-- internal/core/analytics/performance.py as it replays history_logs.
+CREATE TABLE IF NOT EXISTS performance_nav (
+    user_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    nav REAL NOT NULL,
+    PRIMARY KEY (user_id, date),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Where the replay of a user's trades stopped: the (time, id) key of the
+-- last replayed trade, the cash and holdings after it, and the last date
+-- written to performance_nav. The next replay resumes from here.
+CREATE TABLE IF NOT EXISTS performance_checkpoints (
+    user_id INTEGER NOT NULL PRIMARY KEY,
+    last_trade_time TEXT,
+    last_trade_id INTEGER,
+    cash REAL NOT NULL,
+    holdings TEXT NOT NULL,
+    last_prices TEXT NOT NULL,
+    nav_through TEXT NOT NULL,
+    updated_at DATETIME NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
@@ -0,0 +1,21 @@
+-- Precomputed account totals (cash + holdings at the cached prices of
+-- stock_status), maintained by internal/server/model/leaderboard.py when a
+-- user registers or trades and when the price of a held symbol changes.
+CREATE TABLE IF NOT EXISTS leaderboard (
+    user_id INTEGER NOT NULL PRIMARY KEY,
+    total REAL NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Serves the top of the ranking and the count of users ahead of a total
+CREATE INDEX IF NOT EXISTS idx_leaderboard_total ON leaderboard (total DESC, user_id);
+
+INSERT OR REPLACE INTO leaderboard (user_id, total)
+SELECT users.id,
+       users.cash + COALESCE((
+           SELECT SUM(positions.shares * stock_status.stock_price)
+           FROM positions
+           JOIN stock_status ON stock_status.stock_symbol = positions.stock_symbol
+           WHERE positions.user_id = users.id AND positions.shares > 0
+       ), 0)
+FROM users;
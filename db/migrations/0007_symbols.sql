@@ -0,0 +1,13 @@
+-- Listed symbols from the Alpha Vantage LISTING_STATUS download, loaded by
+-- `doit symbols`. Backs symbol validation in /buy, /sell and /quote.
+-- refreshed_at marks the download a row was last seen in, so the rows of
+-- symbols missing from a newer download can be pruned.
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT NOT NULL PRIMARY KEY,
+    name TEXT,
+    exchange TEXT,
+    asset_type TEXT,
+    ipo_date TEXT,
+    status TEXT,
+    refreshed_at DATETIME NOT NULL
+) WITHOUT ROWID;
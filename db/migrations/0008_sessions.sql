@@ -0,0 +1,11 @@
+-- Server-side sessions, see internal/server/session/sqlite_session.py. data
+-- is the JSON of the session dictionary and the cookie only carries the id.
+-- Rows past expires_at (epoch seconds) are deleted by the session sweeper.
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT NOT NULL PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+
+-- Lets the sweeper find expired sessions without scanning the table
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at);
@@ -17,6 +17,50 @@ def task_start():
     }
 
 
+def task_migrate():
+    """Apply pending database migrations."""
+    return {
+        "actions": ["python setup/init_db.py"],
+        "verbosity": 2,
+    }
+
+
+def task_ingest():
+    """Load daily price history from Alpha Vantage, e.g. `doit ingest AAPL MSFT`."""
+    return {
+        "actions": ["python cmd/ingest/ingest.py %(symbols)s"],
+        "pos_arg": "symbols",
+        "verbosity": 2,
+    }
+
+
+def task_symbols():
+    """Load the listed symbols from Alpha Vantage, or `doit symbols listing.csv`."""
+    return {
+        "actions": ["python cmd/symbols/symbols.py %(args)s"],
+        "pos_arg": "args",
+        "verbosity": 2,
+    }
+
+
+def task_sweep():
+    """Run a backtest parameter sweep, e.g. `doit sweep AAPL sma_crossover fast=5:50:5 slow=50:250:10`."""
+    return {
+        "actions": ["python cmd/sweep/sweep.py %(args)s"],
+        "pos_arg": "args",
+        "verbosity": 2,
+    }
+
+
+def task_bench():
+    """Benchmark the routes against a fake quote API, e.g. `doit bench --requests 5000`."""
+    return {
+        "actions": ["python benchmarks/run.py %(args)s"],
+        "pos_arg": "args",
+        "verbosity": 2,
+    }
+
+
 def task_test():
     """Run all unit tests."""
     return {
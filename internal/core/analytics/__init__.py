@@ -0,0 +1,7 @@
+from internal.core.analytics.performance import (
+    TRADING_DAYS_PER_YEAR,
+    load_performance,
+    performance_metrics,
+    replay_daily_nav,
+    update_performance,
+)
@@ -0,0 +1,256 @@
+import itertools
+import json
+import math
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from internal.core.trade.trade_engine import TRADE_BUY, trade_cost
+from internal.server.model.history import iter_trades
+from internal.server.model.price_history import INTERVAL_DAILY, last_close, load_bars
+
+TRADING_DAYS_PER_YEAR = 252
+
+SELECT_CHECKPOINT = "SELECT * FROM performance_checkpoints WHERE user_id = ?"
+UPSERT_CHECKPOINT = (
+    "INSERT OR REPLACE INTO performance_checkpoints "
+    "(user_id, last_trade_time, last_trade_id, cash, holdings, last_prices, "
+    "nav_through, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+UPSERT_NAV = (
+    "INSERT OR REPLACE INTO performance_nav (user_id, date, nav) VALUES (?, ?, ?)"
+)
+SELECT_NAV = "SELECT date, nav FROM performance_nav WHERE user_id = ? ORDER BY date"
+# The cash a user started with: today's cash plus everything spent on buys
+# minus everything received from sells. One statement reads both from the
+# same snapshot, so a trade committing meanwhile cannot skew it.
+SELECT_INITIAL_CASH = """
+    SELECT users.cash + COALESCE((
+        SELECT SUM(CASE WHEN type = 'buy' THEN stock_price * shares_amount
+                        ELSE -stock_price * shares_amount END)
+        FROM history_logs WHERE user_id = ?1
+    ), 0) AS initial_cash
+    FROM users WHERE users.id = ?1
+"""
+
+
+class ReplayState:
+    """Cash and holdings of a user after replaying their trades up to cursor."""
+
+    def __init__(self, cash, holdings=None, last_prices=None, cursor=None):
+        self.cash = cash
+        self.holdings = holdings or {}
+        # The last trade price of every symbol, used when the price store
+        # has no bar for it yet
+        self.last_prices = last_prices or {}
+        self.cursor = cursor
+        self.replayed = 0
+
+    @classmethod
+    def from_checkpoint(cls, row):
+        cursor = None
+        if row["last_trade_id"] is not None:
+            cursor = (row["last_trade_time"], row["last_trade_id"])
+        return cls(
+            row["cash"],
+            json.loads(row["holdings"]),
+            json.loads(row["last_prices"]),
+            cursor,
+        )
+
+    def apply(self, trade):
+        symbol = trade["stock_symbol"]
+        shares = trade["shares_amount"]
+        total = trade_cost(trade["stock_price"], shares)
+        if trade["type"] == TRADE_BUY:
+            self.cash -= total
+            self.holdings[symbol] = self.holdings.get(symbol, 0) + shares
+        else:
+            self.cash += total
+            remaining = self.holdings.get(symbol, 0) - shares
+            if remaining > 0:
+                self.holdings[symbol] = remaining
+            else:
+                self.holdings.pop(symbol, None)
+        self.last_prices[symbol] = trade["stock_price"]
+        self.cursor = (trade["time"], trade["id"])
+        self.replayed += 1
+
+
+class _CloseSeries:
+    """Forward-filled daily closes of one symbol, read in date order."""
+
+    def __init__(self, conn, symbol, start, end, interval):
+        bars = load_bars(conn, symbol, start, end, interval)
+        self.dates = [bar["date"][:10] for bar in bars]
+        self.closes = [bar["close"] for bar in bars]
+        self.close = last_close(conn, symbol, start, interval)
+        self.i = 0
+
+    def close_on(self, day):
+        while self.i < len(self.dates) and self.dates[self.i] <= day:
+            self.close = self.closes[self.i]
+            self.i += 1
+        return self.close
+
+
+def weekdays(start, end):
+    """Yield every Monday to Friday from start to end, both "YYYY-MM-DD" and inclusive."""
+    day = date.fromisoformat(start)
+    last = date.fromisoformat(end)
+    while day <= last:
+        if day.weekday() < 5:
+            yield day.isoformat()
+        day += timedelta(days=1)
+
+
+def replay_daily_nav(conn, trades, state, start, end, interval=INTERVAL_DAILY):
+    """
+    Replay a stream of trades day by day and yield the net asset value.
+
+    Every trade dated on or before a day is applied to state before that
+    day is valued, so the trades are consumed lazily and only one day's
+    holdings are ever in memory. Holdings are valued at the last stored
+    close on or before the day, or at their last trade price when the price
+    store has none. Trades dated after end are left in the stream.
+
+    Args:
+        conn: an open sqlite3 connection
+        trades: history rows oldest first, e.g. from `iter_trades`
+        state: the ReplayState the trades are applied to
+        start: the first day to value, as "YYYY-MM-DD"
+        end: the last day to value, as "YYYY-MM-DD"
+        interval: the price store interval the closes are read from
+    Yields:
+        (date, nav) tuples for every weekday from start to end
+    """
+    trades = iter(trades)
+    pending = next(trades, None)
+    series = {}
+    for day in weekdays(start, end):
+        while pending is not None and str(pending["time"])[:10] <= day:
+            state.apply(pending)
+            pending = next(trades, None)
+
+        nav = state.cash
+        for symbol, shares in state.holdings.items():
+            if symbol not in series:
+                series[symbol] = _CloseSeries(conn, symbol, day, end, interval)
+            close = series[symbol].close_on(day)
+            if close is None:
+                close = state.last_prices[symbol]
+            nav += shares * close
+        yield day, nav
+
+
+def update_performance(conn, user_id, end=None, batch_size=1000):
+    """
+    Bring a user's stored daily NAV up to date.
+
+    The replay resumes from the user's checkpoint: only the trades after it
+    are read, and only the days from the last stored one onwards are
+    valued, so the cost depends on the activity since the previous call
+    rather than on the length of the history. The last stored day is
+    valued again because its trades or close may have arrived since.
+
+    Args:
+        conn: an open sqlite3 connection outside of any transaction
+        user_id: the id of the user
+        end: the last day to value as "YYYY-MM-DD", defaults to today
+        batch_size: the number of trades read per query
+    Returns:
+        the number of trades replayed by this call
+    """
+    end = end or date.today().isoformat()
+    checkpoint = conn.execute(SELECT_CHECKPOINT, (user_id,)).fetchone()
+    if checkpoint is not None:
+        state = ReplayState.from_checkpoint(checkpoint)
+        start = checkpoint["nav_through"]
+        trades = iter_trades(conn, user_id, state.cursor, batch_size)
+    else:
+        row = conn.execute(SELECT_INITIAL_CASH, (user_id,)).fetchone()
+        if row is None:
+            return 0
+        state = ReplayState(row["initial_cash"])
+        trades = iter_trades(conn, user_id, None, batch_size)
+        first = next(trades, None)
+        if first is None:
+            return 0
+        start = str(first["time"])[:10]
+        trades = itertools.chain([first], trades)
+
+    navs = list(replay_daily_nav(conn, trades, state, start, end))
+    if not navs:
+        return 0
+
+    with conn:
+        conn.executemany(UPSERT_NAV, [(user_id, day, nav) for day, nav in navs])
+        last_time, last_id = state.cursor or (None, None)
+        conn.execute(
+            UPSERT_CHECKPOINT,
+            (
+                user_id,
+                last_time,
+                last_id,
+                state.cash,
+                json.dumps(state.holdings),
+                json.dumps(state.last_prices),
+                navs[-1][0],
+                datetime.now(),
+            ),
+        )
+    return state.replayed
+
+
+def performance_metrics(nav, risk_free_rate=0.0):
+    """
+    Summarize a daily NAV series.
+
+    Args:
+        nav: the daily net asset values, oldest first
+        risk_free_rate: the annual risk-free rate subtracted for the Sharpe ratio
+    Returns:
+        a dictionary with the array "returns" of daily returns and the scalars
+        "total_return", "volatility" (annualized), "sharpe" (annualized, None
+        when undefined) and "max_drawdown"
+    """
+    nav = np.asarray(nav, dtype=np.float64)
+    if len(nav) < 2:
+        return {
+            "returns": np.empty(0),
+            "total_return": 0.0,
+            "volatility": 0.0,
+            "sharpe": None,
+            "max_drawdown": 0.0,
+        }
+
+    returns = nav[1:] / nav[:-1] - 1
+    deviation = float(returns.std(ddof=1)) if len(returns) > 1 else 0.0
+    excess = returns.mean() - risk_free_rate / TRADING_DAYS_PER_YEAR
+    scale = math.sqrt(TRADING_DAYS_PER_YEAR)
+    drawdown = nav / np.maximum.accumulate(nav) - 1
+    return {
+        "returns": returns,
+        "total_return": float(nav[-1] / nav[0] - 1),
+        "volatility": deviation * scale,
+        "sharpe": float(excess / deviation * scale) if deviation > 0 else None,
+        "max_drawdown": float(drawdown.min()),
+    }
+
+
+def load_performance(conn, user_id, end=None, risk_free_rate=0.0, batch_size=1000):
+    """
+    Update and read a user's performance.
+    Returns:
+        a dictionary with the str array "dates", the float array "nav" and
+        the keys of `performance_metrics`
+    """
+    update_performance(conn, user_id, end, batch_size)
+    rows = conn.execute(SELECT_NAV, (user_id,)).fetchall()
+    nav = np.fromiter((row["nav"] for row in rows), dtype=np.float64)
+    return {
+        "dates": np.array([row["date"] for row in rows], dtype=str),
+        "nav": nav,
+        **performance_metrics(nav, risk_free_rate),
+    }
@@ -0,0 +1,7 @@
+from internal.core.backtest.backtest import (
+    DEFAULT_INITIAL_CASH,
+    backtest_strategy,
+    load_close_prices,
+    run_backtest,
+)
+from internal.core.backtest.strategies import STRATEGIES
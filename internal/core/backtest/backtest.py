@@ -0,0 +1,132 @@
+import numpy as np
+
+from internal.core.backtest.strategies import STRATEGIES
+from internal.core.trade.trade_engine import (
+    TRADE_BUY,
+    TRADE_SELL,
+    affordable_shares,
+    trade_cost,
+)
+from internal.server.model.price_history import INTERVAL_DAILY, load_bars
+
+# Starting cash of a backtest, the same as a newly registered user's
+DEFAULT_INITIAL_CASH = 10000.0
+
+
+def load_close_prices(conn, symbol, start=None, end=None, interval=INTERVAL_DAILY):
+    """
+    Read a symbol's closing prices from the price store as arrays.
+    Returns:
+        a tuple (dates, close) of a str array and a float64 array, oldest first
+    """
+    bars = load_bars(conn, symbol, start, end, interval)
+    dates = np.array([bar["date"] for bar in bars], dtype=str)
+    close = np.fromiter((bar["close"] for bar in bars), dtype=np.float64)
+    return dates, close
+
+
+def run_backtest(close, signal, initial_cash=DEFAULT_INITIAL_CASH, dates=None):
+    """
+    Simulate a long-only strategy that is all in while signal is True.
+
+    Orders fill at the close of the bar where the signal flips, under the
+    live trade rules: only whole shares are bought, a buy may not spend more
+    cash than the account holds (`affordable_shares`), and cash moves by
+    `trade_cost`. Entries the account cannot afford are skipped, as `/buy`
+    would reject them.
+
+    Signals, holdings, cash and equity are computed with NumPy over all bars
+    at once; Python only iterates over the trades, because the size of each
+    entry depends on the cash left by the previous exit.
+
+    Args:
+        close: the closing prices, oldest first
+        signal: a bool array, True on the bars where the strategy is long
+        initial_cash: the starting cash balance
+        dates: optional labels of the bars, used in the trade list
+    Returns:
+        a dictionary with the arrays "equity", "cash", "shares" and
+        "drawdown", the list "trades", and the scalars "final_equity",
+        "total_return", "max_drawdown" and "trade_count"
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(signal, dtype=bool)
+    if close.shape != signal.shape:
+        raise ValueError("close and signal must have the same length")
+
+    flips = np.diff(signal.astype(np.int8), prepend=np.int8(0))
+    entries = np.flatnonzero(flips == 1)
+    exits = np.flatnonzero(flips == -1)
+
+    shares_delta = np.zeros(len(close))
+    cash_delta = np.zeros(len(close))
+    trades = []
+    cash = float(initial_cash)
+
+    # Flips alternate starting with an entry, so exits[i] closes entries[i]
+    for i, entry in enumerate(entries):
+        shares = affordable_shares(cash, close[entry])
+        if shares <= 0:
+            continue
+        cost = trade_cost(close[entry], shares)
+        cash -= cost
+        shares_delta[entry] += shares
+        cash_delta[entry] -= cost
+        trades.append(_trade(TRADE_BUY, entry, close[entry], shares, cost, dates))
+
+        if i < len(exits):
+            exit_bar = exits[i]
+            proceeds = trade_cost(close[exit_bar], shares)
+            cash += proceeds
+            shares_delta[exit_bar] -= shares
+            cash_delta[exit_bar] += proceeds
+            trades.append(
+                _trade(TRADE_SELL, exit_bar, close[exit_bar], shares, proceeds, dates)
+            )
+
+    shares_held = np.cumsum(shares_delta)
+    cash_curve = initial_cash + np.cumsum(cash_delta)
+    equity = cash_curve + shares_held * close
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else equity
+
+    final_equity = float(equity[-1]) if len(equity) else float(initial_cash)
+    return {
+        "equity": equity,
+        "cash": cash_curve,
+        "shares": shares_held,
+        "drawdown": drawdown,
+        "trades": trades,
+        "final_equity": final_equity,
+        "total_return": final_equity / initial_cash - 1,
+        "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+        "trade_count": len(trades),
+    }
+
+
+def backtest_strategy(
+    close, strategy, params, initial_cash=DEFAULT_INITIAL_CASH, dates=None
+):
+    """
+    Run a strategy from STRATEGIES by name over close.
+    Args:
+        strategy: a key of STRATEGIES, e.g. "sma_crossover"
+        params: the keyword arguments of the strategy, e.g. {"fast": 10, "slow": 50}
+        see `run_backtest` for the other arguments
+    Returns:
+        the result of `run_backtest`
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    signal = STRATEGIES[strategy](close, **params)
+    return run_backtest(close, signal, initial_cash, dates)
+
+
+def _trade(trade_type, bar, price, shares, total, dates):
+    return {
+        "type": trade_type,
+        "bar": int(bar),
+        "date": None if dates is None else str(dates[bar]),
+        "price": float(price),
+        "shares": int(shares),
+        "total": float(total),
+    }
@@ -0,0 +1,55 @@
+import numpy as np
+
+
+def rolling_mean(values, window):
+    """
+    Trailing mean of the last window values at every bar.
+    Returns:
+        a float array of the same length, NaN until window values are available
+    """
+    values = np.asarray(values, dtype=np.float64)
+    means = np.full(len(values), np.nan)
+    if 0 < window <= len(values):
+        sums = np.cumsum(np.insert(values, 0, 0.0))
+        means[window - 1 :] = (sums[window:] - sums[:-window]) / window
+    return means
+
+
+def sma_crossover(close, fast, slow):
+    """
+    Hold while the fast moving average is above the slow one.
+    Args:
+        close: the closing prices, oldest first
+        fast: the window of the fast moving average, in bars
+        slow: the window of the slow moving average, in bars
+    Returns:
+        a bool array, True on the bars where the strategy wants to be long
+    """
+    if fast >= slow:
+        raise ValueError("fast must be shorter than slow")
+    with np.errstate(invalid="ignore"):
+        return rolling_mean(close, fast) > rolling_mean(close, slow)
+
+
+def momentum(close, lookback, threshold=0.0):
+    """
+    Hold while the return over the last lookback bars is above threshold.
+    Args:
+        close: the closing prices, oldest first
+        lookback: the number of bars the return is measured over
+        threshold: the minimum return to stay long, e.g. 0.05 for 5%
+    Returns:
+        a bool array, True on the bars where the strategy wants to be long
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.zeros(len(close), dtype=bool)
+    if 0 < lookback < len(close):
+        signal[lookback:] = close[lookback:] / close[:-lookback] - 1 > threshold
+    return signal
+
+
+# Strategies selectable by name, e.g. from a parameter sweep
+STRATEGIES = {
+    "sma_crossover": sma_crossover,
+    "momentum": momentum,
+}
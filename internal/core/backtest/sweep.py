@@ -0,0 +1,247 @@
+import csv
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from internal.core.backtest.backtest import DEFAULT_INITIAL_CASH, backtest_strategy
+from internal.core.logger import logger
+
+RESULT_COLUMNS = (
+    "params",
+    "final_equity",
+    "total_return",
+    "max_drawdown",
+    "trade_count",
+)
+
+CREATE_RESULTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS sweep_results (
+        sweep_id TEXT NOT NULL,
+        params TEXT NOT NULL,
+        final_equity REAL NOT NULL,
+        total_return REAL NOT NULL,
+        max_drawdown REAL NOT NULL,
+        trade_count INTEGER NOT NULL,
+        PRIMARY KEY (sweep_id, params)
+    )
+"""
+INSERT_RESULT = (
+    "INSERT OR REPLACE INTO sweep_results "
+    "(sweep_id, params, final_equity, total_return, max_drawdown, trade_count) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SELECT_DONE = "SELECT params FROM sweep_results WHERE sweep_id = ?"
+
+LOG_SWEEP_START = "Sweep %s: %s combinations to run, %s already done, %s workers"
+LOG_SWEEP_PROGRESS = "Sweep %s: %s/%s combinations done"
+LOG_SWEEP_DONE = "Sweep %s: finished %s combinations in %.1f s"
+LOG_SWEEP_SKIPPED = "Sweep %s: skipped %s invalid combinations, e.g. %s: %s"
+
+
+def parameter_grid(grid):
+    """
+    Expand {"fast": [5, 10], "slow": [50]} into every combination of values.
+    Returns:
+        a list of parameter dictionaries, in a stable order
+    """
+    names = sorted(grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def params_key(params):
+    """Return the canonical text of a parameter combination, used to resume sweeps."""
+    return json.dumps(params, sort_keys=True)
+
+
+class SqliteSink:
+    """Sweep results stored in a `sweep_results` table, one row per combination."""
+
+    def __init__(self, path, sweep_id):
+        self.sweep_id = sweep_id
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute(CREATE_RESULTS_TABLE)
+
+    def done_keys(self):
+        return {row[0] for row in self.conn.execute(SELECT_DONE, (self.sweep_id,))}
+
+    def write(self, results):
+        with self.conn:
+            self.conn.executemany(
+                INSERT_RESULT,
+                [
+                    (self.sweep_id, *(result[c] for c in RESULT_COLUMNS))
+                    for result in results
+                ],
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class CsvSink:
+    """
+    Sweep results appended to a CSV file with a sweep_id, *RESULT_COLUMNS
+    header. Several sweeps can share one file, each resumes from its own rows.
+    """
+
+    def __init__(self, path, sweep_id):
+        self.path = path
+        self.sweep_id = sweep_id
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "r", newline="") as file:
+                header = next(csv.reader(file), [])
+            if "sweep_id" not in header:
+                raise ValueError(
+                    f"{path} has no sweep_id column, write the sweep to a new file"
+                )
+        self.file = open(path, "a", newline="")
+        self.writer = csv.writer(self.file)
+        if not exists:
+            self.writer.writerow(("sweep_id", *RESULT_COLUMNS))
+            self.file.flush()
+
+    def done_keys(self):
+        with open(self.path, "r", newline="") as file:
+            return {
+                row["params"]
+                for row in csv.DictReader(file)
+                if row["sweep_id"] == self.sweep_id
+            }
+
+    def write(self, results):
+        for result in results:
+            self.writer.writerow([self.sweep_id, *(result[c] for c in RESULT_COLUMNS)])
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def open_sink(path, sweep_id):
+    """Open the sink for path: CSV for a `.csv` file, SQLite otherwise."""
+    if path.endswith(".csv"):
+        return CsvSink(path, sweep_id)
+    return SqliteSink(path, sweep_id)
+
+
+# Per-process state of the pool workers, set by _init_worker
+_worker_close = None
+
+
+def _init_worker(prices_path):
+    """Map the shared price array read-only; the pages are shared with every worker."""
+    global _worker_close
+    _worker_close = np.load(prices_path, mmap_mode="r")
+
+
+def _run_chunk(strategy, chunk, initial_cash):
+    """
+    Backtest a chunk of combinations.
+    Returns:
+        a tuple (results, skipped): skipped lists (params key, error message)
+        of the combinations the strategy rejected with a ValueError, such as
+        fast >= slow, so one invalid combination does not fail the chunk
+    """
+    results = []
+    skipped = []
+    for params in chunk:
+        try:
+            result = backtest_strategy(_worker_close, strategy, params, initial_cash)
+        except ValueError as e:
+            skipped.append((params_key(params), str(e)))
+            continue
+        results.append(
+            {
+                "params": params_key(params),
+                "final_equity": result["final_equity"],
+                "total_return": result["total_return"],
+                "max_drawdown": result["max_drawdown"],
+                "trade_count": result["trade_count"],
+            }
+        )
+    return results, skipped
+
+
+def run_sweep(
+    close,
+    strategy,
+    grid,
+    sink,
+    workers=None,
+    chunk_size=64,
+    initial_cash=DEFAULT_INITIAL_CASH,
+    sweep_id="sweep",
+):
+    """
+    Backtest every parameter combination of grid across a process pool.
+
+    The prices are written once to a temporary `.npy` file that every worker
+    memory-maps, so they are not pickled per task. Combinations are sent in
+    chunks of chunk_size, and each finished chunk is written to the sink
+    immediately. Combinations the sink already holds are skipped, so an
+    interrupted sweep resumes where it stopped.
+
+    Args:
+        close: the closing prices, oldest first
+        strategy: a key of STRATEGIES
+        grid: a dictionary of parameter name to the list of values to try
+        sink: a SqliteSink or CsvSink, see `open_sink`
+        workers: the number of processes, defaults to the CPU count
+        chunk_size: the number of combinations per task
+        initial_cash: the starting cash of every backtest
+        sweep_id: the name of the sweep, used in logs; the sink keys its
+            results by the sweep_id it was opened with
+    Returns:
+        the number of combinations run by this call. Combinations the
+        strategy rejects as invalid are logged and skipped, not counted.
+    """
+    done = sink.done_keys()
+    pending = [p for p in parameter_grid(grid) if params_key(p) not in done]
+    workers = workers or os.cpu_count() or 1
+    logger.info(LOG_SWEEP_START, sweep_id, len(pending), len(done), workers)
+    if not pending:
+        return 0
+
+    started = time.perf_counter()
+    fd, prices_path = tempfile.mkstemp(suffix=".npy")
+    os.close(fd)
+    try:
+        np.save(prices_path, np.ascontiguousarray(close, dtype=np.float64))
+        chunks = [
+            pending[i : i + chunk_size] for i in range(0, len(pending), chunk_size)
+        ]
+        finished = 0
+        skipped = []
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(prices_path,)
+        ) as executor:
+            futures = [
+                executor.submit(_run_chunk, strategy, chunk, initial_cash)
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                results, chunk_skipped = future.result()
+                if results:
+                    sink.write(results)
+                finished += len(results)
+                skipped.extend(chunk_skipped)
+                logger.debug(LOG_SWEEP_PROGRESS, sweep_id, finished, len(pending))
+    finally:
+        os.remove(prices_path)
+
+    if skipped:
+        logger.warning(LOG_SWEEP_SKIPPED, sweep_id, len(skipped), *skipped[0])
+
+    logger.info(LOG_SWEEP_DONE, sweep_id, finished, time.perf_counter() - started)
+    return finished
@@ -2,12 +2,14 @@ import os
 import json
 import logging
 from internal.server.config import CONFIG
+from internal.core.logger.pipeline import attach_queue_pipeline, file_handler
 
 
 def get_bugger() -> logging.Logger:
     """
     Returns a singleton error-level logger for bug reports.
     Adds a `.log()` method that accepts dict or str.
+    Uses the queue and rotation settings of `core.logger`.
     """
 
     print("------------------------ BUGGER INITIALIZE ------------------------")
@@ -23,13 +25,13 @@ def get_bugger() -> logging.Logger:
     log_file = os.path.join(log_dir, CONFIG.core.bugger.filename)
     logger.setLevel(logging.ERROR)
 
-    handler = logging.FileHandler(log_file)
+    handler = file_handler(log_file, CONFIG.core.logger.rotation)
     formatter = logging.Formatter(
         "%(asctime)s [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S"
     )
     handler.setFormatter(formatter)
 
-    logger.addHandler(handler)
+    attach_queue_pipeline(logger, handler, CONFIG.core.logger.queue)
 
     # Attach a custom log method to log structured metadata
     def structured_log(metadata):
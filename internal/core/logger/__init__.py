@@ -1,3 +1,4 @@
 from internal.core.logger.logger import get_logger
+from internal.core.logger.structured import event
 
 logger = get_logger()
@@ -1,12 +1,19 @@
 import os
 import logging
 from internal.server.config import CONFIG
+from internal.core.logger.pipeline import attach_queue_pipeline, file_handler
+from internal.core.logger.structured import SamplingFilter, build_formatter
 
 
 def get_logger() -> logging.Logger:
     """
     Creates and returns a singleton logger instance based on config settings.
     Prevents reinitialization if already created.
+
+    Records are written to the rotating log file by a background thread, see
+    `attach_queue_pipeline`, so logging never blocks on file I/O. Records
+    of the events listed in `core.logger.sampling` are sampled before they
+    are formatted, and `core.logger.format` selects text or JSON lines.
     """
 
     print("------------------------ LOGGER INITIALIZE ------------------------")
@@ -24,11 +31,11 @@ def get_logger() -> logging.Logger:
     log_level = getattr(logging, CONFIG.core.logger.level.upper(), logging.INFO)
 
     logger.setLevel(log_level)
+    logger.addFilter(SamplingFilter(CONFIG.core.logger.sampling))
 
-    file_handler = logging.FileHandler(log_file)
-    formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
-    file_handler.setFormatter(formatter)
+    handler = file_handler(log_file, CONFIG.core.logger.rotation)
+    handler.setFormatter(build_formatter(CONFIG.core.logger.format))
 
-    logger.addHandler(file_handler)
+    attach_queue_pipeline(logger, handler, CONFIG.core.logger.queue)
 
     return logger
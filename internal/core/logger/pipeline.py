@@ -0,0 +1,203 @@
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import (
+    QueueHandler,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
+
+OVERFLOW_DROP = "drop"
+OVERFLOW_BLOCK = "block"
+
+ROTATION_SIZE = "size"
+ROTATION_TIME = "time"
+
+LOG_DROPPED = "Dropped %s log records because the log queue was full"
+
+# Tells the writer thread to exit once the records queued before it are written
+_STOP = object()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands records to a bounded queue instead of writing them.
+
+    When the queue is full, the "drop" policy discards the record and counts
+    it in `dropped`, so a slow disk never stalls the caller; the "block"
+    policy waits for room, so no record is lost.
+    """
+
+    def __init__(self, log_queue, overflow=OVERFLOW_DROP):
+        super().__init__(log_queue)
+        if overflow not in (OVERFLOW_DROP, OVERFLOW_BLOCK):
+            raise ValueError(f"Unknown log queue overflow policy: {overflow}")
+        self.block = overflow == OVERFLOW_BLOCK
+        self.dropped = 0
+
+    def enqueue(self, record):
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BatchWriteMixin:
+    """Writes a batch of records with one rollover check, one write and one flush."""
+
+    def emit_batch(self, records):
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.shouldRollover(records[0]):
+                self.doRollover()
+            self.stream.write(
+                "".join(self.format(record) + self.terminator for record in records)
+            )
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[0])
+        finally:
+            self.release()
+
+
+class BatchRotatingFileHandler(_BatchWriteMixin, RotatingFileHandler):
+    """Log file rotated once it reaches maxBytes."""
+
+
+class BatchTimedRotatingFileHandler(_BatchWriteMixin, TimedRotatingFileHandler):
+    """Log file rotated at the time interval given by when."""
+
+
+class BatchQueueListener:
+    """
+    Writes the records of a queue to file handlers on a background thread.
+
+    Every wake-up drains up to batch_size records that are already queued
+    and writes them with a single flush per handler, so under load the
+    number of writes grows with the number of batches rather than records.
+    """
+
+    def __init__(self, log_queue, handlers, batch_size, source=None):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        # The BoundedQueueHandler feeding the queue, whose drops are reported
+        self.source = source
+        self._reported = 0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Write the records queued so far and stop the writer thread."""
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+            self._report_drops(batch)
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _report_drops(self, batch):
+        dropped = self.source.dropped if self.source is not None else 0
+        if dropped > self._reported:
+            batch.append(
+                logging.LogRecord(
+                    "log-writer",
+                    logging.WARNING,
+                    __file__,
+                    0,
+                    LOG_DROPPED % (dropped - self._reported),
+                    None,
+                    None,
+                )
+            )
+            self._reported = dropped
+
+    def _write(self, batch):
+        for handler in self.handlers:
+            records = [
+                record
+                for record in batch
+                if record.levelno >= handler.level and handler.filter(record)
+            ]
+            if records:
+                handler.emit_batch(records)
+
+
+def file_handler(path, rotation):
+    """
+    Build the batch-writing file handler of a log file.
+    Args:
+        path: the path of the log file
+        rotation: the `core.logger.rotation` config, mode ROTATION_SIZE
+            (rotate at max_bytes) or ROTATION_TIME (rotate at when)
+    """
+    if rotation.mode == ROTATION_SIZE:
+        return BatchRotatingFileHandler(
+            path,
+            maxBytes=rotation.max_bytes,
+            backupCount=rotation.backup_count,
+            encoding="utf-8",
+        )
+    if rotation.mode == ROTATION_TIME:
+        return BatchTimedRotatingFileHandler(
+            path,
+            when=rotation.when,
+            backupCount=rotation.backup_count,
+            encoding="utf-8",
+        )
+    raise ValueError(f"Unknown log rotation mode: {rotation.mode}")
+
+
+def attach_queue_pipeline(logger, handler, log_queue_config):
+    """
+    Route the records of logger through a bounded queue to handler.
+
+    The calling thread only formats the message and enqueues it; the file
+    I/O happens on a writer thread that is stopped, after writing what is
+    queued, when the interpreter exits.
+
+    Args:
+        logger: the logging.Logger to attach to
+        handler: a handler built by `file_handler`
+        log_queue_config: the `core.logger.queue` config with size, overflow
+            and batch_size
+    Returns:
+        the started BatchQueueListener
+    """
+    log_queue = queue.Queue(maxsize=log_queue_config.size)
+    queue_handler = BoundedQueueHandler(log_queue, log_queue_config.overflow)
+    listener = BatchQueueListener(
+        log_queue, [handler], log_queue_config.batch_size, source=queue_handler
+    )
+    logger.addHandler(queue_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
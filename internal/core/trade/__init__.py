@@ -0,0 +1,13 @@
+from internal.core.trade.trade_engine import (
+    TRADE_BUY,
+    TRADE_SELL,
+    affordable_shares,
+    apply_trade,
+    execute_trade,
+    trade_cost,
+)
+from internal.core.trade.order_queue import (
+    OrderQueue,
+    OrderTicket,
+    build_order_queue,
+)
@@ -0,0 +1,290 @@
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from internal.core.logger import logger
+from internal.core.trade.trade_engine import TRADE_BUY, TRADE_SELL, apply_trade
+from internal.server.config import CONFIG
+from internal.server.model.sqlite_connection import connect
+from internal.server.utils.exception import OrderFailedError, TradeError
+
+TICKET_PENDING = "pending"
+TICKET_FILLED = "filled"
+TICKET_REJECTED = "rejected"
+TICKET_FAILED = "failed"
+
+# Completed tickets kept for polling before the oldest ones are forgotten
+MAX_FINISHED_TICKETS = 10000
+
+LOG_QUEUE_STARTED = "Order queue started: max_batch_size=%s, max_latency_second=%s"
+LOG_QUEUE_STOPPED = "Order queue stopped"
+LOG_BATCH_COMMITTED = "Order queue: committed batch of %s orders in %.1f ms"
+LOG_BATCH_FAILED = "Order queue: batch of %s orders failed: %s"
+LOG_ORDER_FAILED = "Order queue: order %s failed: %r"
+LOG_WRITER_ERROR = "Order queue: writer error on a batch of %s orders: %r"
+
+
+class OrderTicket:
+    """Handle on a queued order that can be polled or waited on."""
+
+    def __init__(self, trade_type, user_id, symbol, price, shares):
+        self.id = uuid.uuid4().hex
+        self.trade_type = trade_type
+        self.user_id = user_id
+        self.symbol = symbol
+        self.price = price
+        self.shares = shares
+        self.submitted_at = time.time()
+
+        self.status = TICKET_PENDING
+        self.receipt = None
+        self.error = None
+        self._event = threading.Event()
+
+    def done(self):
+        """Return True once the order has been filled, rejected or failed."""
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the order to be applied.
+        Returns:
+            the receipt of `apply_trade`, or None if the timeout expired
+        Raises:
+            TradeError: if the order was rejected
+            sqlite3.Error: if the batch holding the order failed
+            OrderFailedError: if the order failed on an unexpected error
+        """
+        if not self._event.wait(timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.receipt
+
+    def to_dict(self):
+        """Return the ticket state as a JSON-serializable dictionary."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "type": self.trade_type,
+            "symbol": self.symbol,
+            "shares": self.shares,
+            "receipt": self.receipt,
+            "error": None if self.error is None else str(self.error),
+        }
+
+    def _finish(self, status, receipt=None, error=None):
+        self.status = status
+        self.receipt = receipt
+        self.error = error
+        self._event.set()
+
+
+class OrderQueue:
+    """
+    Asynchronous trade pipeline with group commit.
+
+    Validated orders are put on an in-process queue and a single writer
+    thread applies them in batches: one `BEGIN IMMEDIATE` transaction and one
+    COMMIT per batch, with a SAVEPOINT per order so that a rejected order
+    does not undo the rest of its batch. A batch is flushed when it holds
+    max_batch_size orders or when its oldest order has waited
+    max_latency_second, whichever comes first.
+    """
+
+    def __init__(self, connect, max_batch_size, max_latency_second, max_pending):
+        self.connect = connect
+        self.max_batch_size = max_batch_size
+        self.max_latency_second = max_latency_second
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._tickets = OrderedDict()
+        self._tickets_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.batches = 0
+        self.orders = 0
+
+    def start(self):
+        """Start the writer thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="order-queue", daemon=True
+        )
+        self._thread.start()
+        logger.info(LOG_QUEUE_STARTED, self.max_batch_size, self.max_latency_second)
+
+    def stop(self, timeout=None):
+        """Apply the orders already queued, then stop the writer thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info(LOG_QUEUE_STOPPED)
+
+    def submit(self, trade_type, user_id, symbol, price, shares):
+        """
+        Validate an order and queue it for the writer thread.
+        Returns:
+            the OrderTicket of the order
+        Raises:
+            TradeError: if the order is invalid or the queue is full
+        """
+        if trade_type not in (TRADE_BUY, TRADE_SELL):
+            raise TradeError(f"Unknown trade type: {trade_type}")
+        if shares <= 0:
+            raise TradeError("Shares amount must be positive")
+
+        ticket = OrderTicket(trade_type, user_id, symbol, price, shares)
+        with self._tickets_lock:
+            self._tickets[ticket.id] = ticket
+        try:
+            self._queue.put_nowait(ticket)
+        except queue.Full:
+            with self._tickets_lock:
+                self._tickets.pop(ticket.id, None)
+            raise TradeError("Too many pending orders, try again later")
+        return ticket
+
+    def ticket(self, ticket_id):
+        """Return the ticket with ticket_id, or None if it is unknown or forgotten."""
+        with self._tickets_lock:
+            return self._tickets.get(ticket_id)
+
+    def stats(self):
+        """Return the queue counters as a dictionary."""
+        return {
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "orders": self.orders,
+            "max_batch_size": self.max_batch_size,
+        }
+
+    def _run(self):
+        conn = self.connect()
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if batch:
+                    try:
+                        self._apply_batch(conn, batch)
+                    except Exception as e:
+                        # Keep the writer alive, or every later ticket would time out
+                        self._fail_batch(conn, batch, e)
+        finally:
+            conn.close()
+
+    def _fail_batch(self, conn, batch, error):
+        """Roll back a batch that failed unexpectedly and fail its open tickets."""
+        logger.error(LOG_WRITER_ERROR, len(batch), error)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.error(LOG_BATCH_FAILED, len(batch), e)
+        if not isinstance(error, sqlite3.Error):
+            error = _order_failed(error)
+        for ticket in batch:
+            if not ticket.done():
+                ticket._finish(TICKET_FAILED, error=error)
+
+    def _next_batch(self):
+        """Block for the first order, then gather more until the batch is full or due."""
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_latency_second
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _apply_batch(self, conn, batch):
+        started = time.perf_counter()
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for ticket in batch:
+                conn.execute("SAVEPOINT order_ticket")
+                try:
+                    receipt = apply_trade(
+                        conn,
+                        ticket.trade_type,
+                        ticket.user_id,
+                        ticket.symbol,
+                        ticket.price,
+                        ticket.shares,
+                    )
+                    outcomes.append((ticket, TICKET_FILLED, receipt, None))
+                except TradeError as e:
+                    conn.execute("ROLLBACK TO order_ticket")
+                    outcomes.append((ticket, TICKET_REJECTED, None, e))
+                except sqlite3.Error:
+                    raise
+                except Exception as e:
+                    # A bug in one order must not take the batch down with it
+                    logger.error(LOG_ORDER_FAILED, ticket.id, e)
+                    conn.execute("ROLLBACK TO order_ticket")
+                    outcomes.append((ticket, TICKET_FAILED, None, _order_failed(e)))
+                conn.execute("RELEASE order_ticket")
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error(LOG_BATCH_FAILED, len(batch), e)
+            outcomes = [(ticket, TICKET_FAILED, None, e) for ticket in batch]
+        else:
+            logger.debug(
+                LOG_BATCH_COMMITTED,
+                len(batch),
+                (time.perf_counter() - started) * 1000,
+            )
+
+        # Tickets are only resolved after the COMMIT, so a filled order is durable
+        for ticket, status, receipt, error in outcomes:
+            ticket._finish(status, receipt, error)
+        self.batches += 1
+        self.orders += len(batch)
+        self._forget_finished()
+
+    def _forget_finished(self):
+        with self._tickets_lock:
+            while len(self._tickets) > MAX_FINISHED_TICKETS:
+                ticket_id, ticket = next(iter(self._tickets.items()))
+                if not ticket.done():
+                    break
+                del self._tickets[ticket_id]
+
+
+def _order_failed(error):
+    """Wrap an unexpected error in the OrderFailedError its ticket raises."""
+    failed = OrderFailedError(f"Order failed: {error!r}")
+    failed.__cause__ = error
+    return failed
+
+
+def build_order_queue():
+    """Create an OrderQueue from the `portfolio.order_queue` configuration."""
+    settings = CONFIG.portfolio.order_queue
+    return OrderQueue(
+        connect=connect,
+        max_batch_size=settings.max_batch_size,
+        max_latency_second=settings.max_latency_second,
+        max_pending=settings.max_pending,
+    )
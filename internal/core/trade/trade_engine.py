@@ -0,0 +1,172 @@
+from datetime import datetime
+
+from internal.server.model.leaderboard import refresh_user_total
+from internal.server.utils.exception import (
+    TradeError,
+    InsufficientCashError,
+    InsufficientSharesError,
+)
+
+TRADE_BUY = "buy"
+TRADE_SELL = "sell"
+
+# Every statement is a constant string, so sqlite3's per-connection statement
+# cache prepares each one once and reuses it for every trade.
+DEBIT_CASH = (
+    "UPDATE users SET cash = cash - ? WHERE id = ? AND cash >= ? RETURNING cash"
+)
+CREDIT_CASH = "UPDATE users SET cash = cash + ? WHERE id = ? RETURNING cash"
+ADD_SHARES = (
+    "INSERT INTO user_stocks (user_id, stock_symbol, shares_amount) VALUES (?, ?, ?) "
+    "ON CONFLICT(user_id, stock_symbol) DO UPDATE SET "
+    "shares_amount = shares_amount + excluded.shares_amount"
+)
+REMOVE_ALL_SHARES = (
+    "DELETE FROM user_stocks "
+    "WHERE user_id = ? AND stock_symbol = ? AND shares_amount = ?"
+)
+REMOVE_SOME_SHARES = (
+    "UPDATE user_stocks SET shares_amount = shares_amount - ? "
+    "WHERE user_id = ? AND stock_symbol = ? AND shares_amount > ?"
+)
+OPEN_POSITION = (
+    "INSERT INTO positions (user_id, stock_symbol, shares, avg_cost) "
+    "VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(user_id, stock_symbol) DO UPDATE SET "
+    "avg_cost = (avg_cost * shares + excluded.avg_cost * excluded.shares) "
+    "/ (shares + excluded.shares), "
+    "shares = shares + excluded.shares"
+)
+CLOSE_POSITION = (
+    "UPDATE positions SET "
+    "realized_pnl = realized_pnl + (? - avg_cost) * ?, "
+    "avg_cost = CASE WHEN shares = ? THEN 0 ELSE avg_cost END, "
+    "shares = shares - ? "
+    "WHERE user_id = ? AND stock_symbol = ?"
+)
+INVALIDATE_VALUATION = "DELETE FROM portfolio_valuations WHERE user_id = ?"
+INSERT_HISTORY = (
+    "INSERT INTO history_logs "
+    "(user_id, type, stock_symbol, stock_price, shares_amount, time) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SELECT_USER = "SELECT 1 FROM users WHERE id = ?"
+
+
+def trade_cost(price, shares):
+    """
+    Cash moved by trading shares at price: paid on a buy, received on a sell.
+
+    Works on scalars and on NumPy arrays alike, so the backtester applies
+    exactly the same cash rules as live trades.
+    """
+    return price * shares
+
+
+def affordable_shares(cash, price):
+    """Return the largest whole number of shares at price that cash can pay for."""
+    return cash // price
+
+
+def apply_trade(conn, trade_type, user_id, symbol, price, shares, time=None):
+    """
+    Apply one trade inside the caller's transaction.
+
+    The cash and share checks are part of the conditional UPDATE/DELETE
+    statements themselves, so no balance is read before it is written and
+    two concurrent trades cannot both spend the same cash or shares. The
+    user's materialized position (average cost, realized P&L) is updated in
+    the same transaction, their cached valuation is dropped and their
+    leaderboard total is recomputed.
+
+    Args:
+        conn: an open sqlite3 connection inside a write transaction
+        trade_type: TRADE_BUY or TRADE_SELL
+        user_id: the id of the trading user
+        symbol: the uppercase stock symbol
+        price: the price of one share
+        shares: the positive number of shares to trade
+        time: the time recorded in `history_logs`, defaults to now
+    Returns:
+        a dictionary with the keys "type", "symbol", "shares", "price",
+        "total" and "cash", the user's cash balance after the trade
+    Raises:
+        TradeError: if the trade is invalid or the user does not exist
+        InsufficientCashError: if the user cannot afford a purchase
+        InsufficientSharesError: if the user sells more shares than they hold
+    """
+    if shares <= 0:
+        raise TradeError("Shares amount must be positive")
+
+    price = float(price)
+    total = trade_cost(price, shares)
+
+    if trade_type == TRADE_BUY:
+        row = conn.execute(DEBIT_CASH, (total, user_id, total)).fetchone()
+        if row is None:
+            _require_user(conn, user_id)
+            raise InsufficientCashError("Insufficient cash in your account")
+        conn.execute(ADD_SHARES, (user_id, symbol, shares))
+        conn.execute(OPEN_POSITION, (user_id, symbol, shares, price))
+
+    elif trade_type == TRADE_SELL:
+        removed = conn.execute(REMOVE_ALL_SHARES, (user_id, symbol, shares)).rowcount
+        if not removed:
+            removed = conn.execute(
+                REMOVE_SOME_SHARES, (shares, user_id, symbol, shares)
+            ).rowcount
+        if not removed:
+            raise InsufficientSharesError("Not enough shares to sell")
+        conn.execute(CLOSE_POSITION, (price, shares, shares, shares, user_id, symbol))
+        row = conn.execute(CREDIT_CASH, (total, user_id)).fetchone()
+        if row is None:
+            _require_user(conn, user_id)
+
+    else:
+        raise TradeError(f"Unknown trade type: {trade_type}")
+
+    conn.execute(INVALIDATE_VALUATION, (user_id,))
+    refresh_user_total(conn, user_id)
+    conn.execute(
+        INSERT_HISTORY,
+        (user_id, trade_type, symbol, price, shares, time or datetime.now()),
+    )
+    return {
+        "type": trade_type,
+        "symbol": symbol,
+        "shares": shares,
+        "price": price,
+        "total": total,
+        "cash": float(row[0]),
+    }
+
+
+def execute_trade(conn, trade_type, user_id, symbol, price, shares):
+    """
+    Run one trade as its own `BEGIN IMMEDIATE` transaction.
+
+    The write lock is taken up front, so concurrent workers queue on SQLite's
+    busy timeout instead of failing to upgrade a read lock mid-trade.
+
+    Args:
+        conn: an open sqlite3 connection outside of any transaction
+        see `apply_trade` for the other arguments
+    Returns:
+        the receipt returned by `apply_trade`
+    Raises:
+        TradeError: if the trade is rejected; nothing is written
+        sqlite3.Error: if the database fails; nothing is written
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        receipt = apply_trade(conn, trade_type, user_id, symbol, price, shares)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return receipt
+
+
+def _require_user(conn, user_id):
+    if conn.execute(SELECT_USER, (user_id,)).fetchone() is None:
+        raise TradeError("User not found")
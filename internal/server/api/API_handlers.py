@@ -1,67 +1,425 @@
 from dotenv import load_dotenv
 import requests
 import json
-import csv
+import codecs
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from itertools import chain
 
-from internal.server.utils.exception import ApiLimitError
+from internal.server.utils.exception import ApiLimitError, UpstreamLimitError
 from internal.server.model.sqlite_connection import get_db
+from internal.server.model.portfolio import invalidate_holder_valuations
+from internal.server.model.leaderboard import shift_holder_totals
+from internal.server.model.symbols import parse_listing_csv, store_symbols
+from internal.server.api.quote_cache import quote_cache
+from internal.server.api.symbol_demand import symbol_demand
+from internal.server.api.rate_limiter import (
+    rate_budget,
+    PRIORITY_DISPLAY,
+    PRIORITY_TRADE,
+)
+from internal.server.api.single_flight import SingleFlight, QuoteLeases
+from internal.server.api.upstream_client import get_upstream_client
 from internal.server.config import CONFIG
+from internal.core.logger import logger
+from internal.server.instrumentation.metrics import (
+    SPAN_QUOTE_CACHE,
+    SPAN_QUOTE_DB,
+    SPAN_QUOTE_UPSTREAM,
+    span,
+)
 
 # take environment variables from .env.
 load_dotenv()
 # Retrieve the API key
 API_TIME_TO_UPDATE = CONFIG.api.time_to_update_second
 
+LEASE_POLL_SECOND = 0.1
+
+# In-flight upstream fetches, shared by request threads and across workers
+in_flight = SingleFlight()
+quote_leases = QuoteLeases(lease_second=CONFIG.api.lease_second)
+
+# Shared pool for upstream requests, caps concurrent calls across all requests
+fetch_executor = ThreadPoolExecutor(
+    max_workers=CONFIG.api.max_concurrent_requests, thread_name_prefix="quote-fetch"
+)
+
+
+STOCK_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SELECT_STOCK_ROWS = "SELECT * FROM stock_status WHERE stock_symbol IN ({})"
+UPSERT_STOCK_ROW = (
+    "INSERT INTO stock_status (stock_symbol, stock_price, time) VALUES (?, ?, ?) "
+    "ON CONFLICT(stock_symbol) DO UPDATE SET "
+    "stock_price = excluded.stock_price, time = excluded.time"
+)
+
+LOG_SYMBOLS_LOADED = "Loaded %s listed symbols from LISTING_STATUS"
+LOG_DEADLINE_EXCEEDED = "Deadline exceeded while fetching %s"
+
 
 # Stock lookup
-def lookup(symbol, api_key):
+def lookup(symbol, api_key, priority=PRIORITY_DISPLAY):
     """
     Perform API request to get stock information
     Args:
         symbol: a string of stock_symbol, can be lowercase or uppercase
         api_key
+        priority: PRIORITY_TRADE for lookups that back a trade,
+            PRIORITY_DISPLAY otherwise
     Returns:
-        a dictionary contains 2 keys about the stock: "symbol" and "price"
+        a dictionary contains 2 keys about the stock: "symbol" and "price".
+        A third key "stale" is set to True when the price could not be
+        refreshed and the last known price is served instead, which never
+        happens for PRIORITY_TRADE.
+
+    Quotes are resolved through three tiers: the in-process `quote_cache`,
+    the `stock_status` table, and finally the Alpha Vantage API.
     """
+    return lookup_many([symbol], api_key, priority=priority).get(symbol.upper())
 
-    print(API_TIME_TO_UPDATE)
-    symbol = symbol.upper()
-    conn = get_db()
 
-    stock_row = conn.execute(
-        "SELECT * FROM stock_status WHERE stock_symbol = ?", (symbol,)
-    ).fetchone()
+def lookup_many(symbols, api_key, deadline_second=None, priority=PRIORITY_DISPLAY):
+    """
+    Resolve quotes for a batch of symbols in one pass
+    Args:
+        symbols: an iterable of stock symbols, can be lowercase or uppercase
+        api_key
+        deadline_second: the time budget for refreshing stale symbols,
+            defaults to CONFIG.api.batch_deadline_second
+        priority: the `rate_budget` priority of the upstream calls
+    Returns:
+        a dictionary mapping each uppercase symbol to its quote dictionary.
+        Symbols that could not be resolved are left out.
+    Raises:
+        ApiLimitError: if the API budget is exhausted and some symbol has no
+            last known price to fall back to
+
+    Cached rows are read with a single `stock_status` query, only the stale
+    symbols are fetched from the API, and the fresh prices are written back
+    with one `executemany` and one commit. Stale symbols that cannot be
+    refreshed are served with their last known price, flagged "stale",
+    except for PRIORITY_TRADE lookups: a trade is never priced at an old
+    price, so those symbols are left unresolved.
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    symbol_demand.record(symbols)
+    quotes = {}
+
+    # Tier 1: in-process cache
+    missing = []
+    with span(SPAN_QUOTE_CACHE):
+        for symbol in symbols:
+            cached_quote = quote_cache.get(symbol)
+            if cached_quote is not None:
+                quotes[symbol] = cached_quote
+            else:
+                missing.append(symbol)
+
+    if not missing:
+        return quotes
+
+    # Tier 2: stock_status table
+    with span(SPAN_QUOTE_DB):
+        conn = get_db()
+        stock_rows = read_stock_rows(conn, missing)
+        now = datetime.now()
+
+        stale = []
+        for symbol in missing:
+            stock_row = stock_rows.get(symbol)
+            if stock_row is None:
+                stale.append(symbol)
+                continue
+
+            expires_at = price_expiry(stock_row["time"])
+            if expires_at < now:
+                stale.append(symbol)
+                continue
+
+            quote = {
+                "symbol": stock_row["stock_symbol"],
+                "price": stock_row["stock_price"],
+            }
+            quote_cache.put(symbol, quote, expires_at.timestamp())
+            quotes[symbol] = quote
 
-    now = datetime.now()
-    print(now)
+    if not stale:
+        return quotes
 
-    if stock_row is not None:
-        stock_price_time = stock_row["time"]
+    # Tier 3: Alpha Vantage
+    with span(SPAN_QUOTE_UPSTREAM):
+        fetched, limit_error = refresh_quotes(
+            conn, stale, api_key, deadline_second, priority
+        )
+    quotes.update(fetched)
+
+    # Fall back to the last known price of symbols that could not be refreshed
+    unresolved = []
+    for symbol in stale:
+        stock_row = stock_rows.get(symbol)
+        if symbol in quotes:
+            continue
+        if stock_row is None or priority == PRIORITY_TRADE:
+            unresolved.append(symbol)
+            continue
+        quotes[symbol] = {
+            "symbol": stock_row["stock_symbol"],
+            "price": stock_row["stock_price"],
+            "stale": True,
+        }
+
+    if limit_error is not None and unresolved:
+        raise limit_error
+
+    return quotes
+
+
+def price_expiry(price_time):
+    """
+    Compute when a `stock_status` price stops being fresh
+    Args:
+        price_time: the `time` column of a `stock_status` row
+    Returns:
+        a datetime after which the price must be refreshed
+    """
+    stock_price_time = datetime.strptime(price_time, STOCK_TIME_FORMAT)
+    return stock_price_time + timedelta(seconds=API_TIME_TO_UPDATE)
 
-        # Convert stock_price_time from string to datetime
-        stock_price_time = datetime.strptime(stock_price_time, "%Y-%m-%d %H:%M:%S")
 
-        # Convert API_TIME_TO_UPDATE from int (seconds) to timedelta
-        update_threshold = timedelta(seconds=API_TIME_TO_UPDATE)
+def is_fresh(price_time, now=None):
+    """
+    Check if a `stock_status` price can still be served without a refresh
+    Args:
+        price_time: the `time` column of a `stock_status` row, or None
+        now: the reference datetime, defaults to datetime.now()
+    """
+    if price_time is None:
+        return False
+    return price_expiry(price_time) >= (now or datetime.now())
 
-        if (datetime.now() - stock_price_time) <= update_threshold:
-            return {
-                "symbol": stock_row["stock_symbol"],
-                "price": stock_row["stock_price"],
-            }
 
-    url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}"
+def read_stock_rows(conn, symbols):
+    """
+    Read the `stock_status` rows of several symbols with one query
+    Args:
+        conn: an open sqlite3 connection
+        symbols: a list of uppercase stock symbols
+    Returns:
+        a dictionary mapping stock_symbol to its row
+    """
+    placeholders = ", ".join("?" for _ in symbols)
+    rows = conn.execute(SELECT_STOCK_ROWS.format(placeholders), symbols).fetchall()
+    return {row["stock_symbol"]: row for row in rows}
+
+
+def store_quotes(conn, quotes):
+    """
+    Write fetched quotes back to `stock_status` in a single commit, dropping
+    the cached valuations and shifting the leaderboard totals of the holders
+    of symbols whose price changed
+    Args:
+        conn: an open sqlite3 connection
+        quotes: an iterable of quote dictionaries
+    """
+    quotes = list(quotes)
+    if not quotes:
+        return
+
+    now = datetime.now().strftime(STOCK_TIME_FORMAT)
+    invalidate_holder_valuations(conn, quotes)
+    shift_holder_totals(conn, quotes)
+    conn.executemany(
+        UPSERT_STOCK_ROW, [(quote["symbol"], quote["price"], now) for quote in quotes]
+    )
+    conn.commit()
+
+
+def refresh_quotes(
+    conn, symbols, api_key, deadline_second=None, priority=PRIORITY_DISPLAY
+):
+    """
+    Refresh stale symbols from the API with at most one fetch per symbol
+    Args:
+        conn: an open sqlite3 connection outside of any transaction
+        symbols: a list of uppercase stock symbols
+        api_key
+        deadline_second: the time budget for the refresh,
+            defaults to CONFIG.api.batch_deadline_second
+        priority: the `rate_budget` priority of the upstream calls
+    Returns:
+        a tuple (quotes, limit_error), like `fetch_quotes`
+
+    Within this process, concurrent callers of the same symbol share the
+    fetch of the first one (`in_flight`). Across workers, a symbol is only
+    fetched by the worker holding its `quote_leases` row; the others wait
+    for that worker to write the new price to `stock_status`. Fetched prices
+    are stored and cached before the leases are released.
+    """
+    if deadline_second is None:
+        deadline_second = CONFIG.api.batch_deadline_second
+    deadline = time.monotonic() + deadline_second
+
+    leading, following = [], {}
+    for symbol in symbols:
+        call, is_leader = in_flight.begin(symbol)
+        if is_leader:
+            leading.append(symbol)
+        else:
+            following[symbol] = call
+
+    quotes = {}
+    limit_error = None
+    try:
+        if leading:
+            owned, held_elsewhere = quote_leases.acquire(conn, leading)
+            try:
+                fetched, limit_error = fetch_quotes(
+                    owned, api_key, deadline_second, priority
+                )
+                store_quotes(conn, fetched.values())
+            finally:
+                quote_leases.release(conn, owned)
+
+            for symbol, quote in fetched.items():
+                quote_cache.put(symbol, quote)
+            quotes.update(fetched)
+            quotes.update(wait_for_leases(conn, held_elsewhere, deadline))
+    finally:
+        for symbol in leading:
+            in_flight.finish(symbol, quotes.get(symbol), limit_error)
+
+    for symbol, call in following.items():
+        quote, error = call.wait(max(0.0, deadline - time.monotonic()))
+        if quote is not None:
+            quotes[symbol] = quote
+        elif error is not None:
+            limit_error = error
+
+    return quotes, limit_error
+
+
+def wait_for_leases(conn, symbols, deadline):
+    """
+    Wait for other workers to refresh the symbols whose lease they hold
+    Args:
+        conn: an open sqlite3 connection outside of any transaction
+        symbols: a list of uppercase stock symbols
+        deadline: the time.monotonic() value after which waiting stops
+    Returns:
+        a dictionary mapping each refreshed symbol to its quote dictionary
+
+    A holder writes its price before releasing the lease, so once a lease
+    is gone or expired and the price is still not fresh, the holder failed
+    or was rate-limited: waiting for that symbol stops right away and the
+    caller falls back to the last known price.
+    """
+    quotes = {}
+    pending = list(symbols)
+
+    while pending and time.monotonic() < deadline:
+        time.sleep(LEASE_POLL_SECOND)
+        # Read the leases before the prices, see above
+        held = quote_leases.held(conn, pending)
+        stock_rows = read_stock_rows(conn, pending)
+        for symbol, stock_row in stock_rows.items():
+            if is_fresh(stock_row["time"]):
+                quote = {
+                    "symbol": stock_row["stock_symbol"],
+                    "price": stock_row["stock_price"],
+                }
+                quote_cache.put(symbol, quote)
+                quotes[symbol] = quote
+        pending = [
+            symbol for symbol in pending if symbol not in quotes and symbol in held
+        ]
+
+    return quotes
+
+
+def fetch_quotes(symbols, api_key, deadline_second=None, priority=PRIORITY_DISPLAY):
+    """
+    Fetch several quotes from the API concurrently
+    Args:
+        symbols: a list of uppercase stock symbols, most important first
+        api_key
+        deadline_second: the overall time budget for the whole batch,
+            defaults to CONFIG.api.batch_deadline_second
+        priority: the `rate_budget` priority of these calls
+    Returns:
+        a tuple (quotes, limit_error): quotes maps each requested symbol that
+        was resolved to its quote dictionary, limit_error is an ApiLimitError
+        if the shared budget or the API refused some of the calls, or None
+
+    Every call is first taken from the shared `rate_budget`; symbols beyond
+    the granted budget are not requested at all. Requests run on the shared
+    `fetch_executor`, so at most CONFIG.api.max_concurrent_requests of them
+    are in flight at once. Each request has its own timeout; symbols still
+    pending when the batch deadline passes are abandoned and left out of the
+    result.
+    """
+    if deadline_second is None:
+        deadline_second = CONFIG.api.batch_deadline_second
+
+    quotes = {}
+    limit_error = None
+
+    granted = rate_budget.acquire(len(symbols), priority)
+    if granted < len(symbols):
+        limit_error = ApiLimitError("API budget exhausted, try again later")
+        symbols = symbols[:granted]
+    if not symbols:
+        return quotes, limit_error
+
+    futures = {
+        fetch_executor.submit(fetch_quote, symbol, api_key): symbol
+        for symbol in symbols
+    }
+    done, not_done = wait(futures, timeout=deadline_second)
+
+    for future in not_done:
+        future.cancel()
+        logger.warning(LOG_DEADLINE_EXCEEDED, futures[future])
+
+    for future in done:
+        try:
+            quote = future.result()
+        except ApiLimitError as e:
+            limit_error = e
+            continue
+        if quote is not None:
+            quotes[futures[future]] = quote
+
+    if isinstance(limit_error, UpstreamLimitError):
+        rate_budget.mark_exhausted()
+
+    return quotes, limit_error
+
+
+def fetch_quote(symbol, api_key):
+    """
+    Perform API request to get the latest quote of one stock
+    Args:
+        symbol: an uppercase stock symbol
+        api_key
+    Returns:
+        a dictionary contains 2 keys about the stock: "symbol" and "price",
+        or None if the request failed or the symbol is invalid
+    Raises:
+        ApiLimitError: if the API rate limit is exceeded
+    """
+    params = {"function": "GLOBAL_QUOTE", "symbol": symbol, "apikey": api_key}
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()  # Raise an error for HTTP issues
-        data = response.json()  # Convert JSON-formatted string to dictionary
+        # Raises for HTTP issues, then converts the JSON body to a dictionary
+        data = get_upstream_client().get_json(params)
 
         print("API request on " + symbol)
 
         # Check for API rate limit
         if is_limited(data):
-            raise ApiLimitError("API Limit exceed, max 25 requests per day")
+            raise UpstreamLimitError("API Limit exceed, max 25 requests per day")
 
         if "Global Quote" in data:
             stock_data = data["Global Quote"]
@@ -74,33 +432,10 @@ def lookup(symbol, api_key):
         symbol = stock_data.get("01. symbol")
         price = float(stock_data.get("05. price", 0))  # Convert safely to float
 
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        cursor = conn.execute(
-            "SELECT 1 FROM stock_status WHERE stock_symbol = ?", (symbol,)
-        )
-        row = cursor.fetchone()
-
-        if row:
-            # Update if it exists
-            conn.execute(
-                "UPDATE stock_status SET stock_price = ?, time = ? WHERE stock_symbol = ?",
-                (price, now, symbol),
-            )
-        else:
-            # Insert if it does not exist
-            conn.execute(
-                "INSERT INTO stock_status (stock_symbol, stock_price, time) VALUES (?, ?, ?)",
-                (symbol, price, now),
-            )
-
-        conn.commit()
-
         return {"symbol": symbol, "price": price}
 
     except requests.exceptions.Timeout:
         print("Error: Request timed out.")
-        return {"error": "Request timed out. Try again later."}
     except requests.exceptions.RequestException as e:
         print(f"HTTP Request Error: {e}")
     except KeyError as e:
@@ -110,46 +445,50 @@ def lookup(symbol, api_key):
     return None
 
 
-# The size can be very big
-def get_all_active_stocks(api_key):
-    # replace the "demo" apikey below with your own key from https://www.alphavantage.co/support/#api-key
+def get_all_active_stocks(conn, api_key, batch_size=None):
+    """
+    Download the LISTING_STATUS CSV of active symbols into the `symbols` table.
+
+    The listing is large, so the body is streamed and parsed line by line and
+    stored in batches instead of being decoded whole. The call is charged to
+    the shared upstream budget.
+
+    Args:
+        conn: an open sqlite3 connection
+        api_key
+        batch_size: rows per transaction, defaults to api.ingest_batch_size
+    Returns:
+        the number of symbols stored
+    Raises:
+        ApiLimitError: if the upstream budget is exhausted
+        ValueError: if the upstream answered with an error instead of CSV
+    """
+    if rate_budget.acquire(1, PRIORITY_DISPLAY) == 0:
+        raise ApiLimitError("API budget exhausted, try again later")
+
+    params = {"function": "LISTING_STATUS", "apikey": api_key}
+    response = get_upstream_client().get(params, stream=True)
     try:
-        CSV_URL = f"https://www.alphavantage.co/query?function=LISTING_STATUS&apikey={api_key}"
-        stocks = []
-        with requests.Session() as s:
-            download = s.get(CSV_URL)
-            decoded_content = download.content.decode("utf-8")
-            cr = csv.reader(decoded_content.splitlines(), delimiter=",")
-            my_list = list(cr)
-            for row in my_list:
-                stocks.append(row)
-            return stocks
-    except (KeyError, ValueError, IndexError):
-        print("Error in get_all_active_stocks function")
-        return None
-
-
-# # Get n stocks
-# def get_all_active_stocks(api_key, amount):
-#     # replace the "demo" apikey below with your own key from https://www.alphavantage.co/support/#api-key
-#     try:
-#         CSV_URL = f'https://www.alphavantage.co/query?function=LISTING_STATUS&apikey={api_key}'
-#         stocks = []
-#         with requests.Session() as s:
-#             download = s.get(CSV_URL)
-#             decoded_content = download.content.decode('utf-8')
-#             cr = csv.reader(decoded_content.splitlines(), delimiter=',')
-#             my_list = list(cr)
-#             count = 0
-#             for row in my_list:
-#                 if (count >= amount):
-#                     return stocks
-#                 else:
-#                     stocks.append(row)
-#                     count += 1
-#     except (ValueError, IndexError, KeyError):
-#         print("Error in get_all_active_stocks function")
-#         return None
+        lines = codecs.iterdecode(response.iter_lines(), "utf-8")
+        first = next(lines, "")
+        if first.lstrip().startswith("{"):
+            payload = json.loads("".join(chain([first], lines)))
+            if is_limited(payload):
+                rate_budget.mark_exhausted()
+                raise UpstreamLimitError("API limit reached, try again later")
+            raise ValueError(f"Unexpected listing response: {payload}")
+
+        stored = store_symbols(
+            conn,
+            parse_listing_csv(chain([first], lines)),
+            datetime.now(),
+            batch_size or CONFIG.api.ingest_batch_size,
+        )
+    finally:
+        response.close()
+
+    logger.info(LOG_SYMBOLS_LOADED, stored)
+    return stored
 
 
 def is_invalid(stock_data):
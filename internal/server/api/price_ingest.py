@@ -0,0 +1,114 @@
+import codecs
+import json
+from itertools import chain
+
+from internal.server.api.API_handlers import is_limited
+from internal.server.api.rate_limiter import rate_budget, PRIORITY_DISPLAY
+from internal.server.api.upstream_client import get_upstream_client
+from internal.server.model.price_history import (
+    INTERVAL_DAILY,
+    parse_bars_csv,
+    store_bars,
+)
+from internal.server.utils.exception import ApiLimitError, UpstreamLimitError
+from internal.server.config import CONFIG
+from internal.core.logger import logger
+
+LOG_INGEST_DONE = "Ingested %s %s bars of %s from %s"
+
+
+def time_series_params(symbol, api_key, interval=INTERVAL_DAILY, outputsize="full"):
+    """Build the query of the Alpha Vantage TIME_SERIES_* call for interval, as CSV."""
+    params = {
+        "symbol": symbol,
+        "apikey": api_key,
+        "outputsize": outputsize,
+        "datatype": "csv",
+    }
+    if interval == INTERVAL_DAILY:
+        params["function"] = "TIME_SERIES_DAILY"
+    else:
+        params["function"] = "TIME_SERIES_INTRADAY"
+        params["interval"] = interval
+    return params
+
+
+def ingest_upstream(
+    conn, symbol, api_key, interval=INTERVAL_DAILY, outputsize="full", batch_size=None
+):
+    """
+    Download a TIME_SERIES_* series and store its bars.
+
+    The response body is parsed line by line as it arrives and written in
+    batches, so even a full intraday history is never held in memory at once.
+    The call is charged to the shared upstream budget.
+
+    Args:
+        conn: an open sqlite3 connection
+        symbol: the stock symbol
+        api_key: the Alpha Vantage API key
+        interval: INTERVAL_DAILY or an intraday interval such as "5min"
+        outputsize: "full" for the whole history or "compact" for the latest bars
+        batch_size: bars per transaction, defaults to api.ingest_batch_size
+    Returns:
+        the number of bars stored
+    Raises:
+        ApiLimitError: if the upstream budget is exhausted
+        ValueError: if the upstream answered with an error instead of CSV
+    """
+    symbol = symbol.upper()
+    if rate_budget.acquire(1, PRIORITY_DISPLAY) == 0:
+        raise ApiLimitError("API budget exhausted, try again later")
+
+    response = get_upstream_client().get(
+        time_series_params(symbol, api_key, interval, outputsize), stream=True
+    )
+    try:
+        lines = codecs.iterdecode(response.iter_lines(), "utf-8")
+        first = next(lines, "")
+        if first.lstrip().startswith("{"):
+            # Errors and rate limit notices come back as JSON even for datatype=csv
+            payload = json.loads("".join(chain([first], lines)))
+            if is_limited(payload):
+                rate_budget.mark_exhausted()
+                raise UpstreamLimitError("API limit reached, try again later")
+            raise ValueError(f"Unexpected time series response: {payload}")
+
+        stored = store_bars(
+            conn,
+            symbol,
+            interval,
+            parse_bars_csv(chain([first], lines)),
+            batch_size or CONFIG.api.ingest_batch_size,
+        )
+    finally:
+        response.close()
+
+    logger.info(LOG_INGEST_DONE, stored, interval, symbol, "upstream")
+    return stored
+
+
+def ingest_csv_file(conn, symbol, path, interval=INTERVAL_DAILY, batch_size=None):
+    """
+    Store the bars of a local CSV file, e.g. a saved TIME_SERIES_* download.
+    Args:
+        conn: an open sqlite3 connection
+        symbol: the stock symbol
+        path: the path of the CSV file
+        interval: INTERVAL_DAILY or an intraday interval such as "5min"
+        batch_size: bars per transaction, defaults to api.ingest_batch_size
+    Returns:
+        the number of bars stored
+    """
+    symbol = symbol.upper()
+    with open(path, "r", newline="") as file:
+        stored = store_bars(
+            conn,
+            symbol,
+            interval,
+            parse_bars_csv(file),
+            batch_size or CONFIG.api.ingest_batch_size,
+        )
+
+    logger.info(LOG_INGEST_DONE, stored, interval, symbol, path)
+    return stored
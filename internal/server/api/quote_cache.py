@@ -0,0 +1,18 @@
+from internal.server.config import CONFIG
+from internal.server.utils.ttl_cache import TTLCache
+
+
+class QuoteCache(TTLCache):
+    """
+    In-process LRU cache of stock quotes, keyed by uppercase stock symbol.
+
+    Sits in front of the `stock_status` table so repeated lookups of the same
+    symbol skip the DB round-trip and the date parsing. Every entry carries its
+    own expiry time; expired entries are treated as misses and dropped.
+    """
+
+
+quote_cache = QuoteCache(
+    max_size=CONFIG.api.cache_max_size,
+    ttl_second=CONFIG.api.time_to_update_second,
+)
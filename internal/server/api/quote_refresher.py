@@ -0,0 +1,162 @@
+import threading
+from datetime import datetime, timedelta
+
+from internal.server.api.API_handlers import (
+    price_expiry,
+    read_stock_rows,
+    refresh_quotes,
+)
+from internal.server.api.rate_limiter import rate_budget
+from internal.server.api.symbol_demand import symbol_demand
+from internal.server.model.sqlite_connection import connect
+from internal.server.config import CONFIG
+from internal.core.logger import logger
+
+LOG_REFRESHER_START = "Quote refresher started (interval=%ss, lead=%ss)"
+LOG_REFRESHER_STOP = "Quote refresher stopped"
+LOG_REFRESHER_CYCLE = (
+    "Quote refresher: %s due, refreshed %s, shared budget left today %s"
+)
+LOG_REFRESHER_ERROR = "Quote refresher cycle failed: %s"
+
+SELECT_MOST_HELD = """
+    SELECT stock_symbol FROM user_stocks
+    GROUP BY stock_symbol
+    ORDER BY COUNT(*) DESC
+    LIMIT ?
+"""
+
+DEMAND_DECAY = 0.5
+
+
+class QuoteRefresher:
+    """
+    Background job that refreshes hot quotes before they go stale.
+
+    Every cycle it picks the most requested symbols (from `symbol_demand`)
+    and the most held symbols (from `user_stocks`), and refreshes those whose
+    `stock_status` price expires within `lead_second`, soonest first. A cycle
+    asks for at most max_calls_per_cycle symbols, and every call is taken
+    from the shared `rate_budget` at display priority, so the refreshers of
+    every worker together stay within the API quota and never touch the
+    calls reserved for trades.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        interval_second,
+        lead_second,
+        hot_symbols,
+        max_calls_per_cycle,
+    ):
+        self.api_key = api_key
+        self.interval_second = interval_second
+        self.lead_second = lead_second
+        self.hot_symbols = hot_symbols
+        self.max_calls_per_cycle = max_calls_per_cycle
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the refresher on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="quote-refresher", daemon=True
+        )
+        self._thread.start()
+        logger.info(LOG_REFRESHER_START, self.interval_second, self.lead_second)
+
+    def stop(self, timeout=None):
+        """Ask the refresher to stop and wait for the current cycle to end."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info(LOG_REFRESHER_STOP)
+
+    def run_forever(self):
+        """Run the refresher on the calling thread until stop() is called."""
+        logger.info(LOG_REFRESHER_START, self.interval_second, self.lead_second)
+        self._run()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.error(LOG_REFRESHER_ERROR, e)
+            self._stop_event.wait(self.interval_second)
+
+    def refresh_once(self):
+        """
+        Run a single refresh cycle.
+        Returns:
+            the list of symbols that were refreshed
+        """
+        conn = connect()
+        try:
+            candidates = self.candidates(conn)
+            due = self.due_symbols(conn, candidates)
+
+            refreshed = []
+            if due:
+                fetched, _ = refresh_quotes(
+                    conn, due[: self.max_calls_per_cycle], self.api_key
+                )
+                refreshed = list(fetched)
+
+            symbol_demand.decay(DEMAND_DECAY)
+            budget = rate_budget.stats()
+            logger.debug(
+                LOG_REFRESHER_CYCLE,
+                len(due),
+                len(refreshed),
+                budget["daily_quota"] - budget["used_today"],
+            )
+            return refreshed
+        finally:
+            conn.close()
+
+    def candidates(self, conn):
+        """Return the hot symbols: most requested first, then most held."""
+        held = [
+            row["stock_symbol"]
+            for row in conn.execute(SELECT_MOST_HELD, (self.hot_symbols,)).fetchall()
+        ]
+        return list(dict.fromkeys(symbol_demand.top(self.hot_symbols) + held))
+
+    def due_symbols(self, conn, symbols):
+        """
+        Return the symbols whose price is missing or expires within
+        lead_second, ordered by expiry time.
+        """
+        if not symbols:
+            return []
+
+        rows = read_stock_rows(conn, symbols)
+        horizon = datetime.now() + timedelta(seconds=self.lead_second)
+
+        due = []
+        for symbol in symbols:
+            row = rows.get(symbol)
+            expires_at = price_expiry(row["time"]) if row is not None else datetime.min
+            if expires_at <= horizon:
+                due.append((expires_at, symbol))
+
+        due.sort()
+        return [symbol for _, symbol in due]
+
+
+def build_quote_refresher(api_key) -> QuoteRefresher:
+    """Create a QuoteRefresher from CONFIG.api.refresher."""
+    refresher_config = CONFIG.api.refresher
+    return QuoteRefresher(
+        api_key=api_key,
+        interval_second=refresher_config.interval_second,
+        lead_second=refresher_config.lead_second,
+        hot_symbols=refresher_config.hot_symbols,
+        max_calls_per_cycle=refresher_config.max_calls_per_cycle,
+    )
@@ -0,0 +1,151 @@
+import sqlite3
+import time
+from datetime import date, datetime
+
+from internal.server.model.sqlite_connection import pooled_connection
+from internal.server.config import CONFIG
+
+PRIORITY_TRADE = "trade"
+PRIORITY_DISPLAY = "display"
+
+SELECT_BUDGET = "SELECT * FROM api_budget WHERE name = ?"
+INSERT_BUDGET = (
+    "INSERT INTO api_budget (name, tokens, refilled_at, day, day_count) "
+    "VALUES (?, ?, ?, ?, 0)"
+)
+UPDATE_BUDGET = (
+    "UPDATE api_budget SET tokens = ?, refilled_at = ?, day = ?, day_count = ? "
+    "WHERE name = ?"
+)
+BLOCK_BUDGET = "UPDATE api_budget SET tokens = 0, blocked_until = ? WHERE name = ?"
+
+
+class RateBudget:
+    """
+    Upstream call budget shared by every worker process.
+
+    Combines a token bucket (requests_per_minute, with a burst of one minute
+    worth of calls) with a daily quota. The state lives in the `api_budget`
+    table and every change happens in a `BEGIN IMMEDIATE` transaction, so all
+    gunicorn workers using the same database draw from the same budget.
+
+    The last `reserved_for_trades` calls of each day can only be spent by
+    trade-critical lookups (`/buy`, `/sell`), so display pages run out first.
+    """
+
+    def __init__(
+        self,
+        name,
+        requests_per_minute,
+        daily_quota,
+        reserved_for_trades,
+        limited_cooldown_second,
+        connection=pooled_connection,
+    ):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.daily_quota = daily_quota
+        self.reserved_for_trades = reserved_for_trades
+        self.limited_cooldown_second = limited_cooldown_second
+        self.connection = connection
+
+    def acquire(self, count=1, priority=PRIORITY_DISPLAY):
+        """
+        Take up to count calls from the budget.
+        Args:
+            count: the number of upstream calls the caller wants to make
+            priority: PRIORITY_TRADE or PRIORITY_DISPLAY
+        Returns:
+            the number of calls granted, between 0 and count
+        """
+        if count <= 0:
+            return 0
+
+        now = time.time()
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = self._load(conn, now)
+
+            if row["blocked_until"] > now:
+                conn.rollback()
+                return 0
+
+            tokens = self._refill(row, now)
+            day, day_count = row["day"], row["day_count"]
+            if day != date.today().isoformat():
+                day, day_count = date.today().isoformat(), 0
+
+            daily_limit = self.daily_quota
+            if priority != PRIORITY_TRADE:
+                daily_limit -= self.reserved_for_trades
+
+            granted = max(0, min(count, int(tokens), daily_limit - day_count))
+            conn.execute(
+                UPDATE_BUDGET,
+                (tokens - granted, now, day, day_count + granted, self.name),
+            )
+            conn.commit()
+            return granted
+
+    def mark_exhausted(self):
+        """
+        Record that the upstream refused a call for exceeding its rate limit.
+        No calls are granted until limited_cooldown_second has passed.
+        """
+        now = time.time()
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._load(conn, now)
+            conn.execute(BLOCK_BUDGET, (now + self.limited_cooldown_second, self.name))
+            conn.commit()
+
+    def stats(self):
+        """
+        Return the current budget state.
+        Returns:
+            a dictionary with tokens, used_today, daily_quota and blocked_until
+        """
+        now = time.time()
+        with self.connection() as conn:
+            row = self._load(conn, now)
+            conn.commit()
+
+        used_today = row["day_count"] if row["day"] == date.today().isoformat() else 0
+        return {
+            "tokens": self._refill(row, now),
+            "used_today": used_today,
+            "daily_quota": self.daily_quota,
+            "blocked_until": datetime.fromtimestamp(row["blocked_until"]),
+        }
+
+    def _load(self, conn, now):
+        row = conn.execute(SELECT_BUDGET, (self.name,)).fetchone()
+        if row is None:
+            try:
+                conn.execute(
+                    INSERT_BUDGET,
+                    (
+                        self.name,
+                        self.requests_per_minute,
+                        now,
+                        date.today().isoformat(),
+                    ),
+                )
+            except sqlite3.IntegrityError:
+                pass  # Another worker created the row first
+            row = conn.execute(SELECT_BUDGET, (self.name,)).fetchone()
+        return row
+
+    def _refill(self, row, now):
+        elapsed = max(0.0, now - row["refilled_at"])
+        refill = elapsed * self.requests_per_minute / 60
+        return min(float(self.requests_per_minute), row["tokens"] + refill)
+
+
+rate_budget = RateBudget(
+    name="alpha_vantage",
+    requests_per_minute=CONFIG.api.rate_limit.requests_per_minute,
+    daily_quota=CONFIG.api.rate_limit.daily_quota,
+    reserved_for_trades=CONFIG.api.rate_limit.reserved_for_trades,
+    limited_cooldown_second=CONFIG.api.rate_limit.limited_cooldown_second,
+)
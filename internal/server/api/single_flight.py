@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+import uuid
+
+TAKE_LEASE = (
+    "INSERT INTO quote_leases (stock_symbol, owner, expires_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(stock_symbol) DO UPDATE SET "
+    "owner = excluded.owner, expires_at = excluded.expires_at "
+    "WHERE quote_leases.expires_at < ? OR quote_leases.owner = excluded.owner"
+)
+RELEASE_LEASE = "DELETE FROM quote_leases WHERE stock_symbol = ? AND owner = ?"
+SELECT_HELD_LEASES = (
+    "SELECT stock_symbol FROM quote_leases "
+    "WHERE expires_at >= ? AND stock_symbol IN ({})"
+)
+
+
+class _Call:
+    """One in-flight call that followers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        """
+        Wait for the leader to finish.
+        Returns:
+            a tuple (result, error); both are None if the timeout expired
+        """
+        if not self.event.wait(timeout):
+            return None, None
+        return self.result, self.error
+
+
+class SingleFlight:
+    """
+    In-process call deduplication keyed by an arbitrary string.
+
+    The first caller of a key becomes its leader and does the work; callers
+    that arrive while the leader is running become followers and wait for the
+    leader's result instead of repeating the work.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """
+        Join the in-flight call for key, or start a new one.
+        Returns:
+            a tuple (call, is_leader). The leader must call finish() for key.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            return call, True
+
+    def finish(self, key, result=None, error=None):
+        """Publish the leader's result and wake up every follower."""
+        with self._lock:
+            call = self._calls.pop(key)
+        call.result = result
+        call.error = error
+        call.event.set()
+
+    def do(self, key, fn):
+        """Run fn once per key at a time and share its return value."""
+        call, is_leader = self.begin(key)
+        if not is_leader:
+            result, error = call.wait()
+            if error is not None:
+                raise error
+            return result
+
+        try:
+            result = fn()
+        except Exception as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result=result)
+        return result
+
+
+class QuoteLeases:
+    """
+    Cross-process single-flight using lease rows in SQLite.
+
+    A worker may only fetch a symbol from the upstream while it holds the
+    symbol's row in `quote_leases`. Leases expire after lease_second, so a
+    crashed worker cannot block a symbol forever.
+    """
+
+    def __init__(self, lease_second, owner=None):
+        self.lease_second = lease_second
+        self.owner = owner or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def acquire(self, conn, symbols):
+        """
+        Take the leases of as many symbols as possible in one transaction.
+        Args:
+            conn: an open sqlite3 connection outside of any transaction
+            symbols: a list of uppercase stock symbols
+        Returns:
+            a tuple (owned, held_elsewhere) of symbol lists
+        """
+        now = time.time()
+        owned, held_elsewhere = [], []
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for symbol in symbols:
+                cursor = conn.execute(
+                    TAKE_LEASE, (symbol, self.owner, now + self.lease_second, now)
+                )
+                (owned if cursor.rowcount == 1 else held_elsewhere).append(symbol)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return owned, held_elsewhere
+
+    def held(self, conn, symbols):
+        """
+        Return the subset of symbols whose lease is currently held by any
+        worker, this one included. Expired leases count as free.
+        """
+        if not symbols:
+            return set()
+        placeholders = ", ".join("?" for _ in symbols)
+        rows = conn.execute(
+            SELECT_HELD_LEASES.format(placeholders), (time.time(), *symbols)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def release(self, conn, symbols):
+        """Give back the leases of symbols held by this process."""
+        if not symbols:
+            return
+        conn.executemany(RELEASE_LEASE, [(symbol, self.owner) for symbol in symbols])
+        conn.commit()
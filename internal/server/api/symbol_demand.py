@@ -0,0 +1,41 @@
+import threading
+from collections import Counter
+
+
+class SymbolDemand:
+    """
+    Thread-safe counter of how often each symbol is looked up.
+
+    Counts are decayed periodically by the quote refresher, so the ranking
+    follows recent traffic rather than all-time totals.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, symbols):
+        """Count one request for each symbol."""
+        with self._lock:
+            self._counts.update(symbols)
+
+    def top(self, n):
+        """Return the n most requested symbols, most requested first."""
+        with self._lock:
+            return [symbol for symbol, _ in self._counts.most_common(n)]
+
+    def decay(self, factor):
+        """
+        Multiply every count by factor and forget symbols that drop below one
+        request.
+        """
+        with self._lock:
+            for symbol in list(self._counts):
+                count = self._counts[symbol] * factor
+                if count < 1:
+                    del self._counts[symbol]
+                else:
+                    self._counts[symbol] = count
+
+
+symbol_demand = SymbolDemand()
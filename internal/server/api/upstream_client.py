@@ -0,0 +1,157 @@
+import io
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.util.retry import Retry
+
+from internal.server.config import CONFIG
+from internal.server.instrumentation.metrics import UPSTREAM_DURATION, registry
+
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+class UpstreamClient:
+    """
+    Shared HTTP client for Alpha Vantage calls.
+
+    Wraps a single `requests.Session` whose adapter keeps a pool of
+    keep-alive connections, so repeated quotes reuse the same TCP/TLS
+    connection instead of paying a new handshake. Idempotent GETs are
+    retried with exponential backoff on 5xx responses and timeouts.
+
+    The connection pool is thread-safe, and the client never relies on
+    cookies, so one instance is shared by every request thread.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        pool_size,
+        max_retries,
+        retry_backoff_second,
+        connect_timeout_second,
+        read_timeout_second,
+        transport=None,
+    ):
+        self.base_url = base_url
+        self.timeout = (connect_timeout_second, read_timeout_second)
+
+        if transport is None:
+            retry = Retry(
+                total=max_retries,
+                backoff_factor=retry_backoff_second,
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=("GET",),
+                raise_on_status=False,
+            )
+            transport = HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+            )
+
+        self.session = requests.Session()
+        self.session.mount("http://", transport)
+        self.session.mount("https://", transport)
+
+    def get(self, params, stream=False):
+        """
+        Send a GET request to the API.
+        Args:
+            params: a dictionary of query parameters, e.g. {"function": ...}
+            stream: keep the body unread so it can be iterated lazily
+        Returns:
+            the `requests.Response`, already checked with raise_for_status()
+        """
+        started = time.perf_counter()
+        try:
+            response = self.session.get(
+                self.base_url, params=params, timeout=self.timeout, stream=stream
+            )
+        finally:
+            registry.observe(UPSTREAM_DURATION, (), time.perf_counter() - started)
+        response.raise_for_status()
+        return response
+
+    def get_json(self, params):
+        """Send a GET request and decode the JSON body."""
+        return self.get(params).json()
+
+    def close(self):
+        """Close every pooled connection."""
+        self.session.close()
+
+
+class StubTransport(BaseAdapter):
+    """
+    Offline transport that answers requests from a Python callable.
+
+    The handler receives the `requests.PreparedRequest` and returns either a
+    dictionary (sent back as a 200 JSON body), a string, or a tuple
+    (status_code, body). Mount it through `UpstreamClient(transport=...)`.
+    """
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.requests = []
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        self.requests.append(request)
+        result = self.handler(request)
+
+        status_code, body = result if isinstance(result, tuple) else (200, result)
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = body
+        response.raw = io.BytesIO(body)
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_upstream_client() -> UpstreamClient:
+    """
+    Returns the process-wide UpstreamClient, creating it from CONFIG.api
+    on first use.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UpstreamClient(
+                    base_url=CONFIG.api.base_url,
+                    pool_size=CONFIG.api.pool_size,
+                    max_retries=CONFIG.api.max_retries,
+                    retry_backoff_second=CONFIG.api.retry_backoff_second,
+                    connect_timeout_second=CONFIG.api.connect_timeout_second,
+                    read_timeout_second=CONFIG.api.request_timeout_second,
+                )
+    return _client
+
+
+def set_upstream_client(client):
+    """
+    Replace the process-wide client, e.g. with one built on a StubTransport.
+    Returns the previous client.
+    """
+    global _client
+
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
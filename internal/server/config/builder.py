@@ -5,21 +5,53 @@ from internal.server.config.config_object import (
     Database,
     Core,
     Logger,
+    LogQueue,
+    LogRotation,
     Bugger,
     Api,
+    RateLimit,
+    Refresher,
+    Portfolio,
+    OrderQueue,
+    Session,
+    Instrumentation,
+    Profiler,
     Test,
 )
 
 
 def build_config_from_dict(raw: Dict) -> Config:
     print("------------------------ CONFIG INITIALIZE ------------------------")
+    api = dict(raw.get("api", {}))
+    rate_limit = api.pop("rate_limit", {})
+    refresher = api.pop("refresher", {})
+    portfolio = dict(raw.get("portfolio", {}))
+    order_queue = portfolio.pop("order_queue", {})
+    logger = dict(raw.get("core", {}).get("logger", {}))
+    log_queue = logger.pop("queue", {})
+    log_rotation = logger.pop("rotation", {})
+    instrumentation = dict(raw.get("instrumentation", {}))
+    profiler = instrumentation.pop("profiler", {})
     return Config(
         app=App(**raw.get("app", {})),
         database=Database(**raw.get("database", {})),
         core=Core(
-            logger=Logger(**raw.get("core", {}).get("logger", {})),
+            logger=Logger(
+                **logger,
+                queue=LogQueue(**log_queue),
+                rotation=LogRotation(**log_rotation),
+            ),
             bugger=Bugger(**raw.get("core", {}).get("bugger", {})),
         ),
-        api=Api(**raw.get("api", {})),
+        api=Api(
+            **api,
+            rate_limit=RateLimit(**rate_limit),
+            refresher=Refresher(**refresher),
+        ),
+        portfolio=Portfolio(**portfolio, order_queue=OrderQueue(**order_queue)),
+        session=Session(**raw.get("session", {})),
+        instrumentation=Instrumentation(
+            **instrumentation, profiler=Profiler(**profiler)
+        ),
         test=Test(**raw.get("test", {})),
     )
@@ -1,9 +1,14 @@
 class Config:
-    def __init__(self, app, database, core, api, test):
+    def __init__(
+        self, app, database, core, api, portfolio, session, instrumentation, test
+    ):
         self.app = app
         self.database = database
         self.core = core
         self.api = api
+        self.portfolio = portfolio
+        self.session = session
+        self.instrumentation = instrumentation
         self.test = test
 
 
@@ -16,10 +21,23 @@ class App:
 
 
 class Database:
-    def __init__(self, db_name, db_type, timeout_second):
+    def __init__(
+        self,
+        db_name,
+        db_type,
+        timeout_second,
+        migrate_on_startup,
+        pool_size,
+        cache_size_kib,
+        mmap_size_bytes,
+    ):
         self.db_name = db_name
         self.db_type = db_type
         self.timeout_second = timeout_second
+        self.migrate_on_startup = migrate_on_startup
+        self.pool_size = pool_size
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size_bytes = mmap_size_bytes
 
 
 class Core:
@@ -29,8 +47,127 @@ class Core:
 
 
 class Api:
-    def __init__(self, time_to_update_second):
+    def __init__(
+        self,
+        base_url,
+        time_to_update_second,
+        cache_max_size,
+        max_concurrent_requests,
+        request_timeout_second,
+        batch_deadline_second,
+        connect_timeout_second,
+        pool_size,
+        max_retries,
+        retry_backoff_second,
+        lease_second,
+        ingest_batch_size,
+        rate_limit,
+        refresher,
+    ):
+        self.base_url = base_url
         self.time_to_update_second = time_to_update_second
+        self.cache_max_size = cache_max_size
+        self.max_concurrent_requests = max_concurrent_requests
+        self.request_timeout_second = request_timeout_second
+        self.batch_deadline_second = batch_deadline_second
+        self.connect_timeout_second = connect_timeout_second
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.retry_backoff_second = retry_backoff_second
+        self.lease_second = lease_second
+        self.ingest_batch_size = ingest_batch_size
+        self.rate_limit = rate_limit
+        self.refresher = refresher
+
+
+class RateLimit:
+    def __init__(
+        self,
+        requests_per_minute,
+        daily_quota,
+        reserved_for_trades,
+        limited_cooldown_second,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.daily_quota = daily_quota
+        self.reserved_for_trades = reserved_for_trades
+        self.limited_cooldown_second = limited_cooldown_second
+
+
+class Refresher:
+    def __init__(
+        self,
+        enabled,
+        standalone,
+        interval_second,
+        lead_second,
+        hot_symbols,
+        max_calls_per_cycle,
+    ):
+        self.enabled = enabled
+        self.standalone = standalone
+        self.interval_second = interval_second
+        self.lead_second = lead_second
+        self.hot_symbols = hot_symbols
+        self.max_calls_per_cycle = max_calls_per_cycle
+
+
+class Portfolio:
+    def __init__(
+        self,
+        history_page_size,
+        history_max_page_size,
+        history_export_batch_size,
+        leaderboard_size,
+        order_queue,
+    ):
+        self.history_page_size = history_page_size
+        self.history_max_page_size = history_max_page_size
+        self.history_export_batch_size = history_export_batch_size
+        self.leaderboard_size = leaderboard_size
+        self.order_queue = order_queue
+
+
+class OrderQueue:
+    def __init__(
+        self, enabled, max_batch_size, max_latency_second, max_pending, wait_second
+    ):
+        self.enabled = enabled
+        self.max_batch_size = max_batch_size
+        self.max_latency_second = max_latency_second
+        self.max_pending = max_pending
+        self.wait_second = wait_second
+
+
+class Session:
+    def __init__(
+        self,
+        backend,
+        lifetime_second,
+        cache_max_size,
+        cache_ttl_second,
+        sweep_interval_second,
+        sweep_batch_size,
+    ):
+        self.backend = backend
+        self.lifetime_second = lifetime_second
+        self.cache_max_size = cache_max_size
+        self.cache_ttl_second = cache_ttl_second
+        self.sweep_interval_second = sweep_interval_second
+        self.sweep_batch_size = sweep_batch_size
+
+
+class Instrumentation:
+    def __init__(self, enabled, local_only, profiler):
+        self.enabled = enabled
+        self.local_only = local_only
+        self.profiler = profiler
+
+
+class Profiler:
+    def __init__(self, enabled, interval_second):
+        self.enabled = enabled
+        self.interval_second = interval_second
 
 
 class Test:
@@ -42,9 +179,28 @@ class Test:
 
 
 class Logger:
-    def __init__(self, level, filename):
+    def __init__(self, level, filename, format, sampling, queue, rotation):
         self.level = level
         self.filename = filename
+        self.format = format
+        self.sampling = sampling
+        self.queue = queue
+        self.rotation = rotation
+
+
+class LogQueue:
+    def __init__(self, size, overflow, batch_size):
+        self.size = size
+        self.overflow = overflow
+        self.batch_size = batch_size
+
+
+class LogRotation:
+    def __init__(self, mode, max_bytes, backup_count, when):
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.when = when
 
 
 class Bugger:
@@ -0,0 +1,248 @@
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+# Default histogram bucket bounds, in seconds
+DEFAULT_BUCKETS_SECOND = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+REQUEST_DURATION = "finance_request_duration_seconds"
+REQUEST_LATENCY = "finance_request_latency_seconds"
+SPAN_DURATION = "finance_span_duration_seconds"
+UPSTREAM_DURATION = "finance_upstream_duration_seconds"
+
+HELP = {
+    REQUEST_DURATION: "Time spent handling a request, by route.",
+    REQUEST_LATENCY: "p50/p95/p99 of the request time by route, from the histogram.",
+    SPAN_DURATION: "Time spent in a span (db, quote tiers, render) per request.",
+    UPSTREAM_DURATION: "Time of each upstream API call.",
+}
+
+SPAN_DB = "db"
+SPAN_QUOTE_CACHE = "quote.cache"
+SPAN_QUOTE_DB = "quote.db"
+SPAN_QUOTE_UPSTREAM = "quote.upstream"
+SPAN_RENDER = "render"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as exposed by Prometheus."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_SECOND):
+        self.buckets = tuple(sorted(buckets))
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def copy(self):
+        copied = Histogram(self.buckets)
+        copied.counts = list(self.counts)
+        copied.sum = self.sum
+        copied.count = self.count
+        return copied
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by linear interpolation inside its bucket, like
+        Prometheus' histogram_quantile. Returns None when empty.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Histograms keyed by metric name and label values, safe across threads."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_SECOND):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, labels, value):
+        """
+        Add value to the histogram of name with labels, a tuple of
+        (label, value) pairs.
+        """
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def histogram(self, name, labels=()):
+        return self._histograms.get((name, labels))
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self, gauges=()):
+        """
+        Render every histogram in the Prometheus text exposition format,
+        followed by the p50/p95/p99 of the request histograms as a summary.
+        Args:
+            gauges: (name, help, value) tuples of extra gauges to expose
+        """
+        with self._lock:
+            snapshot = sorted(
+                (name, labels, histogram.copy())
+                for (name, labels), histogram in self._histograms.items()
+            )
+
+        lines = []
+        seen = set()
+        for name, labels, histogram in snapshot:
+            counts, total, count = histogram.counts, histogram.sum, histogram.count
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = (("le", _format_value(bound)),)
+                lines.append(f"{name}_bucket{_labels(labels + le)} {cumulative}")
+            lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f"{name}_sum{_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        requests = [row for row in snapshot if row[0] == REQUEST_DURATION]
+        if requests:
+            lines.append(f"# HELP {REQUEST_LATENCY} {HELP[REQUEST_LATENCY]}")
+            lines.append(f"# TYPE {REQUEST_LATENCY} summary")
+            for _, labels, histogram in requests:
+                total, count = histogram.sum, histogram.count
+                for q in QUANTILES:
+                    quantile = (("quantile", str(q)),)
+                    value = _format_value(histogram.quantile(q))
+                    lines.append(
+                        f"{REQUEST_LATENCY}{_labels(labels + quantile)} {value}"
+                    )
+                lines.append(
+                    f"{REQUEST_LATENCY}_sum{_labels(labels)} {_format_value(total)}"
+                )
+                lines.append(f"{REQUEST_LATENCY}_count{_labels(labels)} {count}")
+
+        for name, help_text, value in gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    return "NaN" if value is None else repr(float(value))
+
+
+registry = MetricsRegistry()
+
+# Spans of the request handled by the current thread, name -> seconds.
+# Unset outside of an instrumented request, where spans record nothing.
+_local = threading.local()
+
+
+def begin_request():
+    """Start collecting the spans of the request handled by this thread."""
+    _local.spans = {}
+
+
+def end_request():
+    """Stop collecting spans on this thread and return those of the request."""
+    spans = getattr(_local, "spans", None)
+    _local.spans = None
+    return spans or {}
+
+
+def record_span(name, seconds):
+    """Add seconds to the span name of the current request, if any."""
+    spans = getattr(_local, "spans", None)
+    if spans is not None:
+        spans[name] = spans.get(name, 0.0) + seconds
+
+
+class span:
+    """Time a block as the span name of the current request: `with span("db"): ...`."""
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record_span(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that times execute, executemany and commit into the
+    "db" span. For a SELECT, execute covers the time to the first row.
+    """
+
+    def execute(self, *args):
+        started = time.perf_counter()
+        try:
+            return super().execute(*args)
+        finally:
+            record_span(SPAN_DB, time.perf_counter() - started)
+
+    def executemany(self, *args):
+        started = time.perf_counter()
+        try:
+            return super().executemany(*args)
+        finally:
+            record_span(SPAN_DB, time.perf_counter() - started)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            record_span(SPAN_DB, time.perf_counter() - started)
@@ -0,0 +1,80 @@
+import time
+
+from flask import Flask, before_render_template, g, request, template_rendered
+
+from internal.server.config import CONFIG
+from internal.server.instrumentation.metrics import (
+    REQUEST_DURATION,
+    SPAN_DURATION,
+    SPAN_RENDER,
+    begin_request,
+    end_request,
+    record_span,
+    registry,
+)
+from internal.server.instrumentation.profiler import SamplingProfiler
+
+
+def init_instrumentation(app: Flask):
+    """
+    Time every request and the spans recorded while handling it.
+
+    The request time goes to a per-route histogram, every span (db, quote
+    tiers, render) to a per-route, per-span histogram, and the spans of the
+    request are returned in a Server-Timing header. The sampling profiler
+    is attached to `app.extensions["profiler"]` and started if enabled.
+    """
+    app.before_request(_start_request)
+    app.after_request(_record_request)
+    app.teardown_request(_discard_request)
+    before_render_template.connect(_start_render, app, weak=False)
+    template_rendered.connect(_end_render, app, weak=False)
+
+    profiler = SamplingProfiler(CONFIG.instrumentation.profiler.interval_second)
+    app.extensions["profiler"] = profiler
+    if CONFIG.instrumentation.profiler.enabled:
+        profiler.start()
+
+
+def server_timing(spans, total):
+    """Build a Server-Timing header value from span seconds."""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in spans.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    begin_request()
+
+
+def _record_request(response):
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    spans = end_request()
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    registry.observe(
+        REQUEST_DURATION, (("route", route), ("method", request.method)), elapsed
+    )
+    for name, seconds in spans.items():
+        registry.observe(SPAN_DURATION, (("route", route), ("span", name)), seconds)
+    response.headers["Server-Timing"] = server_timing(spans, elapsed)
+    return response
+
+
+def _discard_request(exception=None):
+    # Requests that failed before after_request must not leak their spans
+    end_request()
+
+
+def _start_render(sender, template, context, **extra):
+    g.setdefault("render_started", []).append(time.perf_counter())
+
+
+def _end_render(sender, template, context, **extra):
+    started = g.get("render_started")
+    if started:
+        record_span(SPAN_RENDER, time.perf_counter() - started.pop())
@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the stack of every thread.
+
+    Every interval_second a background thread reads `sys._current_frames()`
+    and counts each stack, so the cost is independent of how much code runs
+    and nothing is traced. Stacks are reported in the collapsed format of
+    flame graph tools: "file:function;file:function count", root first.
+    """
+
+    def __init__(self, interval_second=0.01, max_depth=64):
+        self.interval_second = interval_second
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+
+    def collapsed(self):
+        """Return the sampled stacks in collapsed format, most frequent first."""
+        with self._lock:
+            stacks = self.samples.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_second):
+            stacks = [
+                self._collapse(frame)
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id != own_id
+            ]
+            with self._lock:
+                self.samples.update(stacks)
+
+    def _collapse(self, frame):
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
@@ -0,0 +1,138 @@
+import base64
+import csv
+import io
+import json
+
+HISTORY_COLUMNS = ("id", "type", "stock_symbol", "stock_price", "shares_amount", "time")
+
+SELECT_HISTORY_PAGE = """
+    SELECT id, type, stock_symbol, stock_price, shares_amount, time
+    FROM history_logs
+    WHERE user_id = ?
+    ORDER BY time DESC, id DESC
+    LIMIT ?
+"""
+SELECT_HISTORY_PAGE_AFTER = """
+    SELECT id, type, stock_symbol, stock_price, shares_amount, time
+    FROM history_logs
+    WHERE user_id = ? AND (time, id) < (?, ?)
+    ORDER BY time DESC, id DESC
+    LIMIT ?
+"""
+SELECT_TRADES_AFTER = """
+    SELECT id, type, stock_symbol, stock_price, shares_amount, time
+    FROM history_logs
+    WHERE user_id = ? AND (time, id) > (?, ?)
+    ORDER BY time, id
+    LIMIT ?
+"""
+
+
+def encode_cursor(row):
+    """Build the opaque cursor pointing just past row in the history order."""
+    raw = f"{row['time']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Split a cursor built by `encode_cursor` back into its (time, id) key.
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        time, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return time, int(row_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor!r}") from e
+
+
+def load_history_page(conn, user_id, page_size, cursor=None):
+    """
+    Load one page of a user's trades, newest first.
+
+    Pages are keyed on (time, id) instead of an offset, so every page is a
+    range scan of the (user_id, time, id) index no matter how deep it is.
+
+    Args:
+        conn: an open sqlite3 connection
+        user_id: the id of the user
+        page_size: the maximum number of rows to return
+        cursor: the `next_cursor` of the previous page, or None for the first page
+    Returns:
+        a tuple (rows, next_cursor). next_cursor is None on the last page.
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    if cursor:
+        time, row_id = decode_cursor(cursor)
+        rows = conn.execute(
+            SELECT_HISTORY_PAGE_AFTER, (user_id, time, row_id, page_size + 1)
+        ).fetchall()
+    else:
+        rows = conn.execute(SELECT_HISTORY_PAGE, (user_id, page_size + 1)).fetchall()
+
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(rows[-1])
+
+
+def iter_history(conn, user_id, batch_size):
+    """
+    Yield every trade of a user, newest first, one page at a time.
+
+    At most batch_size rows are held in memory, and no read transaction stays
+    open between pages.
+    """
+    cursor = None
+    while True:
+        rows, cursor = load_history_page(conn, user_id, batch_size, cursor)
+        yield from rows
+        if cursor is None:
+            return
+
+
+def iter_trades(conn, user_id, after=None, batch_size=1000):
+    """
+    Yield the trades of a user oldest first, in pages of batch_size rows.
+
+    Args:
+        conn: an open sqlite3 connection
+        user_id: the id of the user
+        after: the (time, id) key of the last trade already seen, or None to
+            start from the first trade
+        batch_size: the number of rows read per query
+    """
+    time, row_id = after or ("", 0)
+    while True:
+        rows = conn.execute(
+            SELECT_TRADES_AFTER, (user_id, time, row_id, batch_size)
+        ).fetchall()
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        time, row_id = rows[-1]["time"], rows[-1]["id"]
+
+
+def history_to_csv(rows):
+    """Serialize history rows as CSV, yielding one line at a time after a header."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    yield line(HISTORY_COLUMNS)
+    for row in rows:
+        yield line([row[column] for column in HISTORY_COLUMNS])
+
+
+def history_to_ndjson(rows):
+    """Serialize history rows as newline-delimited JSON, one object per line."""
+    for row in rows:
+        yield json.dumps({column: row[column] for column in HISTORY_COLUMNS}) + "\n"
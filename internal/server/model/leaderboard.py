@@ -0,0 +1,102 @@
+# Holdings are valued at the cached prices of `stock_status`, the same as in
+# `portfolio_valuations`; a symbol without a cached price counts as zero.
+UPSERT_USER_TOTAL = """
+    INSERT OR REPLACE INTO leaderboard (user_id, total)
+    SELECT users.id,
+           users.cash + COALESCE((
+               SELECT SUM(positions.shares * stock_status.stock_price)
+               FROM positions
+               JOIN stock_status
+                 ON stock_status.stock_symbol = positions.stock_symbol
+               WHERE positions.user_id = users.id AND positions.shares > 0
+           ), 0)
+    FROM users
+    WHERE users.id = ?
+"""
+# Moves the total of every holder of ?1 by shares * (new price - old price)
+SHIFT_HOLDER_TOTALS = """
+    UPDATE leaderboard
+    SET total = total + (
+        SELECT positions.shares FROM positions
+        WHERE positions.user_id = leaderboard.user_id
+          AND positions.stock_symbol = ?1
+    ) * (?2 - COALESCE(
+        (SELECT stock_price FROM stock_status WHERE stock_symbol = ?1), 0
+    ))
+    WHERE user_id IN (
+        SELECT user_id FROM positions WHERE stock_symbol = ?1 AND shares > 0
+    )
+    AND (SELECT stock_price FROM stock_status WHERE stock_symbol = ?1) IS NOT ?2
+"""
+SELECT_TOP = """
+    SELECT leaderboard.user_id AS user_id, users.username AS username,
+           leaderboard.total AS total
+    FROM leaderboard
+    JOIN users ON users.id = leaderboard.user_id
+    ORDER BY leaderboard.total DESC, leaderboard.user_id
+    LIMIT ?
+"""
+SELECT_RANK = """
+    SELECT me.total AS total,
+           (SELECT COUNT(*) FROM leaderboard AS ahead
+            WHERE ahead.total > me.total) + 1 AS rank
+    FROM leaderboard AS me
+    WHERE me.user_id = ?
+"""
+
+
+def refresh_user_total(conn, user_id):
+    """
+    Recompute a user's leaderboard total inside the caller's transaction.
+    Called when the user registers and after each of their trades.
+    """
+    conn.execute(UPSERT_USER_TOTAL, (user_id,))
+
+
+def shift_holder_totals(conn, quotes):
+    """
+    Move the leaderboard totals of the holders of every quoted symbol by the
+    change in its price, in the caller's transaction. Like
+    `invalidate_holder_valuations`, it must run before the quotes are written
+    to `stock_status`, and only touches holders of symbols whose price changed.
+
+    Args:
+        conn: an open sqlite3 connection
+        quotes: an iterable of quote dictionaries with "symbol" and "price"
+    """
+    conn.executemany(
+        SHIFT_HOLDER_TOTALS,
+        [(quote["symbol"], quote["price"]) for quote in quotes],
+    )
+
+
+def load_top(conn, limit):
+    """
+    Read the best limit accounts, read in order from the total index.
+    Returns:
+        a list of dictionaries with the keys "rank", "user_id", "username"
+        and "total". Equal totals share a rank.
+    """
+    top = []
+    for position, row in enumerate(conn.execute(SELECT_TOP, (limit,)), start=1):
+        tied = top and top[-1]["total"] == row["total"]
+        top.append(
+            {
+                "rank": top[-1]["rank"] if tied else position,
+                "user_id": row["user_id"],
+                "username": row["username"],
+                "total": row["total"],
+            }
+        )
+    return top
+
+
+def load_rank(conn, user_id):
+    """
+    Read a user's total and rank, counting the accounts ahead of it on the
+    total index.
+    Returns:
+        a row with the columns total and rank, or None if the user has no
+        leaderboard entry
+    """
+    return conn.execute(SELECT_RANK, (user_id,)).fetchone()
@@ -0,0 +1,105 @@
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+from internal.core.logger import logger
+
+MIGRATIONS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "db", "migrations")
+)
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+CREATE_SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER NOT NULL PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at DATETIME NOT NULL
+    )
+"""
+
+LOG_MIGRATION_APPLIED = "Applied migration %04d_%s"
+LOG_MIGRATION_SKIPPED = "Migration %04d_%s was applied by another process"
+
+
+def discover_migrations(migrations_dir=MIGRATIONS_DIR):
+    """
+    List the migration scripts in migrations_dir.
+
+    Scripts are named `<version>_<name>.sql`, e.g. `0002_hot_path_indexes.sql`.
+
+    Returns:
+        a list of (version, name, path) tuples ordered by version
+    """
+    migrations = []
+    for filename in os.listdir(migrations_dir):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append(
+                (
+                    int(match.group(1)),
+                    match.group(2),
+                    os.path.join(migrations_dir, filename),
+                )
+            )
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {migrations_dir}")
+    return migrations
+
+
+def applied_versions(conn):
+    """Return the set of migration versions recorded in `schema_version`."""
+    conn.execute(CREATE_SCHEMA_VERSION_TABLE)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+
+def migrate(conn, migrations_dir=MIGRATIONS_DIR):
+    """
+    Apply every pending migration in version order.
+
+    Each migration runs in its own `BEGIN IMMEDIATE` transaction together with
+    the insert of its `schema_version` row, so a failed script leaves no
+    trace and two processes migrating at once apply each script only once.
+
+    Args:
+        conn: an open sqlite3 connection outside of any transaction
+        migrations_dir: the directory holding the migration scripts
+    Returns:
+        the list of versions applied by this call
+    """
+    done = applied_versions(conn)
+    applied = []
+
+    for version, name, path in discover_migrations(migrations_dir):
+        if version in done:
+            continue
+
+        with open(path, "r") as file:
+            script = file.read()
+
+        applied_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            conn.executescript(
+                "BEGIN IMMEDIATE;\n"
+                "INSERT INTO schema_version (version, name, applied_at) "
+                f"VALUES ({version}, '{name}', '{applied_at}');\n"
+                f"{script}\n"
+                "COMMIT;"
+            )
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            if version not in applied_versions(conn):
+                raise
+            logger.info(LOG_MIGRATION_SKIPPED, version, name)
+            continue
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+        logger.info(LOG_MIGRATION_APPLIED, version, name)
+        applied.append(version)
+
+    return applied
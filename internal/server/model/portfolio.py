@@ -0,0 +1,170 @@
+from datetime import datetime
+
+SELECT_PORTFOLIO = """
+    SELECT users.cash AS cash,
+           positions.stock_symbol AS stock_symbol,
+           positions.shares AS shares_amount,
+           positions.avg_cost AS avg_cost,
+           stock_status.stock_price AS stock_price,
+           stock_status.time AS price_time
+    FROM users
+    LEFT JOIN positions ON positions.user_id = users.id AND positions.shares > 0
+    LEFT JOIN stock_status ON stock_status.stock_symbol = positions.stock_symbol
+    WHERE users.id = ?
+    ORDER BY positions.stock_symbol
+"""
+
+SELECT_VALUATION = "SELECT * FROM portfolio_valuations WHERE user_id = ?"
+COMPUTE_VALUATION = """
+    INSERT OR REPLACE INTO portfolio_valuations
+        (user_id, holdings_value, cost_basis, realized_pnl, computed_at)
+    SELECT ?,
+           COALESCE(SUM(positions.shares * stock_status.stock_price), 0),
+           COALESCE(SUM(CASE WHEN stock_status.stock_price IS NOT NULL
+                             THEN positions.shares * positions.avg_cost END), 0),
+           COALESCE(SUM(positions.realized_pnl), 0),
+           ?
+    FROM positions
+    LEFT JOIN stock_status ON stock_status.stock_symbol = positions.stock_symbol
+    WHERE positions.user_id = ?
+"""
+# Drops the cached valuation of every holder of a symbol whose price changes
+INVALIDATE_HOLDER_VALUATIONS = """
+    DELETE FROM portfolio_valuations
+    WHERE user_id IN (
+        SELECT user_id FROM positions WHERE stock_symbol = ?1 AND shares > 0
+    )
+    AND (SELECT stock_price FROM stock_status WHERE stock_symbol = ?1) IS NOT ?2
+"""
+
+
+def load_portfolio(conn, user_id):
+    """
+    Load a user's cash, open positions and cached prices with a single query.
+
+    Args:
+        conn: an open sqlite3 connection
+        user_id: the id of the user
+    Returns:
+        a dictionary {"cash": float, "holdings": list} where every holding has
+        the keys "symbol", "shares", "avg_cost", "price" and "price_time".
+        "price" and "price_time" are None when the symbol has no
+        `stock_status` row. Returns None if the user does not exist.
+    """
+    rows = conn.execute(SELECT_PORTFOLIO, (user_id,)).fetchall()
+    if not rows:
+        return None
+
+    holdings = [
+        {
+            "symbol": row["stock_symbol"],
+            "shares": row["shares_amount"],
+            "avg_cost": row["avg_cost"],
+            "price": row["stock_price"],
+            "price_time": row["price_time"],
+        }
+        for row in rows
+        if row["stock_symbol"] is not None
+    ]
+    return {"cash": float(rows[0]["cash"]), "holdings": holdings}
+
+
+def load_valuation(conn, user_id):
+    """
+    Return the cached valuation of a user's positions, computing it on a miss.
+
+    The cache row is dropped by the trade engine when the user trades and by
+    `invalidate_holder_valuations` when the price of a held symbol changes,
+    so a hit is always current.
+
+    Args:
+        conn: an open sqlite3 connection outside of any transaction
+        user_id: the id of the user
+    Returns:
+        a row with the columns holdings_value, cost_basis, realized_pnl and
+        computed_at
+    """
+    row = conn.execute(SELECT_VALUATION, (user_id,)).fetchone()
+    if row is not None:
+        return row
+
+    # Take the write lock before reading, so a trade committing meanwhile
+    # cannot leave a valuation computed from its old positions behind
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(COMPUTE_VALUATION, (user_id, datetime.now(), user_id))
+        row = conn.execute(SELECT_VALUATION, (user_id,)).fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return row
+
+
+def invalidate_holder_valuations(conn, quotes):
+    """
+    Drop the cached valuations that new quotes make outdated, in the caller's
+    transaction. Must run before the quotes are written to `stock_status`.
+
+    Args:
+        conn: an open sqlite3 connection
+        quotes: an iterable of quote dictionaries with "symbol" and "price"
+    """
+    conn.executemany(
+        INVALIDATE_HOLDER_VALUATIONS,
+        [(quote["symbol"], quote["price"]) for quote in quotes],
+    )
+
+
+def value_portfolio(portfolio, valuation=None):
+    """
+    Build the valuation rendered by `portfolio/home.html`.
+
+    Holdings without a known price are left out of the valuation. A holding
+    whose price could not be refreshed keeps its last known price and is
+    marked "stale".
+
+    Args:
+        portfolio: the dictionary returned by `load_portfolio`
+        valuation: the row returned by `load_valuation`, used for the totals
+            instead of summing the holdings
+    Returns:
+        a dictionary with the keys "stocks", "cash_balance", "grand_total",
+        "cost_basis", "unrealized_pnl" and "realized_pnl"
+    """
+    stocks = []
+    for holding in portfolio["holdings"]:
+        if holding["price"] is None:
+            continue
+        price = float(holding["price"])
+        avg_cost = holding.get("avg_cost") or 0.0
+        stocks.append(
+            {
+                "symbol": holding["symbol"],
+                "shares": holding["shares"],
+                "price": price,
+                "avg_cost": avg_cost,
+                "total": price * holding["shares"],
+                "pnl": (price - avg_cost) * holding["shares"],
+                "stale": holding.get("stale", False),
+            }
+        )
+
+    if valuation is not None:
+        holdings_value = valuation["holdings_value"]
+        cost_basis = valuation["cost_basis"]
+        realized_pnl = valuation["realized_pnl"]
+    else:
+        holdings_value = sum(stock["total"] for stock in stocks)
+        cost_basis = sum(stock["avg_cost"] * stock["shares"] for stock in stocks)
+        realized_pnl = 0.0
+
+    cash_balance = portfolio["cash"]
+    return {
+        "stocks": stocks,
+        "cash_balance": cash_balance,
+        "grand_total": cash_balance + holdings_value,
+        "cost_basis": cost_basis,
+        "unrealized_pnl": holdings_value - cost_basis,
+        "realized_pnl": realized_pnl,
+    }
@@ -0,0 +1,146 @@
+import csv
+from itertools import islice
+
+INTERVAL_DAILY = "daily"
+
+BAR_COLUMNS = ("date", "open", "high", "low", "close", "volume")
+# Header names accepted for the bar time; Alpha Vantage CSV uses "timestamp"
+DATE_COLUMNS = ("timestamp", "date", "time", "datetime")
+
+UPSERT_BAR = (
+    "INSERT INTO price_history "
+    "(stock_symbol, interval, date, open, high, low, close, volume) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(stock_symbol, interval, date) DO UPDATE SET "
+    "open = excluded.open, high = excluded.high, low = excluded.low, "
+    "close = excluded.close, volume = excluded.volume"
+)
+SELECT_BARS = """
+    SELECT date, open, high, low, close, volume
+    FROM price_history
+    WHERE stock_symbol = ? AND interval = ? AND date >= ? AND date <= ?
+    ORDER BY date
+"""
+SELECT_BAR_RANGE = """
+    SELECT MIN(date) AS first_date, MAX(date) AS last_date, COUNT(*) AS bars
+    FROM price_history
+    WHERE stock_symbol = ? AND interval = ?
+"""
+SELECT_LAST_CLOSE = """
+    SELECT close FROM price_history
+    WHERE stock_symbol = ? AND interval = ? AND date < ?
+    ORDER BY date DESC
+    LIMIT 1
+"""
+
+# Bounds for open-ended range reads; every stored date sorts between them
+MIN_DATE = ""
+MAX_DATE = "9999"
+
+
+def parse_bars_csv(lines):
+    """
+    Parse OHLCV bars from CSV text, one line at a time.
+
+    The header must name a time column (timestamp, date, time or datetime)
+    and the open, high, low, close and volume columns, in any order and case.
+    Other columns, such as adjusted_close, are ignored.
+
+    Args:
+        lines: an iterable of CSV lines, e.g. an open file
+    Yields:
+        (date, open, high, low, close, volume) tuples in file order
+    Raises:
+        ValueError: if the header lacks a column or a row cannot be parsed
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    positions = {name.strip().lower(): i for i, name in enumerate(header)}
+    date_column = next((name for name in DATE_COLUMNS if name in positions), None)
+    missing = [name for name in BAR_COLUMNS[1:] if name not in positions]
+    if date_column is None or missing:
+        raise ValueError(f"CSV header is missing OHLCV columns: {header}")
+
+    date_i = positions[date_column]
+    open_i, high_i, low_i, close_i, volume_i = (
+        positions[name] for name in BAR_COLUMNS[1:]
+    )
+    for line_number, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        try:
+            yield (
+                row[date_i].strip(),
+                float(row[open_i]),
+                float(row[high_i]),
+                float(row[low_i]),
+                float(row[close_i]),
+                int(float(row[volume_i])),
+            )
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"Invalid bar on line {line_number}: {row}") from e
+
+
+def store_bars(conn, symbol, interval, bars, batch_size):
+    """
+    Upsert OHLCV bars in batches.
+
+    Each batch is written with one executemany and committed on its own, so
+    an ingest of any length holds at most batch_size bars in memory and never
+    keeps the write lock for long.
+
+    Args:
+        conn: an open sqlite3 connection
+        symbol: the uppercase stock symbol
+        interval: INTERVAL_DAILY or an intraday interval such as "5min"
+        bars: an iterable of (date, open, high, low, close, volume) tuples
+        batch_size: the number of bars written per transaction
+    Returns:
+        the number of bars stored
+    """
+    stored = 0
+    bars = iter(bars)
+    while True:
+        batch = [(symbol, interval, *bar) for bar in islice(bars, batch_size)]
+        if not batch:
+            return stored
+        with conn:
+            conn.executemany(UPSERT_BAR, batch)
+        stored += len(batch)
+
+
+def load_bars(conn, symbol, start=None, end=None, interval=INTERVAL_DAILY):
+    """
+    Read the stored bars of a symbol between start and end, both inclusive.
+    Args:
+        conn: an open sqlite3 connection
+        symbol: the uppercase stock symbol
+        start: the first date as "YYYY-MM-DD", or None for the oldest bar
+        end: the last date as "YYYY-MM-DD", or None for the newest bar
+        interval: INTERVAL_DAILY or an intraday interval such as "5min"
+    Returns:
+        a list of rows with the columns of BAR_COLUMNS, oldest first
+    """
+    if end is not None and len(end) == 10:
+        end += " 99"  # Include the intraday bars of the end date
+    return conn.execute(
+        SELECT_BARS, (symbol, interval, start or MIN_DATE, end or MAX_DATE)
+    ).fetchall()
+
+
+def bar_range(conn, symbol, interval=INTERVAL_DAILY):
+    """
+    Describe the stored history of a symbol.
+    Returns:
+        a row with the columns first_date, last_date and bars
+    """
+    return conn.execute(SELECT_BAR_RANGE, (symbol, interval)).fetchone()
+
+
+def last_close(conn, symbol, before, interval=INTERVAL_DAILY):
+    """Return the close of the newest bar of a symbol dated before before, or None."""
+    row = conn.execute(SELECT_LAST_CLOSE, (symbol, interval, before)).fetchone()
+    return None if row is None else row["close"]
@@ -0,0 +1,63 @@
+SELECT_SESSION = "SELECT data, expires_at FROM sessions WHERE id = ? AND expires_at > ?"
+UPSERT_SESSION = (
+    "INSERT INTO sessions (id, data, expires_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET "
+    "data = excluded.data, expires_at = excluded.expires_at"
+)
+TOUCH_SESSION = "UPDATE sessions SET expires_at = ? WHERE id = ?"
+DELETE_SESSION = "DELETE FROM sessions WHERE id = ?"
+DELETE_EXPIRED_SESSIONS = """
+    DELETE FROM sessions WHERE id IN (
+        SELECT id FROM sessions WHERE expires_at <= ? LIMIT ?
+    )
+"""
+
+
+def load_session(conn, sid, now):
+    """
+    Read a session that has not expired.
+    Args:
+        conn: an open sqlite3 connection
+        sid: the session id from the cookie
+        now: the current time, epoch seconds
+    Returns:
+        a tuple (data, expires_at) with the stored JSON text, or None
+    """
+    row = conn.execute(SELECT_SESSION, (sid, now)).fetchone()
+    if row is None:
+        return None
+    return row[0], row[1]
+
+
+def save_session(conn, sid, data, expires_at):
+    """Insert or replace the data of a session and commit."""
+    with conn:
+        conn.execute(UPSERT_SESSION, (sid, data, expires_at))
+
+
+def touch_session(conn, sid, expires_at):
+    """Push back the expiry of a session without rewriting its data, and commit."""
+    with conn:
+        conn.execute(TOUCH_SESSION, (expires_at, sid))
+
+
+def delete_session(conn, sid):
+    """Delete a session and commit."""
+    with conn:
+        conn.execute(DELETE_SESSION, (sid,))
+
+
+def delete_expired_sessions(conn, now, batch_size):
+    """
+    Delete the sessions expired at now, batch_size rows per transaction so
+    the write lock is never held for long.
+    Returns:
+        the number of deleted sessions
+    """
+    deleted = 0
+    while True:
+        with conn:
+            count = conn.execute(DELETE_EXPIRED_SESSIONS, (now, batch_size)).rowcount
+        deleted += count
+        if count < batch_size:
+            return deleted
@@ -1,8 +1,11 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from flask import g
 import os
 from internal.server.config import CONFIG
-from internal.core.logger import logger
+from internal.core.logger import event, logger
+from internal.server.instrumentation.metrics import InstrumentedConnection
 
 DB_NAME = CONFIG.database.db_name
 
@@ -10,30 +13,201 @@ DB_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..", "db", DB_NAM
 DB_PATH = os.path.abspath(DB_PATH)  # Resolve full path
 
 
+class ConnectionPool:
+    """Pool of reusable SQLite connections to a single database file.
+
+    Connections are created lazily with the tuned pragmas below and handed back to the pool
+    when a request ends, so the connect and pragma setup cost is only paid once per pooled
+    connection. Up to `max_size` idle connections are kept; when more are needed at once,
+    extra connections are created and closed again on release instead of blocking.
+
+    Every connection runs in WAL mode with `synchronous=NORMAL`, so readers never wait for the
+    single writer and commits only fsync at checkpoints.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        max_size,
+        timeout_second,
+        cache_size_kib,
+        mmap_size_bytes,
+        factory=sqlite3.Connection,
+    ):
+        self.db_path = db_path
+        # The sqlite3.Connection subclass to open, e.g. InstrumentedConnection
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout_second = timeout_second
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size_bytes = mmap_size_bytes
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def create(self):
+        """Open a new, unpooled connection with the pool's pragmas applied."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout_second,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            factory=self.factory,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout_second * 1000)}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size_bytes)}")
+        with self._lock:
+            self.created += 1
+        return conn
+
+    def acquire(self):
+        """Take an idle connection, or open a new one if none is idle."""
+        with self._lock:
+            self._in_use += 1
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+
+        try:
+            return self.create()
+        except sqlite3.Error:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def release(self, conn):
+        """Hand a connection back, rolling back any transaction left open."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._lock:
+                self._in_use -= 1
+                self.discarded += 1
+            raise
+
+        with self._lock:
+            self._in_use -= 1
+            if len(self._idle) < self.max_size:
+                self._idle.append(conn)
+                return
+            self.discarded += 1
+        conn.close()
+
+    def close_all(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        """Return the pool counters as a dictionary."""
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "max_size": self.max_size,
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the connection pool of the database at DB_PATH."""
+    with _pools_lock:
+        pool = _pools.get(DB_PATH)
+        if pool is None:
+            pool = ConnectionPool(
+                DB_PATH,
+                max_size=CONFIG.database.pool_size,
+                timeout_second=CONFIG.database.timeout_second,
+                cache_size_kib=CONFIG.database.cache_size_kib,
+                mmap_size_bytes=CONFIG.database.mmap_size_bytes,
+                factory=(
+                    InstrumentedConnection
+                    if CONFIG.instrumentation.enabled
+                    else sqlite3.Connection
+                ),
+            )
+            _pools[DB_PATH] = pool
+        return pool
+
+
+def pool_stats():
+    """Return the counters of the connection pool of DB_PATH."""
+    return get_pool().stats()
+
+
+def connect():
+    """Open a new connection to DB_PATH with dictionary-like row access.
+
+    Used directly by long-running code outside of a Flask request, such as background jobs.
+    The caller owns the connection and must close it.
+    """
+    return get_pool().create()
+
+
+@contextmanager
+def pooled_connection():
+    """Borrow a pooled connection for the duration of a `with` block.
+
+    Used by short operations outside of the request connection, such as the shared API budget.
+    """
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
 def get_db():
     """Establish and return a database connection.
 
-    Connects to the SQLite database specified in DB_PATH, storing the connection in Flask’s
-    g object to reuse it throughout the request. The row_factory is set to enable dictionary-like
-    access to rows.
+    Takes a connection from the pool of the SQLite database specified in DB_PATH, storing it
+    in Flask’s g object to reuse it throughout the request. The row_factory is set to enable
+    dictionary-like access to rows.
     """
     if "db" not in g:
         try:
-            g.db = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
-            g.db.row_factory = sqlite3.Row
-            logger.info(f"Database connection established: {DB_PATH}")
+            g.db_pool = get_pool()
+            g.db = g.db_pool.acquire()
+            logger.debug(
+                "Database connection acquired: %s",
+                DB_PATH,
+                extra=event("db.connection", action="acquire"),
+            )
         except sqlite3.Error as e:
-            logger.critical(f"Failed to connect to database: {e}")
+            logger.critical("Failed to connect to database: %s", e)
             raise
     return g.db
 
 
 def close_db(exception=None):
-    """Close the database connection at the end of the request."""
+    """Return the database connection to the pool at the end of the request."""
     db = g.pop("db", None)
+    pool = g.pop("db_pool", None)
     if db is not None:
         try:
-            db.close()
-            logger.info("Database connection closed successfully.")
+            pool.release(db)
+            logger.debug(
+                "Database connection released.",
+                extra=event("db.connection", action="release"),
+            )
         except sqlite3.Error as e:
-            logger.error(f"Error closing database connection: {e}")
+            logger.error("Error releasing database connection: %s", e)
@@ -0,0 +1,90 @@
+import csv
+from itertools import islice
+
+# LISTING_STATUS header names of the stored columns, in table order
+LISTING_COLUMNS = ("symbol", "name", "exchange", "assettype", "ipodate", "status")
+
+UPSERT_SYMBOL = (
+    "INSERT INTO symbols "
+    "(symbol, name, exchange, asset_type, ipo_date, status, refreshed_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(symbol) DO UPDATE SET "
+    "name = excluded.name, exchange = excluded.exchange, "
+    "asset_type = excluded.asset_type, ipo_date = excluded.ipo_date, "
+    "status = excluded.status, refreshed_at = excluded.refreshed_at"
+)
+PRUNE_SYMBOLS = "DELETE FROM symbols WHERE refreshed_at < ?"
+# An empty table means the universe was never loaded, and every symbol passes
+SELECT_IS_LISTED = """
+    SELECT EXISTS (SELECT 1 FROM symbols WHERE symbol = ?1)
+        OR NOT EXISTS (SELECT 1 FROM symbols)
+"""
+
+
+def parse_listing_csv(lines):
+    """
+    Parse the LISTING_STATUS CSV one line at a time.
+    Args:
+        lines: an iterable of CSV lines with a header row
+    Yields:
+        (symbol, name, exchange, asset_type, ipo_date, status) tuples
+    Raises:
+        ValueError: if the header lacks a column
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    positions = {name.strip().lower(): i for i, name in enumerate(header)}
+    missing = [name for name in LISTING_COLUMNS if name not in positions]
+    if missing:
+        raise ValueError(f"Listing header is missing columns: {header}")
+
+    indexes = [positions[name] for name in LISTING_COLUMNS]
+    for row in reader:
+        if len(row) < len(header) or not row[indexes[0]].strip():
+            continue
+        symbol, *rest = (row[i].strip() or None for i in indexes)
+        yield (symbol.upper(), *rest)
+
+
+def store_symbols(conn, listings, refreshed_at, batch_size):
+    """
+    Load a full listing into `symbols`, replacing the previous one.
+
+    Rows are upserted in batches of batch_size, each in its own transaction,
+    so the listing is never held in memory. Once every row is stored, the
+    symbols that were not part of it are deleted; an empty listing leaves
+    the table untouched.
+
+    Args:
+        conn: an open sqlite3 connection
+        listings: an iterable of tuples from `parse_listing_csv`
+        refreshed_at: the time of the download, newer than any previous one
+        batch_size: the number of rows written per transaction
+    Returns:
+        the number of symbols stored
+    """
+    stored = 0
+    listings = iter(listings)
+    while True:
+        batch = [(*row, refreshed_at) for row in islice(listings, batch_size)]
+        if not batch:
+            break
+        with conn:
+            conn.executemany(UPSERT_SYMBOL, batch)
+        stored += len(batch)
+
+    if stored:
+        with conn:
+            conn.execute(PRUNE_SYMBOLS, (refreshed_at,))
+    return stored
+
+
+def is_listed(conn, symbol):
+    """
+    Check a symbol against the stored universe with one primary key lookup.
+    Every symbol passes while the universe has not been loaded.
+    """
+    return bool(conn.execute(SELECT_IS_LISTED, (symbol.upper(),)).fetchone()[0])
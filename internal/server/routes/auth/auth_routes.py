@@ -2,8 +2,9 @@ from flask import Blueprint, render_template, redirect, request, session
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from internal.server.model.sqlite_connection import get_db
+from internal.server.model.leaderboard import refresh_user_total
 from internal.server.utils.utils import apology
-from internal.core.logger import logger
+from internal.core.logger import event, logger
 import sqlite3
 
 # ----------------------
@@ -79,7 +80,12 @@ def login():
         user_record = user_rows[0]
         session["user_id"] = user_record["id"]
 
-        logger.info(LOG_LOGIN_SUCCESS, username, user_record["id"])
+        logger.info(
+            LOG_LOGIN_SUCCESS,
+            username,
+            user_record["id"],
+            extra=event("auth.login", route="/login", user_id=user_record["id"]),
+        )
         return redirect("/home")
     else:
         logger.warning(LOG_LOGIN_UNKNOWN_METHOD, request.method)
@@ -134,22 +140,29 @@ def register():
         password_hash = generate_password_hash(password)
 
         try:
-            db.execute(
+            user_id = db.execute(
                 "INSERT INTO users (username, hash) VALUES (?, ?)",
                 (username, password_hash),
-            )
+            ).lastrowid
+            refresh_user_total(db, user_id)
             db.commit()
-            logger.info(LOG_REGISTER_SUCCESS, username)
+            logger.info(
+                LOG_REGISTER_SUCCESS,
+                username,
+                extra=event("auth.register", route="/register", user_id=user_id),
+            )
             return redirect("/login")
         except sqlite3.IntegrityError:
+            db.rollback()
             logger.debug(LOG_REGISTER_USER_EXISTS, username)
             return apology("Username existed")
         except sqlite3.Error as e:
+            db.rollback()
             logger.error(LOG_REGISTER_DB_INSERT_ERROR, username, e)
             return apology("Unexpected error in /register")
 
     else:
-        logger.warning(LOG_REGISTER_UNKNOWN_METHOD.format(request.method))
+        logger.warning(LOG_REGISTER_UNKNOWN_METHOD, request.method)
         return apology("Method not allowed", 405)
 
 
@@ -0,0 +1,62 @@
+from flask import Blueprint, Response, abort, current_app, request
+
+from internal.server.config import CONFIG
+from internal.server.instrumentation.metrics import registry
+from internal.server.model.sqlite_connection import pool_stats
+from internal.core.logger import logger
+
+# ----------------------
+# Logging Message Constants
+# ----------------------
+
+LOG_CTX = "/metrics"
+
+LOG_METRICS_REMOTE = f"{LOG_CTX}: Refused request from non-local address %s"
+LOG_PROFILER_ACTION = f"{LOG_CTX}/profile [POST]: Profiler %s"
+
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+LOCAL_ADDRESSES = ("127.0.0.1", "::1")
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.before_request
+def local_only():
+    """Hide the metrics from non-local clients unless configured otherwise."""
+    if CONFIG.instrumentation.local_only and request.remote_addr not in LOCAL_ADDRESSES:
+        logger.warning(LOG_METRICS_REMOTE, request.remote_addr)
+        abort(404)
+
+
+@metrics_bp.route("/metrics")
+def metrics():
+    """Expose the latency histograms and pool counters in Prometheus format."""
+    gauges = [
+        (f"finance_db_pool_{name}", f"Connection pool counter {name}.", value)
+        for name, value in pool_stats().items()
+    ]
+    return Response(registry.render(gauges), mimetype=PROMETHEUS_MIMETYPE)
+
+
+@metrics_bp.route("/metrics/profile", methods=["GET", "POST"])
+def profile():
+    """
+    GET the sampled stacks in collapsed format, or POST action=start, stop
+    or reset to control the sampling profiler.
+    """
+    profiler = current_app.extensions["profiler"]
+    if request.method == "POST":
+        action = request.form.get("action")
+        if action == "start":
+            profiler.start()
+        elif action == "stop":
+            profiler.stop()
+        elif action == "reset":
+            profiler.reset()
+        else:
+            abort(400)
+        logger.info(LOG_PROFILER_ACTION, action)
+
+    response = Response(profiler.collapsed(), mimetype="text/plain")
+    response.headers["X-Profiler"] = "running" if profiler.running else "stopped"
+    return response
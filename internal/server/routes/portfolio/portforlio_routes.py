@@ -1,13 +1,45 @@
 import os
-from flask import Blueprint, render_template, request, redirect, session
-from datetime import datetime
+import time
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    redirect,
+    session,
+    stream_with_context,
+    url_for,
+)
 from dotenv import load_dotenv
 
-from internal.server.model.sqlite_connection import get_db
+from internal.server.model.sqlite_connection import get_db, pooled_connection
 from internal.server.utils.utils import apology, login_required
-from internal.server.api.API_handlers import lookup
-from internal.server.utils.exception import ApiLimitError
-from internal.core.logger import logger
+from internal.server.model.portfolio import (
+    load_portfolio,
+    load_valuation,
+    value_portfolio,
+)
+from internal.server.model.leaderboard import load_rank, load_top
+from internal.server.model.symbols import is_listed
+from internal.server.model.history import (
+    load_history_page,
+    iter_history,
+    history_to_csv,
+    history_to_ndjson,
+)
+from internal.server.config import CONFIG
+from internal.server.api.API_handlers import lookup, lookup_many, is_fresh
+from internal.server.api.rate_limiter import PRIORITY_TRADE
+from internal.server.utils.exception import (
+    ApiLimitError,
+    OrderFailedError,
+    TradeError,
+)
+from internal.core.trade import TRADE_BUY, TRADE_SELL, execute_trade
+from internal.core.analytics import load_performance
+from internal.core.logger import event, logger
 from internal.core.bugger import bugger
 import sqlite3
 
@@ -23,7 +55,6 @@ LOG_HOME_API_LIMIT = f"{LOG_CTX}/home: API limit reached - %s"
 LOG_HOME_LOOKUP_ERROR = (
     f"{LOG_CTX}/home: Unexpected error during lookup for symbol '%s': %s"
 )
-LOG_HOME_CASH_ERROR = f"{LOG_CTX}/home: Error fetching cash for user %s: %s"
 LOG_HOME_RENDERED = f"{LOG_CTX}/home: Rendered for user_id=%s"
 
 LOG_INDEX_GET_AUTH = f"{LOG_CTX}/ [GET]: Redirecting authenticated user to /home"
@@ -44,6 +75,20 @@ LOG_SELL_UNKNOWN_METHOD = "Unsupported method used on /sell: '%s'"
 
 LOG_HISTORY_GET = f"{LOG_CTX}/history [GET]: Retrieving transaction history for user %s"
 LOG_HISTORY_FAIL = f"{LOG_CTX}/history: Failed to retrieve history for user %s: %s"
+LOG_HISTORY_BAD_CURSOR = f"{LOG_CTX}/history: Invalid cursor from user %s: %s"
+LOG_EXPORT_GET = f"{LOG_CTX}/history/export [GET]: Exporting history of user %s as %s"
+LOG_EXPORT_FAIL = f"{LOG_CTX}/history/export: Export failed for user %s: %s"
+
+LOG_PERFORMANCE_GET = f"{LOG_CTX}/performance [GET]: Rendering performance of user %s"
+LOG_PERFORMANCE_FAIL = f"{LOG_CTX}/performance: Replay failed for user %s: %s"
+
+LOG_LEADERBOARD_GET = f"{LOG_CTX}/leaderboard [GET]: Rendering leaderboard for user %s"
+LOG_LEADERBOARD_FAIL = f"{LOG_CTX}/leaderboard: Failed to load rankings: %s"
+
+LOG_SYMBOL_UNLISTED = f"{LOG_CTX}: Rejected unlisted symbol '%s'"
+LOG_SYMBOL_CHECK_FAIL = f"{LOG_CTX}: Could not check symbol '%s': %s"
+
+LOG_ORDER_QUEUED = f"{LOG_CTX}: Order %s of user %s is still pending"
 
 LOG_QUOTE_GET = f"{LOG_CTX}/quote [GET]: Rendering quote form"
 LOG_QUOTE_LOOKUP_FAIL = f"{LOG_CTX}/quote: Lookup error for '%s': %s"
@@ -54,6 +99,15 @@ LOG_QUOTE_UNKNOWN_METHOD = "Unsupported method used on /quote: '%s'"
 LOG_CONTRIBUTE_GET = f"{LOG_CTX}/contribute [GET]: Rendering contribute page"
 LOG_APOLOGIZE_GET = f"{LOG_CTX}/apologize [GET]: Rendering apology message"
 
+# Size of the equity chart on the performance page, in SVG units
+CHART_WIDTH = 600
+CHART_HEIGHT = 200
+
+HISTORY_EXPORT_FORMATS = {
+    "csv": (history_to_csv, "text/csv"),
+    "ndjson": (history_to_ndjson, "application/x-ndjson"),
+}
+
 
 # ----------------------
 # Environment
@@ -78,75 +132,143 @@ def main():
 @portfolio_bp.route("/home", methods=["GET"])
 @login_required
 def index():
+    started = time.perf_counter()
     conn = get_db()
     user_id = session["user_id"]
     logger.debug(LOG_HOME_GET)
 
-    # Get list of distinct stocks purchased
+    # Load cash, holdings and cached prices in one query
     try:
-        rows = conn.execute(
-            "SELECT DISTINCT stock_symbol FROM user_stocks WHERE user_id = ?",
-            (user_id,),
-        ).fetchall()
+        portfolio = load_portfolio(conn, user_id)
     except sqlite3.Error as e:
         logger.error(LOG_HOME_DB_ERROR, user_id, e)
         return apology("Could not retrieve portfolio.")
 
-    stocks = []
+    if portfolio is None:
+        bugger.log({"event": "home_user_not_found", "user_id": user_id})
+        return apology("Error retrieving account info.")
 
-    for row in rows:
-        # Lookup current stock price
-        symbol = row["stock_symbol"]
+    # Refresh only the holdings whose cached price is missing or stale
+    stale = [
+        holding
+        for holding in portfolio["holdings"]
+        if not is_fresh(holding["price_time"])
+    ]
+    if stale:
+        symbols = [holding["symbol"] for holding in stale]
         try:
-            stock = lookup(symbol, API_KEY)
+            quotes = lookup_many(symbols, API_KEY)
         except ApiLimitError as e:
+            # Degrade to the cached prices loaded with the portfolio
             logger.warning(LOG_HOME_API_LIMIT, e.message)
-            return apology(e.message)
+            quotes = {}
         except Exception as e:
-            logger.error(LOG_HOME_LOOKUP_ERROR, symbol, e)
-            continue
-
-        # Get total shares for this stock
-        try:
-            total_shares_row = conn.execute(
-                "SELECT shares_amount FROM user_stocks WHERE stock_symbol = ? AND user_id = ?",
-                (row["stock_symbol"], session["user_id"]),
-            ).fetchone()
-        except sqlite3.Error as e:
-            logger.error(LOG_HOME_DB_ERROR, user_id, e)
-            continue
-
-        stock["shares"] = total_shares_row["shares_amount"]
-        stock["total"] = stock["price"] * stock["shares"]
-        stocks.append(stock)
+            logger.error(LOG_HOME_LOOKUP_ERROR, ", ".join(symbols), e)
+            quotes = {}
+
+        for holding in stale:
+            quote = quotes.get(holding["symbol"])
+            if quote is not None:
+                holding["price"] = quote["price"]
+                holding["stale"] = quote.get("stale", False)
+            elif holding["price"] is not None:
+                holding["stale"] = True
+            else:
+                logger.error(
+                    LOG_HOME_LOOKUP_ERROR, holding["symbol"], "no quote available"
+                )
 
-    # Get cash balance
+    # Totals come from the cached valuation, recomputed only after the user
+    # traded or a held symbol's price changed
     try:
-        cash_row = conn.execute(
-            "SELECT cash FROM users WHERE id = ?", (session["user_id"],)
-        ).fetchone()
-        cash_balance = cash_row["cash"]
+        cached = load_valuation(conn, user_id)
     except sqlite3.Error as e:
-        logger.error(LOG_HOME_CASH_ERROR, user_id, e)
-        return apology("Error retrieving account info.")
+        logger.error(LOG_HOME_DB_ERROR, user_id, e)
+        cached = None
+    valuation = value_portfolio(portfolio, cached)
+    logger.debug(
+        LOG_HOME_RENDERED,
+        user_id,
+        extra=event(
+            "portfolio.home",
+            route="/home",
+            user_id=user_id,
+            holdings=len(valuation["stocks"]),
+            duration_ms=(time.perf_counter() - started) * 1000,
+        ),
+    )
 
-    # Calculate grand total (cash + total value of stocks)
-    grand_total = cash_balance + sum(stock["total"] for stock in stocks)
-    logger.debug(LOG_HOME_RENDERED.format(user_id))
+    return render_template("portfolio/home.html", **valuation)
 
-    return render_template(
-        "portfolio/home.html",
-        stocks=stocks,
-        cash_balance=cash_balance,
-        grand_total=grand_total,
-    )
+
+def symbol_is_listed(symbol):
+    """
+    Check a submitted symbol against the `symbols` table, so an unknown
+    ticker is rejected without spending an upstream call. A database error
+    lets the symbol through to the lookup.
+    """
+    try:
+        listed = is_listed(get_db(), symbol.strip())
+    except sqlite3.Error as e:
+        logger.error(LOG_SYMBOL_CHECK_FAIL, symbol, e)
+        return True
+    if not listed:
+        logger.debug(LOG_SYMBOL_UNLISTED, symbol)
+    return listed
+
+
+def holds_symbol(user_id, symbol):
+    """
+    Check whether the user holds shares of symbol. Held symbols can always be
+    sold, even once a newer listing download has pruned them from `symbols`.
+    A database error counts as not held, leaving the listing check in charge.
+    """
+    try:
+        row = (
+            get_db()
+            .execute(
+                "SELECT 1 FROM user_stocks WHERE user_id = ? AND stock_symbol = ?",
+                (user_id, symbol.strip().upper()),
+            )
+            .fetchone()
+        )
+    except sqlite3.Error as e:
+        logger.error(LOG_SYMBOL_CHECK_FAIL, symbol, e)
+        return False
+    return row is not None
+
+
+def place_order(trade_type, user_id, symbol, price, shares):
+    """
+    Execute a trade, through the order queue when it is enabled.
+
+    With the queue the request waits up to `order_queue.wait_second` for the
+    batch holding its order to commit.
+
+    Returns:
+        None once the trade is committed, or the ticket id of an order that
+        is still pending
+    Raises:
+        TradeError: if the trade is rejected
+        sqlite3.Error: if the database fails
+        OrderFailedError: if the queued order failed on an unexpected error
+    """
+    order_queue = current_app.extensions.get("order_queue")
+    if order_queue is None:
+        execute_trade(get_db(), trade_type, user_id, symbol, price, shares)
+        return None
+
+    ticket = order_queue.submit(trade_type, user_id, symbol, price, shares)
+    if ticket.result(CONFIG.portfolio.order_queue.wait_second) is None:
+        logger.info(LOG_ORDER_QUEUED, ticket.id, user_id)
+        return ticket.id
+    return None
 
 
 @portfolio_bp.route("/buy", methods=["GET", "POST"])
 @login_required
 def buy():
     """Buy shares of stock"""
-    db = get_db()
     user_id = session["user_id"]
 
     if request.method == "GET":
@@ -154,13 +276,16 @@ def buy():
         return render_template("portfolio/buy.html")
 
     elif request.method == "POST":
+        started = time.perf_counter()
         # Get stock info from form
         stock_symbol = request.form.get("symbol")
         if not stock_symbol:
             return apology("No stock found")
+        if not symbol_is_listed(stock_symbol):
+            return apology("Invalid stock symbol")
 
         try:
-            stock_info = lookup(stock_symbol, API_KEY)
+            stock_info = lookup(stock_symbol, API_KEY, PRIORITY_TRADE)
             if not stock_info:
                 return apology("Invalid stock symbol")
         except ApiLimitError as e:
@@ -180,68 +305,33 @@ def buy():
         except ValueError:
             return apology("Invalid shares amount")
 
-        # Check for remaining cash in the account
         try:
-            user = db.execute(
-                "SELECT cash FROM users WHERE id = ?", (user_id,)
-            ).fetchone()
-            if not user:
-                bugger.log({"event": "buy_user_not_found", "user_id": user_id})
-                return apology("User not found")
-            remaining_cash = float(user["cash"])
-        except Exception as e:
-            logger.error(LOG_HOME_CASH_ERROR, user_id, e)
-            return apology("Unexpected error")
-
-        # Calculate total cost of purchase
-        total_cost = float(stock_info["price"]) * buy_amount
-        if remaining_cash < total_cost:
-            return apology("Insufficient cash in your account")
-        try:
-            db.execute("BEGIN TRANSACTION")
-
-            # Deduct cash from user's account
-            db.execute(
-                "UPDATE users SET cash = ? WHERE id = ?",
-                (remaining_cash - total_cost, user_id),
+            ticket_id = place_order(
+                TRADE_BUY,
+                user_id,
+                stock_info["symbol"],
+                stock_info["price"],
+                buy_amount,
             )
-
-            # Insert stock status into portfolio (if exists, update instead)
-            existing_stock = db.execute(
-                "SELECT shares_amount FROM user_stocks WHERE user_id = ? AND stock_symbol = ?",
-                (user_id, stock_info["symbol"]),
-            ).fetchone()
-
-            if existing_stock:
-                new_shares_amount = existing_stock["shares_amount"] + buy_amount
-                db.execute(
-                    "UPDATE user_stocks SET shares_amount = ? WHERE user_id = ? AND stock_symbol = ?",
-                    (new_shares_amount, user_id, stock_info["symbol"]),
-                )
-            else:
-                db.execute(
-                    "INSERT INTO user_stocks (user_id, stock_symbol, shares_amount) VALUES (?, ?, ?)",
-                    (user_id, stock_info["symbol"], buy_amount),
-                )
-
-            # Insert transaction into history table
-            db.execute(
-                "INSERT INTO history_logs (user_id, type, stock_symbol, stock_price, shares_amount, time) "
-                "VALUES (?, ?, ?, ?, ?, ?)",
-                (
-                    session["user_id"],
-                    "buy",
-                    stock_info["symbol"],
-                    stock_info["price"],
-                    buy_amount,
-                    datetime.now(),
+            if ticket_id is not None:
+                return redirect(url_for("portfolio.order_status", ticket_id=ticket_id))
+            logger.info(
+                LOG_BUY_SUCCESS,
+                user_id,
+                buy_amount,
+                stock_info["symbol"],
+                extra=event(
+                    "portfolio.buy",
+                    route="/buy",
+                    user_id=user_id,
+                    symbol=stock_info["symbol"],
+                    shares=buy_amount,
+                    duration_ms=(time.perf_counter() - started) * 1000,
                 ),
             )
-
-            db.execute("COMMIT")
-            logger.info(LOG_BUY_SUCCESS, user_id, buy_amount, stock_info["symbol"])
-        except sqlite3.Error as e:
-            db.rollback()
+        except TradeError as e:
+            return apology(e.message)
+        except (sqlite3.Error, OrderFailedError) as e:
             logger.error(LOG_BUY_TRANSACTION_FAIL, user_id, e)
             return apology("Transaction failed, /buy")
 
@@ -257,20 +347,128 @@ def buy():
 @login_required
 def history():
     user_id = session["user_id"]
-    logger.debug(LOG_HISTORY_GET, user_id)
+    logger.debug(
+        LOG_HISTORY_GET,
+        user_id,
+        extra=event("portfolio.history", route="/history", user_id=user_id),
+    )
+
+    page_size = request.args.get(
+        "page_size", CONFIG.portfolio.history_page_size, type=int
+    )
+    page_size = max(1, min(page_size, CONFIG.portfolio.history_max_page_size))
+    cursor = request.args.get("cursor")
+
     try:
-        history_logs = (
-            get_db()
-            .execute(
-                "SELECT * FROM history_logs WHERE user_id = ? ORDER BY time DESC",
-                (user_id,),
-            )
-            .fetchall()
+        history_logs, next_cursor = load_history_page(
+            get_db(), user_id, page_size, cursor
         )
+    except ValueError as e:
+        logger.warning(LOG_HISTORY_BAD_CURSOR, user_id, e)
+        return apology("Invalid history page.")
     except sqlite3.Error as e:
         logger.error(LOG_HISTORY_FAIL, user_id, e)
         return apology("Could not load history.")
-    return render_template("portfolio/history.html", history=history_logs)
+    return render_template(
+        "portfolio/history.html",
+        history=history_logs,
+        next_cursor=next_cursor,
+        page_size=page_size,
+    )
+
+
+@portfolio_bp.route("/performance")
+@login_required
+def performance():
+    """Render the daily NAV chart, returns, volatility and Sharpe ratio of the user."""
+    user_id = session["user_id"]
+    logger.debug(LOG_PERFORMANCE_GET, user_id)
+    try:
+        result = load_performance(
+            get_db(),
+            user_id,
+            batch_size=CONFIG.portfolio.history_export_batch_size,
+        )
+    except sqlite3.Error as e:
+        logger.error(LOG_PERFORMANCE_FAIL, user_id, e)
+        return apology("Could not compute performance.")
+
+    return render_template(
+        "portfolio/performance.html",
+        dates=result["dates"],
+        nav=result["nav"],
+        total_return=result["total_return"],
+        volatility=result["volatility"],
+        sharpe=result["sharpe"],
+        max_drawdown=result["max_drawdown"],
+        chart_points=chart_points(result["nav"]),
+        chart_width=CHART_WIDTH,
+        chart_height=CHART_HEIGHT,
+    )
+
+
+def chart_points(values):
+    """Scale a series into the `points` of an SVG polyline of the chart size."""
+    if len(values) < 2:
+        return ""
+    low, high = float(values.min()), float(values.max())
+    span = (high - low) or 1.0
+    step = CHART_WIDTH / (len(values) - 1)
+    return " ".join(
+        f"{i * step:.1f},{CHART_HEIGHT - (value - low) / span * CHART_HEIGHT:.1f}"
+        for i, value in enumerate(values)
+    )
+
+
+@portfolio_bp.route("/leaderboard")
+@login_required
+def leaderboard():
+    """Render the best accounts by total value and the user's own rank."""
+    user_id = session["user_id"]
+    logger.debug(LOG_LEADERBOARD_GET, user_id)
+    conn = get_db()
+    try:
+        top = load_top(conn, CONFIG.portfolio.leaderboard_size)
+        rank = load_rank(conn, user_id)
+    except sqlite3.Error as e:
+        logger.error(LOG_LEADERBOARD_FAIL, e)
+        return apology("Could not load the leaderboard.")
+    return render_template(
+        "portfolio/leaderboard.html", top=top, rank=rank, user_id=user_id
+    )
+
+
+@portfolio_bp.route("/history/export")
+@login_required
+def export_history():
+    """Stream the full trade history as CSV or NDJSON without loading it at once."""
+    user_id = session["user_id"]
+    export_format = request.args.get("format", "csv")
+    if export_format not in HISTORY_EXPORT_FORMATS:
+        return apology("Unsupported export format")
+    serialize, mimetype = HISTORY_EXPORT_FORMATS[export_format]
+    logger.debug(LOG_EXPORT_GET, user_id, export_format)
+
+    def generate():
+        # The request connection is released before the body is streamed,
+        # so the export borrows its own connection from the pool
+        try:
+            with pooled_connection() as conn:
+                rows = iter_history(
+                    conn, user_id, CONFIG.portfolio.history_export_batch_size
+                )
+                yield from serialize(rows)
+        except sqlite3.Error as e:
+            logger.error(LOG_EXPORT_FAIL, user_id, e)
+            raise
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=history.{export_format}"
+        },
+    )
 
 
 @portfolio_bp.route("/quote", methods=["GET", "POST"])
@@ -281,15 +479,28 @@ def quote():
         return render_template("portfolio/quote.html")
 
     elif request.method == "POST":
+        started = time.perf_counter()
         symbol = request.form.get("symbol")
         if not symbol:
             return apology("No symbol found")
+        if not symbol_is_listed(symbol):
+            return apology("Invalid stock symbol")
 
         try:
             stock_info = lookup(symbol, API_KEY)
             if stock_info is None:
                 return apology("Invalid stock symbol")
-            logger.info(LOG_QUOTE_SUCCESS, symbol)
+            logger.info(
+                LOG_QUOTE_SUCCESS,
+                symbol,
+                extra=event(
+                    "portfolio.quote",
+                    route="/quote",
+                    user_id=session["user_id"],
+                    symbol=stock_info["symbol"],
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                ),
+            )
         except ApiLimitError as e:
             logger.warning(LOG_QUOTE_API_LIMIT, symbol, e.message)
             return apology(e.message)
@@ -323,14 +534,18 @@ def sell():
         return render_template("portfolio/sell.html", stocks=stocks)
 
     elif request.method == "POST":
+        started = time.perf_counter()
         stock_symbol = request.form.get("symbol")
         sell_amount = request.form.get("shares")
 
         if not stock_symbol or not sell_amount:
             return apology("Require symbol and shares")
+        known = holds_symbol(user_id, stock_symbol) or symbol_is_listed(stock_symbol)
+        if not known:
+            return apology("Stock not found")
 
         try:
-            stock_info = lookup(stock_symbol, API_KEY)
+            stock_info = lookup(stock_symbol, API_KEY, PRIORITY_TRADE)
             if not stock_info:
                 return apology("Stock not found")
         except ApiLimitError as e:
@@ -346,54 +561,33 @@ def sell():
         except ValueError:
             return apology("Invalid shares")
 
-        result = db.execute(
-            "SELECT shares_amount FROM user_stocks WHERE user_id = ? AND stock_symbol = ?",
-            (user_id, stock_symbol),
-        ).fetchone()
-
-        if result is None or sell_amount > result["shares_amount"]:
-            return apology("Not enough shares to sell")
-
         try:
-            with db:
-                if sell_amount == result["shares_amount"]:
-                    db.execute(
-                        "DELETE FROM user_stocks WHERE user_id = ? AND stock_symbol = ?",
-                        (user_id, stock_symbol),
-                    )
-                else:
-                    new_shares = result["shares_amount"] - sell_amount
-                    db.execute(
-                        "UPDATE user_stocks SET shares_amount = ? WHERE user_id = ? AND stock_symbol = ?",
-                        (new_shares, user_id, stock_symbol),
-                    )
-
-                user_cash = db.execute(
-                    "SELECT cash FROM users WHERE id = ?", (user_id,)
-                ).fetchone()
-                updated_cash = (
-                    float(user_cash["cash"]) + stock_info["price"] * sell_amount
-                )
-
-                db.execute(
-                    "UPDATE users SET cash = ? WHERE id = ?", (updated_cash, user_id)
-                )
-
-                db.execute(
-                    "INSERT INTO history_logs (user_id, type, stock_symbol, stock_price, shares_amount, time) "
-                    "VALUES (?, ?, ?, ?, ?, ?)",
-                    (
-                        user_id,
-                        "sell",
-                        stock_symbol,
-                        stock_info["price"],
-                        sell_amount,
-                        datetime.now(),
-                    ),
-                )
-
-                logger.info(LOG_SELL_SUCCESS, user_id, sell_amount, stock_symbol)
-        except sqlite3.Error as e:
+            ticket_id = place_order(
+                TRADE_SELL,
+                user_id,
+                stock_info["symbol"],
+                stock_info["price"],
+                sell_amount,
+            )
+            if ticket_id is not None:
+                return redirect(url_for("portfolio.order_status", ticket_id=ticket_id))
+            logger.info(
+                LOG_SELL_SUCCESS,
+                user_id,
+                sell_amount,
+                stock_info["symbol"],
+                extra=event(
+                    "portfolio.sell",
+                    route="/sell",
+                    user_id=user_id,
+                    symbol=stock_info["symbol"],
+                    shares=sell_amount,
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                ),
+            )
+        except TradeError as e:
+            return apology(e.message)
+        except (sqlite3.Error, OrderFailedError) as e:
             logger.error(LOG_SELL_TRANSACTION_FAIL, user_id, e)
             return apology("Transaction failed")
 
@@ -404,6 +598,17 @@ def sell():
         return apology("Method not allowed", 405)
 
 
+@portfolio_bp.route("/orders/<ticket_id>", methods=["GET"])
+@login_required
+def order_status(ticket_id):
+    """Report the state of a queued order as JSON."""
+    order_queue = current_app.extensions.get("order_queue")
+    ticket = order_queue.ticket(ticket_id) if order_queue else None
+    if ticket is None or ticket.user_id != session["user_id"]:
+        return jsonify({"error": "Unknown order"}), 404
+    return jsonify(ticket.to_dict())
+
+
 @portfolio_bp.route("/contribute", methods=["GET"])
 @login_required
 def contribute():
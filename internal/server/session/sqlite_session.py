@@ -0,0 +1,237 @@
+import secrets
+import threading
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+
+from internal.server.config import CONFIG
+from internal.server.model.sessions import (
+    delete_expired_sessions,
+    delete_session,
+    load_session,
+    save_session,
+    touch_session,
+)
+from internal.server.model.sqlite_connection import get_db, pooled_connection
+from internal.server.utils.ttl_cache import TTLCache
+from internal.core.logger import logger
+
+SESSION_SQLITE = "sqlite"
+SESSION_COOKIE = "cookie"
+
+LOG_SWEEPER_START = "Session sweeper started (interval=%ss)"
+LOG_SWEEPER_STOP = "Session sweeper stopped"
+LOG_SWEEPER_CYCLE = "Session sweeper: deleted %s expired sessions"
+LOG_SWEEPER_ERROR = "Session sweeper cycle failed: %s"
+
+
+class ServerSession(SecureCookieSession):
+    """
+    Session whose data lives in the `sessions` table, the cookie only holds
+    its random id. `modified` tracks writes like the cookie session, and a
+    `clear()` also asks for a new id, so logging in never keeps the id the
+    client had before.
+    """
+
+    def __init__(self, initial=None, sid=None, expires_at=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.regenerate = False
+
+    def clear(self):
+        super().clear()
+        self.regenerate = True
+
+
+class SqliteSessionInterface(SessionInterface):
+    """
+    Stores sessions in SQLite, shared by every worker and container using
+    the database, behind an in-process read cache.
+
+    Sessions are read on the request connection but written on a pooled
+    connection of their own, so saving a session at response time never
+    commits a transaction the view left open.
+
+    A request only writes when its session changed, or once the session is
+    past half its lifetime, to push back its expiry. Unchanged sessions,
+    and requests without a session cookie, cost no database write, and a
+    cache hit costs no database read either. Expired rows are deleted by
+    the SessionSweeper rather than by requests.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, lifetime_second, cache_max_size, cache_ttl_second):
+        self.lifetime_second = lifetime_second
+        self.cache_ttl_second = cache_ttl_second
+        # Entries hold the JSON text, so a request never shares a dict with another
+        self.cache = TTLCache(cache_max_size, cache_ttl_second)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return ServerSession()
+
+        now = time.time()
+        stored = self.cache.get(sid)
+        if stored is not None:
+            data, expires_at = stored["data"], stored["expires_at"]
+        else:
+            row = load_session(get_db(), sid, now)
+            if row is None:
+                return ServerSession()
+            data, expires_at = row
+            self._cache(sid, data, expires_at, now)
+
+        if expires_at <= now:
+            return ServerSession()
+        return ServerSession(self.serializer.loads(data), sid, expires_at)
+
+    def save_session(self, app, session, response):
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        replaced = session.sid if session.regenerate else None
+        if replaced:
+            self.cache.invalidate(replaced)
+            self._write(delete_session, replaced)
+            session.sid = None
+
+        if not session:
+            if session.modified and (replaced or session.sid):
+                if session.sid:
+                    self.cache.invalidate(session.sid)
+                    self._write(delete_session, session.sid)
+                self._delete_cookie(app, response)
+            return
+
+        now = time.time()
+        expires_at = now + self.lifetime_second
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        elif not session.modified:
+            if session.expires_at - now > self.lifetime_second / 2:
+                return
+            self._write(touch_session, session.sid, expires_at)
+            self.cache.invalidate(session.sid)
+            return
+
+        data = self.serializer.dumps(dict(session))
+        self._write(save_session, session.sid, data, expires_at)
+        self._cache(session.sid, data, expires_at, now)
+        self._set_cookie(app, session, response)
+
+    def _write(self, write, *args):
+        with pooled_connection() as conn:
+            write(conn, *args)
+
+    def _cache(self, sid, data, expires_at, now):
+        self.cache.put(
+            sid,
+            {"data": data, "expires_at": expires_at},
+            min(expires_at, now + self.cache_ttl_second),
+        )
+
+    def _set_cookie(self, app, session, response):
+        response.set_cookie(
+            self.get_cookie_name(app),
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=self.get_cookie_domain(app),
+            path=self.get_cookie_path(app),
+            secure=self.get_cookie_secure(app),
+            partitioned=self.get_cookie_partitioned(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add("Cookie")
+
+    def _delete_cookie(self, app, response):
+        response.delete_cookie(
+            self.get_cookie_name(app),
+            domain=self.get_cookie_domain(app),
+            path=self.get_cookie_path(app),
+            secure=self.get_cookie_secure(app),
+            partitioned=self.get_cookie_partitioned(app),
+            samesite=self.get_cookie_samesite(app),
+            httponly=self.get_cookie_httponly(app),
+        )
+        response.vary.add("Cookie")
+
+
+class SessionSweeper:
+    """
+    Background job that deletes expired sessions every interval_second,
+    batch_size rows per transaction.
+    """
+
+    def __init__(self, interval_second, batch_size):
+        self.interval_second = interval_second
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the sweeper on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="session-sweeper", daemon=True
+        )
+        self._thread.start()
+        logger.info(LOG_SWEEPER_START, self.interval_second)
+
+    def stop(self, timeout=None):
+        """Ask the sweeper to stop and wait for the current cycle to end."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info(LOG_SWEEPER_STOP)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_second):
+            try:
+                self.sweep_once()
+            except Exception as e:
+                logger.error(LOG_SWEEPER_ERROR, e)
+
+    def sweep_once(self, now=None):
+        """
+        Delete the sessions expired at now, defaulting to the current time.
+        Returns:
+            the number of deleted sessions
+        """
+        with pooled_connection() as conn:
+            deleted = delete_expired_sessions(
+                conn, time.time() if now is None else now, self.batch_size
+            )
+        logger.debug(LOG_SWEEPER_CYCLE, deleted)
+        return deleted
+
+
+def build_session_interface():
+    """
+    Create the session interface of CONFIG.session.backend, or None for the
+    "cookie" backend, which is Flask's default signed-cookie session.
+    """
+    session_config = CONFIG.session
+    if session_config.backend == SESSION_COOKIE:
+        return None
+    if session_config.backend == SESSION_SQLITE:
+        return SqliteSessionInterface(
+            lifetime_second=session_config.lifetime_second,
+            cache_max_size=session_config.cache_max_size,
+            cache_ttl_second=session_config.cache_ttl_second,
+        )
+    raise ValueError(f"Unknown session backend: {session_config.backend}")
+
+
+def build_session_sweeper() -> SessionSweeper:
+    """Create a SessionSweeper from CONFIG.session."""
+    return SessionSweeper(
+        interval_second=CONFIG.session.sweep_interval_second,
+        batch_size=CONFIG.session.sweep_batch_size,
+    )
@@ -2,3 +2,31 @@ class ApiLimitError(Exception):
     def __init__(self, message="This is a custom exception"):
         self.message = message
         super().__init__(self.message)
+
+
+class UpstreamLimitError(ApiLimitError):
+    """Raised when the upstream API itself refuses a call for its rate limit."""
+
+
+class TradeError(Exception):
+    """Raised when a trade is rejected by the trade engine."""
+
+    def __init__(self, message="Trade rejected"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class InsufficientCashError(TradeError):
+    """Raised when a user cannot afford a purchase."""
+
+
+class InsufficientSharesError(TradeError):
+    """Raised when a user sells more shares than they hold."""
+
+
+class OrderFailedError(Exception):
+    """Raised when a queued order failed on an unexpected error, not a rejection."""
+
+    def __init__(self, message="Order failed"):
+        self.message = message
+        super().__init__(self.message)
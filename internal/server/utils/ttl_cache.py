@@ -0,0 +1,98 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    In-process LRU cache of dictionaries with a per-entry expiry time.
+
+    Values are copied on the way in and out, so callers never share a
+    dictionary with the cache or with each other. Expired entries are
+    treated as misses and dropped.
+    """
+
+    def __init__(self, max_size, ttl_second):
+        self.max_size = max_size
+        self.ttl_second = ttl_second
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Return the cached value of key, or None on a miss.
+        Returns:
+            a copy of the cached dictionary, or None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def put(self, key, value, expires_at=None):
+        """
+        Store a value, evicting the least recently used entry when full.
+        Args:
+            key: the cache key
+            value: a dictionary
+            expires_at: epoch seconds after which the entry is stale,
+                defaults to now + ttl_second
+        """
+        if self.max_size <= 0:
+            return
+        if expires_at is None:
+            expires_at = time.time() + self.ttl_second
+        if expires_at <= time.time():
+            return
+
+        with self._lock:
+            self._entries[key] = (dict(value), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Drop a single key from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Return the cache counters.
+        Returns:
+            a dictionary with size, max_size, hits, misses, evictions and hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -88,7 +88,7 @@ def usd(value):
 def time_format(time):
     """Format DATETIME as"""
     try:
-        time_obj = datetime.strptime(time, "%Y-%m-%d %H:%M:%S.%f")
+        time_obj = datetime.fromisoformat(time)
         return time_obj.strftime("%b %d, %Y %I:%M %p")
-    except ValueError:
+    except (TypeError, ValueError):
         return time
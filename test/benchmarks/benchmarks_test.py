@@ -0,0 +1,92 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from urllib.request import urlopen
+
+from benchmarks.fake_quote_server import FakeQuoteServer
+from benchmarks.load import RouteStats, percentile
+from benchmarks.seed import SeedConfig, base_price, seed_database, symbol_universe
+from internal.server.api.API_handlers import is_limited
+
+
+class FakeQuoteServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeQuoteServer(latency_second=0, limit_after=1)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def get(self, symbol):
+        url = f"{self.server.url}?function=GLOBAL_QUOTE&symbol={symbol}&apikey=x"
+        with urlopen(url) as response:
+            return json.load(response)
+
+    def test_quotes_then_rate_limit_note(self):
+        quote = self.get("aapl")
+        self.assertEqual(quote["Global Quote"]["01. symbol"], "AAPL")
+        self.assertAlmostEqual(
+            float(quote["Global Quote"]["05. price"]), base_price("AAPL"), places=4
+        )
+        self.assertFalse(is_limited(quote))
+
+        self.assertTrue(is_limited(self.get("AAPL")))
+        self.assertEqual(self.server.stats()["requests"], 2)
+        self.assertEqual(self.server.stats()["limited"], 1)
+
+
+class SeedDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "bench.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_seeded_state_matches_trades(self):
+        config = SeedConfig(
+            users=5, symbols=20, holdings_per_user=3, trades_per_user=10
+        )
+        seeded = seed_database(self.path, config)
+
+        self.assertEqual(seeded["trades"], 50)
+        self.assertEqual(seeded["cold_symbols"], 2)
+        conn = sqlite3.connect(self.path)
+        try:
+            count = lambda sql: conn.execute(sql).fetchone()[0]
+            self.assertEqual(count("SELECT COUNT(*) FROM history_logs"), 50)
+            self.assertEqual(count("SELECT COUNT(*) FROM leaderboard"), 5)
+            self.assertEqual(count("SELECT COUNT(*) FROM symbols"), 20)
+            self.assertEqual(
+                count("SELECT SUM(shares_amount) FROM user_stocks"),
+                count("SELECT SUM(shares) FROM positions"),
+            )
+        finally:
+            conn.close()
+
+    def test_symbol_universe_is_distinct(self):
+        symbols = symbol_universe(800)
+        self.assertEqual(len(set(symbols)), 800)
+        self.assertEqual(symbols[:2], ["AAA", "AAB"])
+
+
+class RouteStatsTest(unittest.TestCase):
+    def test_summary(self):
+        stats = RouteStats()
+        for n in range(1, 101):
+            stats.add(n / 1000, 200 if n <= 98 else 500)
+
+        summary = stats.summary()
+
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["errors"], 2)
+        self.assertEqual(summary["statuses"], {"200": 98, "500": 2})
+        self.assertEqual(summary["p50_ms"], 50.0)
+        self.assertEqual(summary["p99_ms"], 99.0)
+        self.assertEqual(percentile([1, 2, 3], 100), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
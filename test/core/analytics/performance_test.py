@@ -0,0 +1,125 @@
+import math
+import sqlite3
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from internal.core.analytics import (
+    load_performance,
+    performance_metrics,
+    update_performance,
+)
+from internal.core.trade import TRADE_BUY, TRADE_SELL, apply_trade
+from internal.server.model.migrations import migrate
+from internal.server.model.price_history import INTERVAL_DAILY, store_bars
+
+
+def bar(day, close):
+    return (day, close, close, close, close, 1000)
+
+
+class TestPerformance(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        migrate(self.conn)
+        self.conn.execute(
+            "INSERT INTO users (id, username, hash, cash) VALUES (1, 'alice', '', 1000)"
+        )
+        self.conn.commit()
+        # Mon 2024-01-01 to Mon 2024-01-08, no bar on the weekend
+        store_bars(
+            self.conn,
+            "AAPL",
+            INTERVAL_DAILY,
+            [
+                bar("2024-01-01", 100.0),
+                bar("2024-01-02", 110.0),
+                bar("2024-01-03", 90.0),
+                bar("2024-01-05", 120.0),
+                bar("2024-01-08", 130.0),
+            ],
+            100,
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def trade(self, trade_type, price, shares, day):
+        with self.conn:
+            apply_trade(
+                self.conn,
+                trade_type,
+                1,
+                "AAPL",
+                price,
+                shares,
+                datetime.fromisoformat(f"{day} 10:00:00"),
+            )
+
+    def nav(self):
+        return self.conn.execute(
+            "SELECT date, nav FROM performance_nav WHERE user_id = 1 ORDER BY date"
+        ).fetchall()
+
+    def test_replays_trades_into_daily_nav(self):
+        self.trade(TRADE_BUY, 100.0, 5, "2024-01-01")
+        self.trade(TRADE_SELL, 90.0, 2, "2024-01-03")
+
+        replayed = update_performance(self.conn, 1, end="2024-01-08")
+
+        self.assertEqual(replayed, 2)
+        # Cash is 500 then 680; 01-04 has no bar and keeps the 01-03 close
+        self.assertEqual(
+            [(row["date"], row["nav"]) for row in self.nav()],
+            [
+                ("2024-01-01", 1000.0),
+                ("2024-01-02", 1050.0),
+                ("2024-01-03", 950.0),
+                ("2024-01-04", 950.0),
+                ("2024-01-05", 1040.0),
+                ("2024-01-08", 1070.0),
+            ],
+        )
+
+    def test_resumes_from_checkpoint(self):
+        self.trade(TRADE_BUY, 100.0, 5, "2024-01-01")
+        update_performance(self.conn, 1, end="2024-01-03")
+
+        self.trade(TRADE_SELL, 120.0, 5, "2024-01-05")
+        replayed = update_performance(self.conn, 1, end="2024-01-08")
+
+        self.assertEqual(replayed, 1)
+        self.assertEqual(
+            [row["nav"] for row in self.nav()],
+            [1000.0, 1050.0, 950.0, 950.0, 1100.0, 1100.0],
+        )
+        self.assertEqual(update_performance(self.conn, 1, end="2024-01-08"), 0)
+
+    def test_user_without_trades_has_no_nav(self):
+        result = load_performance(self.conn, 1, end="2024-01-08")
+
+        self.assertEqual(len(result["nav"]), 0)
+        self.assertIsNone(result["sharpe"])
+
+    def test_metrics(self):
+        nav = [100.0, 110.0, 99.0, 108.9]
+        returns = np.array([0.1, -0.1, 0.1])
+
+        metrics = performance_metrics(nav)
+
+        np.testing.assert_allclose(metrics["returns"], returns)
+        self.assertAlmostEqual(metrics["total_return"], 0.089)
+        self.assertAlmostEqual(
+            metrics["volatility"], returns.std(ddof=1) * math.sqrt(252)
+        )
+        self.assertAlmostEqual(
+            metrics["sharpe"], returns.mean() / returns.std(ddof=1) * math.sqrt(252)
+        )
+        self.assertAlmostEqual(metrics["max_drawdown"], -0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import sqlite3
+import unittest
+
+import numpy as np
+
+from internal.core.backtest import (
+    backtest_strategy,
+    load_close_prices,
+    run_backtest,
+)
+from internal.core.backtest.strategies import momentum, rolling_mean, sma_crossover
+from internal.server.model.migrations import migrate
+from internal.server.model.price_history import store_bars
+
+
+class TestStrategies(unittest.TestCase):
+
+    def test_rolling_mean(self):
+        means = rolling_mean([1, 2, 3, 4], 2)
+
+        self.assertTrue(np.isnan(means[0]))
+        np.testing.assert_allclose(means[1:], [1.5, 2.5, 3.5])
+
+    def test_sma_crossover_holds_while_fast_is_above_slow(self):
+        close = np.array([10, 10, 10, 12, 14, 12, 8, 6], dtype=float)
+
+        signal = sma_crossover(close, 1, 3)
+        self.assertEqual(
+            signal.tolist(), [False, False, False, True, True, False, False, False]
+        )
+        with self.assertRaises(ValueError):
+            sma_crossover(close, 3, 3)
+
+    def test_momentum(self):
+        signal = momentum([10, 11, 12, 11, 10], 1, 0.0)
+
+        self.assertEqual(signal.tolist(), [False, True, True, False, False])
+
+
+class TestRunBacktest(unittest.TestCase):
+
+    def test_accounting_uses_whole_shares_and_available_cash(self):
+        close = np.array([10.0, 30.0, 40.0, 20.0, 25.0])
+        signal = np.array([False, True, True, False, True])
+
+        result = run_backtest(close, signal, initial_cash=100.0)
+
+        # Buy 3 at 30 (10 left), sell 3 at 20 (70), buy 2 at 25 (20 left)
+        self.assertEqual(
+            [(t["type"], t["shares"], t["price"]) for t in result["trades"]],
+            [("buy", 3, 30.0), ("sell", 3, 20.0), ("buy", 2, 25.0)],
+        )
+        np.testing.assert_allclose(result["cash"], [100, 10, 10, 70, 20])
+        np.testing.assert_allclose(result["equity"], [100, 100, 130, 70, 70])
+        self.assertAlmostEqual(result["max_drawdown"], 70 / 130 - 1)
+        self.assertAlmostEqual(result["total_return"], -0.3)
+
+    def test_unaffordable_entries_are_skipped(self):
+        result = run_backtest([50.0, 200.0, 50.0], [False, True, True], 100.0)
+
+        self.assertEqual(result["trades"], [])
+        np.testing.assert_allclose(result["equity"], [100, 100, 100])
+
+    def test_strategy_over_the_price_store(self):
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        migrate(conn)
+        prices = [10, 10, 10, 12, 14, 12, 8, 6]
+        store_bars(
+            conn,
+            "AAPL",
+            "daily",
+            [
+                (f"2024-01-{day + 1:02d}", p, p, p, p, 100)
+                for day, p in enumerate(prices)
+            ],
+            batch_size=100,
+        )
+
+        dates, close = load_close_prices(conn, "AAPL")
+        result = backtest_strategy(
+            close, "sma_crossover", {"fast": 1, "slow": 3}, 1000.0, dates
+        )
+        conn.close()
+
+        self.assertEqual(
+            [(t["type"], t["date"]) for t in result["trades"]],
+            [("buy", "2024-01-04"), ("sell", "2024-01-06")],
+        )
+        self.assertEqual(result["trade_count"], 2)
+        with self.assertRaises(ValueError):
+            backtest_strategy(close, "unknown", {})
+
+
+if __name__ == "__main__":
+    unittest.main()
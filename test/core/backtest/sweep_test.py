@@ -0,0 +1,127 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+from internal.core.backtest.sweep import (
+    RESULT_COLUMNS,
+    CsvSink,
+    SqliteSink,
+    params_key,
+    parameter_grid,
+    run_sweep,
+)
+
+GRID = {"fast": [2, 3, 5], "slow": [10, 20]}
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(7)
+        self.close = 100 * np.cumprod(1 + rng.normal(0, 0.02, 300))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_parameter_grid(self):
+        grid = parameter_grid(GRID)
+
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0], {"fast": 2, "slow": 10})
+        self.assertEqual(params_key(grid[0]), '{"fast": 2, "slow": 10}')
+
+    def test_sweep_streams_results_and_resumes(self):
+        path = os.path.join(self.dir, "sweeps.db")
+        sink = SqliteSink(path, "test")
+        sink.write(
+            [
+                {
+                    "params": params_key({"fast": 2, "slow": 10}),
+                    "final_equity": 1.0,
+                    "total_return": 0.0,
+                    "max_drawdown": 0.0,
+                    "trade_count": 0,
+                }
+            ]
+        )
+
+        ran = run_sweep(
+            self.close, "sma_crossover", GRID, sink, workers=2, chunk_size=2
+        )
+        self.assertEqual(ran, 5)
+        self.assertEqual(
+            run_sweep(self.close, "sma_crossover", GRID, sink, workers=2), 0
+        )
+        sink.close()
+
+        conn = sqlite3.connect(path)
+        rows = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT params) FROM sweep_results"
+        ).fetchone()
+        conn.close()
+        self.assertEqual(rows, (6, 6))
+
+    def test_invalid_combinations_are_skipped(self):
+        path = os.path.join(self.dir, "sweeps.db")
+        sink = SqliteSink(path, "overlap")
+        grid = {"fast": [5, 10, 20], "slow": [10, 20]}
+
+        ran = run_sweep(
+            self.close, "sma_crossover", grid, sink, workers=2, chunk_size=4
+        )
+
+        self.assertEqual(ran, 3)
+        self.assertEqual(
+            sink.done_keys(),
+            {
+                params_key({"fast": 5, "slow": 10}),
+                params_key({"fast": 5, "slow": 20}),
+                params_key({"fast": 10, "slow": 20}),
+            },
+        )
+        sink.close()
+
+    def test_csv_sink(self):
+        path = os.path.join(self.dir, "sweeps.csv")
+        sink = CsvSink(path, "test")
+        run_sweep(self.close, "momentum", {"lookback": [5, 10]}, sink, workers=1)
+        sink.close()
+
+        sink = CsvSink(path, "test")
+        self.assertEqual(
+            run_sweep(
+                self.close, "momentum", {"lookback": [5, 10, 20]}, sink, workers=1
+            ),
+            1,
+        )
+        self.assertEqual(len(sink.done_keys()), 3)
+        sink.close()
+
+    def test_csv_sweeps_resume_separately(self):
+        path = os.path.join(self.dir, "sweeps.csv")
+        grid = {"lookback": [5, 10]}
+        first = CsvSink(path, "first")
+        run_sweep(self.close, "momentum", grid, first, workers=1)
+        first.close()
+
+        second = CsvSink(path, "second")
+        self.assertEqual(run_sweep(self.close, "momentum", grid, second, workers=1), 2)
+        self.assertEqual(len(second.done_keys()), 2)
+        second.close()
+
+    def test_csv_without_sweep_id_is_rejected(self):
+        path = os.path.join(self.dir, "sweeps.csv")
+        with open(path, "w", newline="") as file:
+            file.write(",".join(RESULT_COLUMNS) + "\r\n")
+
+        with self.assertRaises(ValueError):
+            CsvSink(path, "test")
+
+
+if __name__ == "__main__":
+    unittest.main()
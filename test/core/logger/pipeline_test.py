@@ -0,0 +1,91 @@
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import unittest
+
+from internal.core.logger.pipeline import (
+    BatchQueueListener,
+    BoundedQueueHandler,
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP,
+    ROTATION_SIZE,
+    file_handler,
+)
+
+
+class Rotation:
+    def __init__(self, max_bytes, backup_count=2):
+        self.mode = ROTATION_SIZE
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.when = "midnight"
+
+
+def record(message, level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 0, message, None, None)
+
+
+class TestLogPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.log_dir, "test.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def read(self, path=None):
+        with open(path or self.path, "r") as file:
+            return file.read().splitlines()
+
+    def test_full_queue_drops_or_blocks(self):
+        dropping = BoundedQueueHandler(queue.Queue(maxsize=1), OVERFLOW_DROP)
+        dropping.handle(record("kept"))
+        dropping.handle(record("dropped"))
+        self.assertEqual(dropping.dropped, 1)
+        self.assertEqual(dropping.queue.get_nowait().getMessage(), "kept")
+
+        blocking = BoundedQueueHandler(queue.Queue(maxsize=1), OVERFLOW_BLOCK)
+        self.assertTrue(blocking.block)
+        with self.assertRaises(ValueError):
+            BoundedQueueHandler(queue.Queue(), "explode")
+
+    def test_listener_writes_queued_records_and_reports_drops(self):
+        log_queue = queue.Queue(maxsize=2)
+        source = BoundedQueueHandler(log_queue, OVERFLOW_DROP)
+        handler = file_handler(self.path, Rotation(1 << 20))
+        handler.setLevel(logging.INFO)
+        listener = BatchQueueListener(log_queue, [handler], 10, source=source)
+
+        for message in ("first", "second", "third"):
+            source.handle(record(message))
+        source.handle(record("hidden", logging.DEBUG))
+        listener.start()
+        listener.stop()
+        handler.close()
+
+        self.assertEqual(
+            self.read(),
+            ["first", "second", "Dropped 2 log records because the log queue was full"],
+        )
+
+    def test_size_rotation(self):
+        log_queue = queue.Queue()
+        handler = file_handler(self.path, Rotation(max_bytes=10))
+        listener = BatchQueueListener(log_queue, [handler], 1)
+
+        listener.start()
+        for message in ("0123456789", "abcdefghij", "last"):
+            log_queue.put(record(message))
+        listener.stop()
+        handler.close()
+
+        self.assertEqual(self.read(), ["last"])
+        self.assertEqual(self.read(self.path + ".1"), ["abcdefghij"])
+        self.assertEqual(self.read(self.path + ".2"), ["0123456789"])
+
+
+if __name__ == "__main__":
+    unittest.main()
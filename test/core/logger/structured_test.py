@@ -0,0 +1,86 @@
+import json
+import logging
+import unittest
+
+from internal.core.logger.structured import (
+    FORMAT_JSON,
+    FORMAT_TEXT,
+    JsonFormatter,
+    SamplingFilter,
+    build_formatter,
+    event,
+)
+
+
+class ListHandler(logging.Handler):
+    """Keeps the records it handles and counts how often it formats one."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.formatted = 0
+
+    def emit(self, record):
+        self.format(record)
+        self.formatted += 1
+        self.records.append(record)
+
+
+class TestStructuredLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger("structured_test")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = ListHandler()
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.filters.clear()
+
+    def test_json_lines_carry_the_event_fields(self):
+        record = self.logger.makeRecord(
+            "app",
+            logging.INFO,
+            __file__,
+            0,
+            "Bought %s",
+            ("AAPL",),
+            None,
+            extra=event("portfolio.buy", user_id=1, symbol="AAPL", duration_ms=1.5),
+        )
+
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["message"], "Bought AAPL")
+        self.assertEqual(entry["event"], "portfolio.buy")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(
+            (entry["user_id"], entry["symbol"], entry["duration_ms"]), (1, "AAPL", 1.5)
+        )
+
+    def test_sampled_out_and_disabled_records_are_never_formatted(self):
+        self.logger.addFilter(SamplingFilter({"noisy": 0.0, "kept": 1.0}))
+
+        self.logger.info("%s", "dropped", extra=event("noisy"))
+        self.logger.debug("%s", "disabled", extra=event("kept"))
+        self.assertEqual(self.handler.formatted, 0)
+        self.assertEqual(self.handler.records, [])
+
+        self.logger.info("%s", "kept", extra=event("kept"))
+        self.logger.info("%s", "plain")
+        self.assertEqual(self.handler.formatted, 2)
+        self.assertEqual(
+            [record.getMessage() for record in self.handler.records],
+            ["kept", "plain"],
+        )
+
+    def test_build_formatter(self):
+        self.assertIsInstance(build_formatter(FORMAT_JSON), JsonFormatter)
+        self.assertNotIsInstance(build_formatter(FORMAT_TEXT), JsonFormatter)
+        with self.assertRaises(ValueError):
+            build_formatter("xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from internal.core.trade import TRADE_BUY, TRADE_SELL, OrderQueue
+from internal.core.trade import order_queue
+from internal.core.trade.order_queue import (
+    TICKET_FAILED,
+    TICKET_FILLED,
+    TICKET_REJECTED,
+)
+from internal.server.model.migrations import migrate
+from internal.server.utils.exception import (
+    InsufficientCashError,
+    OrderFailedError,
+    TradeError,
+)
+
+
+class TestOrderQueue(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        conn = self.connect()
+        migrate(conn)
+        conn.execute(
+            "INSERT INTO users (id, username, hash, cash) VALUES (1, 'alice', '', 1000)"
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def connect(self):
+        return sqlite3.connect(self.db_path, check_same_thread=False)
+
+    def make_queue(self, max_batch_size=100, max_latency_second=0.05):
+        return OrderQueue(
+            connect=self.connect,
+            max_batch_size=max_batch_size,
+            max_latency_second=max_latency_second,
+            max_pending=1000,
+        )
+
+    def test_orders_are_group_committed(self):
+        orders = self.make_queue()
+        tickets = [orders.submit(TRADE_BUY, 1, "AAPL", 10.0, 1) for _ in range(20)]
+        orders.start()
+        receipts = [ticket.result(5) for ticket in tickets]
+        orders.stop(5)
+
+        self.assertEqual(receipts[-1]["cash"], 800.0)
+        self.assertEqual(orders.stats()["batches"], 1)
+        conn = self.connect()
+        self.assertEqual(
+            conn.execute("SELECT COUNT(*) FROM history_logs").fetchone()[0], 20
+        )
+        conn.close()
+
+    def test_rejected_order_does_not_undo_its_batch(self):
+        orders = self.make_queue()
+        filled = orders.submit(TRADE_BUY, 1, "AAPL", 400.0, 2)
+        rejected = orders.submit(TRADE_BUY, 1, "MSFT", 400.0, 1)
+        sold = orders.submit(TRADE_SELL, 1, "AAPL", 100.0, 1)
+        orders.start()
+
+        self.assertEqual(sold.result(5)["cash"], 300.0)
+        with self.assertRaises(InsufficientCashError):
+            rejected.result(5)
+        orders.stop(5)
+
+        self.assertEqual(filled.status, TICKET_FILLED)
+        self.assertEqual(rejected.status, TICKET_REJECTED)
+        self.assertIs(orders.ticket(rejected.id), rejected)
+        self.assertEqual(
+            rejected.to_dict()["error"], "Insufficient cash in your account"
+        )
+
+    def test_unexpected_order_error_fails_only_that_order(self):
+        apply_trade = order_queue.apply_trade
+
+        def broken_for_msft(conn, trade_type, user_id, symbol, *args):
+            if symbol == "MSFT":
+                raise TypeError("bad order")
+            return apply_trade(conn, trade_type, user_id, symbol, *args)
+
+        orders = self.make_queue()
+        with mock.patch.object(order_queue, "apply_trade", broken_for_msft):
+            filled = orders.submit(TRADE_BUY, 1, "AAPL", 10.0, 1)
+            failed = orders.submit(TRADE_BUY, 1, "MSFT", 10.0, 1)
+            orders.start()
+            self.assertEqual(filled.result(5)["cash"], 990.0)
+            with self.assertRaises(OrderFailedError) as raised:
+                failed.result(5)
+            self.assertIsInstance(raised.exception.__cause__, TypeError)
+        orders.stop(5)
+
+        self.assertEqual(failed.status, TICKET_FAILED)
+
+    def test_writer_survives_a_failed_batch(self):
+        orders = self.make_queue()
+        apply_batch = orders._apply_batch
+        calls = []
+
+        def fails_once(conn, batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                conn.execute("BEGIN IMMEDIATE")
+                raise RuntimeError("boom")
+            apply_batch(conn, batch)
+
+        with mock.patch.object(orders, "_apply_batch", fails_once):
+            first = orders.submit(TRADE_BUY, 1, "AAPL", 10.0, 1)
+            orders.start()
+            with self.assertRaises(OrderFailedError):
+                first.result(5)
+            second = orders.submit(TRADE_BUY, 1, "AAPL", 10.0, 1)
+            self.assertEqual(second.result(5)["cash"], 990.0)
+        orders.stop(5)
+
+        self.assertEqual(first.status, TICKET_FAILED)
+
+    def test_batches_are_capped(self):
+        orders = self.make_queue(max_batch_size=4)
+        tickets = [orders.submit(TRADE_BUY, 1, "AAPL", 1.0, 1) for _ in range(10)]
+        orders.start()
+        for ticket in tickets:
+            ticket.result(5)
+        orders.stop(5)
+
+        self.assertEqual(orders.stats()["batches"], 3)
+
+    def test_invalid_orders_are_rejected_before_queueing(self):
+        orders = self.make_queue()
+
+        with self.assertRaises(TradeError):
+            orders.submit(TRADE_BUY, 1, "AAPL", 1.0, 0)
+        with self.assertRaises(TradeError):
+            orders.submit("short", 1, "AAPL", 1.0, 1)
+        self.assertEqual(orders.stats()["pending"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
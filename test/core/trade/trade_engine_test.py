@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from contextlib import closing
+
+from internal.core.trade import TRADE_BUY, TRADE_SELL, execute_trade
+from internal.server.model.migrations import migrate
+from internal.server.utils.exception import (
+    InsufficientCashError,
+    InsufficientSharesError,
+    TradeError,
+)
+
+
+class TestTradeEngine(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.conn = self.connect()
+        migrate(self.conn)
+        self.conn.execute(
+            "INSERT INTO users (id, username, hash, cash) VALUES (1, 'alice', '', 1000)"
+        )
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.db_path)
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    def cash(self):
+        return self.conn.execute("SELECT cash FROM users WHERE id = 1").fetchone()[0]
+
+    def shares(self, symbol="AAPL"):
+        row = self.conn.execute(
+            "SELECT shares_amount FROM user_stocks WHERE user_id = 1 AND stock_symbol = ?",
+            (symbol,),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def position(self, symbol="AAPL"):
+        return self.conn.execute(
+            "SELECT shares, avg_cost, realized_pnl FROM positions "
+            "WHERE user_id = 1 AND stock_symbol = ?",
+            (symbol,),
+        ).fetchone()
+
+    def history_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM history_logs").fetchone()[0]
+
+    def test_buy_then_sell_updates_cash_holdings_and_history(self):
+        receipt = execute_trade(self.conn, TRADE_BUY, 1, "AAPL", 100.0, 3)
+        execute_trade(self.conn, TRADE_BUY, 1, "AAPL", 50.0, 2)
+
+        self.assertEqual(receipt["cash"], 700.0)
+        self.assertEqual(self.cash(), 600.0)
+        self.assertEqual(self.shares(), 5)
+        self.assertEqual(self.position(), (5, 80.0, 0.0))
+
+        execute_trade(self.conn, TRADE_SELL, 1, "AAPL", 10.0, 4)
+        self.assertEqual(self.shares(), 1)
+        self.assertEqual(self.position(), (1, 80.0, -280.0))
+        receipt = execute_trade(self.conn, TRADE_SELL, 1, "AAPL", 10.0, 1)
+        self.assertEqual(receipt["cash"], 650.0)
+        self.assertEqual(self.shares(), 0)
+        self.assertEqual(self.position(), (0, 0.0, -350.0))
+        self.assertEqual(self.history_count(), 4)
+
+    def test_trades_invalidate_the_cached_valuation(self):
+        self.conn.execute(
+            "INSERT INTO portfolio_valuations VALUES (1, 0, 0, 0, '2024-01-01')"
+        )
+        self.conn.commit()
+
+        execute_trade(self.conn, TRADE_BUY, 1, "AAPL", 10.0, 1)
+        self.assertEqual(
+            self.conn.execute("SELECT COUNT(*) FROM portfolio_valuations").fetchone()[
+                0
+            ],
+            0,
+        )
+
+    def test_rejected_trades_write_nothing(self):
+        with self.assertRaises(InsufficientCashError):
+            execute_trade(self.conn, TRADE_BUY, 1, "AAPL", 600.0, 2)
+        with self.assertRaises(InsufficientSharesError):
+            execute_trade(self.conn, TRADE_SELL, 1, "AAPL", 10.0, 1)
+        with self.assertRaises(TradeError):
+            execute_trade(self.conn, TRADE_BUY, 2, "AAPL", 1.0, 1)
+        with self.assertRaises(TradeError):
+            execute_trade(self.conn, TRADE_BUY, 1, "AAPL", 1.0, 0)
+
+        self.assertEqual(self.cash(), 1000)
+        self.assertEqual(self.history_count(), 0)
+        self.assertFalse(self.conn.in_transaction)
+
+    def test_concurrent_buys_never_overspend(self):
+        results = []
+        lock = threading.Lock()
+
+        def buy():
+            with closing(self.connect()) as conn:
+                try:
+                    execute_trade(conn, TRADE_BUY, 1, "AAPL", 100.0, 1)
+                    outcome = "filled"
+                except InsufficientCashError:
+                    outcome = "rejected"
+            with lock:
+                results.append(outcome)
+
+        threads = [threading.Thread(target=buy) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count("filled"), 10)
+        self.assertEqual(self.cash(), 0)
+        self.assertEqual(self.shares(), 10)
+        self.assertEqual(self.history_count(), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from flask import Flask
+
+from internal.server.api import API_handlers
+from internal.server.api.quote_cache import quote_cache
+from internal.server.api.upstream_client import (
+    StubTransport,
+    UpstreamClient,
+    set_upstream_client,
+)
+from internal.server.model import sqlite_connection
+from internal.server.model.migrations import migrate
+from internal.server.model.symbols import store_symbols
+
+
+class TestLookupMany(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        conn = sqlite3.connect(self.db_path)
+        migrate(conn)
+        fresh = datetime.now().strftime(API_handlers.STOCK_TIME_FORMAT)
+        stale = (
+            datetime.now() - timedelta(seconds=API_handlers.API_TIME_TO_UPDATE + 60)
+        ).strftime(API_handlers.STOCK_TIME_FORMAT)
+        conn.executemany(
+            "INSERT INTO stock_status VALUES (?, ?, ?)",
+            [("AAPL", 10.0, fresh), ("MSFT", 20.0, stale)],
+        )
+        conn.commit()
+        conn.close()
+
+        self.db_patch = mock.patch.object(sqlite_connection, "DB_PATH", self.db_path)
+        self.db_patch.start()
+        self.app_context = Flask(__name__).app_context()
+        self.app_context.push()
+        quote_cache.clear()
+        self.requested = []
+        self.handler = self.quote_handler
+        self.previous_client = set_upstream_client(
+            UpstreamClient(
+                base_url="http://upstream.test/query",
+                pool_size=1,
+                max_retries=0,
+                retry_backoff_second=0,
+                connect_timeout_second=1,
+                read_timeout_second=1,
+                transport=StubTransport(lambda request: self.handler(request)),
+            )
+        )
+
+    def tearDown(self):
+        set_upstream_client(self.previous_client)
+        sqlite_connection.close_db()
+        self.app_context.pop()
+        self.db_patch.stop()
+        quote_cache.clear()
+        os.remove(self.db_path)
+
+    def quote_handler(self, request):
+        symbol = parse_qs(urlparse(request.url).query)["symbol"][0]
+        self.requested.append(symbol)
+        if symbol == "ZZZZ":
+            return {"Global Quote": {}}
+        return {"Global Quote": {"01. symbol": symbol, "05. price": "42"}}
+
+    def test_only_stale_and_missing_symbols_are_fetched(self):
+        quotes = API_handlers.lookup_many(["aapl", "MSFT", "NVDA", "ZZZZ"], "key")
+
+        self.assertEqual(sorted(self.requested), ["MSFT", "NVDA", "ZZZZ"])
+        self.assertEqual(quotes["AAPL"]["price"], 10.0)
+        self.assertEqual(quotes["MSFT"]["price"], 42.0)
+        self.assertEqual(quotes["NVDA"]["price"], 42.0)
+        self.assertNotIn("ZZZZ", quotes)
+
+        rows = API_handlers.read_stock_rows(
+            sqlite_connection.get_db(), ["MSFT", "NVDA"]
+        )
+        self.assertEqual(rows["MSFT"]["stock_price"], 42.0)
+        self.assertEqual(rows["NVDA"]["stock_price"], 42.0)
+
+    def test_second_lookup_is_served_from_cache(self):
+        API_handlers.lookup("NVDA", "key")
+        API_handlers.lookup("nvda", "key")
+
+        self.assertEqual(self.requested, ["NVDA"])
+
+    def test_stale_symbols_are_fetched_concurrently(self):
+        def slow_handler(request):
+            time.sleep(0.2)
+            return self.quote_handler(request)
+
+        self.handler = slow_handler
+        started = time.perf_counter()
+        quotes = API_handlers.lookup_many(["NVDA", "AMD", "INTC", "TSLA"], "key")
+
+        self.assertEqual(len(quotes), 4)
+        self.assertLess(time.perf_counter() - started, 0.6)
+
+    def test_concurrent_lookups_of_one_symbol_fetch_once(self):
+        def slow_handler(request):
+            time.sleep(0.2)
+            return self.quote_handler(request)
+
+        self.handler = slow_handler
+        app = Flask(__name__)
+        results = []
+
+        def lookup_in_request():
+            with app.app_context():
+                results.append(API_handlers.lookup("NVDA", "key"))
+                sqlite_connection.close_db()
+
+        threads = [threading.Thread(target=lookup_in_request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.requested, ["NVDA"])
+        self.assertEqual([quote["price"] for quote in results], [42.0] * 5)
+
+    def test_deadline_falls_back_to_last_known_price(self):
+        def slow_handler(request):
+            time.sleep(0.5)
+            return self.quote_handler(request)
+
+        self.handler = slow_handler
+        with mock.patch.object(API_handlers.logger, "warning") as warning:
+            quotes = API_handlers.lookup_many(["MSFT"], "key", deadline_second=0.1)
+
+        self.assertEqual(quotes["MSFT"]["price"], 20.0)
+        warning.assert_called_once_with(API_handlers.LOG_DEADLINE_EXCEEDED, "MSFT")
+
+    def test_rate_limit_is_raised_without_a_fallback_price(self):
+        self.handler = lambda request: {"Information": "API rate limit reached"}
+        with self.assertRaises(API_handlers.ApiLimitError):
+            API_handlers.lookup_many(["NVDA"], "key")
+
+    def test_rate_limit_serves_stale_price(self):
+        self.handler = lambda request: {"Information": "API rate limit reached"}
+        quotes = API_handlers.lookup_many(["MSFT"], "key")
+
+        self.assertEqual(
+            quotes["MSFT"], {"symbol": "MSFT", "price": 20.0, "stale": True}
+        )
+
+    def test_exhausted_budget_skips_the_upstream(self):
+        with mock.patch.object(API_handlers.rate_budget, "acquire", return_value=0):
+            quotes = API_handlers.lookup_many(["MSFT"], "key")
+
+        self.assertEqual(self.requested, [])
+        self.assertTrue(quotes["MSFT"]["stale"])
+
+    def release_leases(self):
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute("DELETE FROM quote_leases")
+        conn.close()
+
+    def test_waiters_stop_when_the_lease_is_released_without_a_price(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            "INSERT INTO quote_leases VALUES ('MSFT', 'other-worker', ?)",
+            (time.time() + 60,),
+        )
+        conn.commit()
+        # The other worker gives up, e.g. rate-limited, without writing a price
+        timer = threading.Timer(0.2, self.release_leases)
+        timer.start()
+        try:
+            started = time.perf_counter()
+            quotes = API_handlers.wait_for_leases(conn, ["MSFT"], time.monotonic() + 5)
+            waited = time.perf_counter() - started
+        finally:
+            timer.join()
+            conn.close()
+
+        self.assertEqual(quotes, {})
+        self.assertLess(waited, 2)
+
+
+LISTING_HEADER = "symbol,name,exchange,assetType,ipoDate,delistingDate,status\r\n"
+
+
+class TestGetAllActiveStocks(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.db_path)
+        migrate(self.conn)
+        store_symbols(
+            self.conn,
+            [("MSFT", "Microsoft Corp", "NASDAQ", "Stock", None, "Active")],
+            0,
+            batch_size=100,
+        )
+
+        self.db_patch = mock.patch.object(sqlite_connection, "DB_PATH", self.db_path)
+        self.db_patch.start()
+        self.handler = None
+        self.previous_client = set_upstream_client(
+            UpstreamClient(
+                base_url="http://upstream.test/query",
+                pool_size=1,
+                max_retries=0,
+                retry_backoff_second=0,
+                connect_timeout_second=1,
+                read_timeout_second=1,
+                transport=StubTransport(lambda request: self.handler(request)),
+            )
+        )
+
+    def tearDown(self):
+        set_upstream_client(self.previous_client)
+        self.conn.close()
+        self.db_patch.stop()
+        os.remove(self.db_path)
+
+    def stored_symbols(self):
+        return self.conn.execute("SELECT symbol FROM symbols ORDER BY 1").fetchall()
+
+    def test_listing_is_streamed_into_symbols(self):
+        self.handler = lambda request: (
+            LISTING_HEADER
+            + "AAPL,Apple Inc,NASDAQ,Stock,1980-12-12,null,Active\r\n"
+            + "SPY,SPDR S&P 500 ETF Trust,NYSE ARCA,ETF,1993-01-22,null,Active\r\n"
+        )
+        stored = API_handlers.get_all_active_stocks(self.conn, "key", batch_size=1)
+
+        self.assertEqual(stored, 2)
+        self.assertEqual(self.stored_symbols(), [("AAPL",), ("SPY",)])
+
+    def test_rate_limited_listing_keeps_the_stored_symbols(self):
+        self.handler = lambda request: {"Information": "API rate limit reached"}
+        with self.assertRaises(API_handlers.UpstreamLimitError):
+            API_handlers.get_all_active_stocks(self.conn, "key", batch_size=1)
+
+        self.assertEqual(self.stored_symbols(), [("MSFT",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from internal.server.api.price_ingest import ingest_csv_file, ingest_upstream
+from internal.server.api.upstream_client import (
+    StubTransport,
+    UpstreamClient,
+    set_upstream_client,
+)
+from internal.server.model import sqlite_connection
+from internal.server.model.migrations import migrate
+from internal.server.model.price_history import bar_range, load_bars
+from internal.server.utils.exception import UpstreamLimitError
+
+DAILY_CSV = (
+    "timestamp,open,high,low,close,volume\r\n"
+    "2024-01-04,12,13,11,12.5,300\r\n"
+    "2024-01-03,11,12,10,11.5,200\r\n"
+    "2024-01-02,10,11,9,10.5,100\r\n"
+)
+
+
+class TestPriceIngest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        migrate(self.conn)
+
+        self.db_patch = mock.patch.object(sqlite_connection, "DB_PATH", self.db_path)
+        self.db_patch.start()
+        self.requests = []
+        self.body = DAILY_CSV
+        self.previous_client = set_upstream_client(
+            UpstreamClient(
+                base_url="http://upstream.test/query",
+                pool_size=1,
+                max_retries=0,
+                retry_backoff_second=0,
+                connect_timeout_second=1,
+                read_timeout_second=1,
+                transport=StubTransport(self.handler),
+            )
+        )
+
+    def tearDown(self):
+        set_upstream_client(self.previous_client)
+        self.db_patch.stop()
+        self.conn.close()
+        os.remove(self.db_path)
+
+    def handler(self, request):
+        self.requests.append(parse_qs(urlparse(request.url).query))
+        return self.body
+
+    def test_upstream_series_is_stored_in_batches(self):
+        stored = ingest_upstream(self.conn, "aapl", "key", batch_size=2)
+
+        self.assertEqual(stored, 3)
+        self.assertEqual(self.requests[0]["function"], ["TIME_SERIES_DAILY"])
+        self.assertEqual(self.requests[0]["datatype"], ["csv"])
+        bars = load_bars(self.conn, "AAPL")
+        self.assertEqual(
+            [bar["date"] for bar in bars], ["2024-01-02", "2024-01-03", "2024-01-04"]
+        )
+        self.assertEqual(bars[-1]["close"], 12.5)
+
+    def test_range_reads_and_reingest_upsert(self):
+        ingest_upstream(self.conn, "AAPL", "key")
+        self.body = DAILY_CSV.replace("12.5,300", "13,350")
+        ingest_upstream(self.conn, "AAPL", "key", outputsize="compact")
+
+        bars = load_bars(self.conn, "AAPL", start="2024-01-03", end="2024-01-04")
+        self.assertEqual([bar["close"] for bar in bars], [11.5, 13.0])
+        self.assertEqual(bar_range(self.conn, "AAPL")["bars"], 3)
+
+    def test_rate_limit_notice_is_reported(self):
+        self.body = {"Information": "You have hit the rate limit for today."}
+
+        with self.assertRaises(UpstreamLimitError):
+            ingest_upstream(self.conn, "AAPL", "key")
+        self.assertIsNone(bar_range(self.conn, "AAPL")["first_date"])
+
+    def test_local_intraday_csv_file(self):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as file:
+            file.write(
+                "Date,Open,High,Low,Close,Adjusted_Close,Volume\n"
+                "2024-01-02 09:30:00,1,2,0.5,1.5,1.5,10\n"
+                "2024-01-02 09:35:00,1.5,2,1,1.8,1.8,20\n"
+            )
+        try:
+            stored = ingest_csv_file(self.conn, "msft", path, interval="5min")
+        finally:
+            os.remove(path)
+
+        self.assertEqual(stored, 2)
+        self.assertEqual(
+            len(load_bars(self.conn, "MSFT", end="2024-01-02", interval="5min")), 2
+        )
+        self.assertEqual(load_bars(self.conn, "MSFT"), [])
+
+    def test_malformed_csv_is_rejected(self):
+        self.body = "timestamp,open,close\n2024-01-02,1,2\n"
+
+        with self.assertRaises(ValueError):
+            ingest_upstream(self.conn, "AAPL", "key")
+
+
+if __name__ == "__main__":
+    unittest.main()
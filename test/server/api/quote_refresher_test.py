@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from internal.server.api import API_handlers
+from internal.server.api.quote_cache import quote_cache
+from internal.server.api.quote_refresher import QuoteRefresher
+from internal.server.api.symbol_demand import symbol_demand
+from internal.server.api.upstream_client import (
+    StubTransport,
+    UpstreamClient,
+    set_upstream_client,
+)
+from internal.server.model import sqlite_connection
+from internal.server.model.migrations import migrate
+
+
+def price_time(age_second):
+    return (datetime.now() - timedelta(seconds=age_second)).strftime(
+        API_handlers.STOCK_TIME_FORMAT
+    )
+
+
+class TestQuoteRefresher(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        ttl = API_handlers.API_TIME_TO_UPDATE
+        conn = sqlite3.connect(self.db_path)
+        migrate(conn)
+        conn.executemany(
+            "INSERT INTO user_stocks VALUES (?, ?, ?)",
+            [(1, "AAPL", 1), (2, "AAPL", 1), (1, "MSFT", 1), (1, "IBM", 1)],
+        )
+        conn.executemany(
+            "INSERT INTO stock_status VALUES (?, ?, ?)",
+            [
+                ("AAPL", 1.0, price_time(ttl - 10)),  # expires in 10 seconds
+                ("MSFT", 1.0, price_time(ttl - 100)),  # expires in 100 seconds
+                ("IBM", 1.0, price_time(0)),  # fresh for a full TTL
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        self.db_patch = mock.patch.object(sqlite_connection, "DB_PATH", self.db_path)
+        self.db_patch.start()
+        self.requested = []
+        self.previous_client = set_upstream_client(
+            UpstreamClient(
+                base_url="http://upstream.test/query",
+                pool_size=1,
+                max_retries=0,
+                retry_backoff_second=0,
+                connect_timeout_second=1,
+                read_timeout_second=1,
+                transport=StubTransport(self.quote_handler),
+            )
+        )
+        quote_cache.clear()
+        symbol_demand.decay(0)
+
+    def tearDown(self):
+        set_upstream_client(self.previous_client)
+        self.db_patch.stop()
+        quote_cache.clear()
+        symbol_demand.decay(0)
+        os.remove(self.db_path)
+
+    def quote_handler(self, request):
+        symbol = parse_qs(urlparse(request.url).query)["symbol"][0]
+        self.requested.append(symbol)
+        return {"Global Quote": {"01. symbol": symbol, "05. price": "2"}}
+
+    def make_refresher(self, max_calls_per_cycle=5):
+        return QuoteRefresher(
+            api_key="key",
+            interval_second=60,
+            lead_second=600,
+            hot_symbols=10,
+            max_calls_per_cycle=max_calls_per_cycle,
+        )
+
+    def test_refreshes_symbols_about_to_expire(self):
+        symbol_demand.record(["NVDA"])
+
+        refreshed = self.make_refresher().refresh_once()
+
+        self.assertEqual(sorted(refreshed), ["AAPL", "MSFT", "NVDA"])
+        self.assertEqual(quote_cache.get("NVDA")["price"], 2.0)
+
+    def test_soonest_expiry_first_within_a_cycle(self):
+        refresher = self.make_refresher(max_calls_per_cycle=1)
+
+        self.assertEqual(refresher.refresh_once(), ["AAPL"])
+        self.assertEqual(refresher.refresh_once(), ["MSFT"])
+        self.assertEqual(self.requested, ["AAPL", "MSFT"])
+
+    def test_shared_budget_caps_the_refresher(self):
+        budget = API_handlers.rate_budget
+        with mock.patch.multiple(budget, daily_quota=1, reserved_for_trades=0):
+            refresher = self.make_refresher()
+            self.assertEqual(refresher.refresh_once(), ["AAPL"])
+            self.assertEqual(refresher.refresh_once(), [])
+
+        self.assertEqual(self.requested, ["AAPL"])
+
+    def test_refused_calls_do_not_stop_later_cycles(self):
+        refresher = self.make_refresher()
+        with mock.patch.object(API_handlers.rate_budget, "acquire", return_value=0):
+            self.assertEqual(refresher.refresh_once(), [])
+
+        self.assertEqual(sorted(refresher.refresh_once()), ["AAPL", "MSFT"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from contextlib import closing
+from unittest import mock
+
+from internal.server.api.rate_limiter import (
+    PRIORITY_DISPLAY,
+    PRIORITY_TRADE,
+    RateBudget,
+)
+from internal.server.model.migrations import migrate
+
+
+class TestRateBudget(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            migrate(conn)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def make_budget(self, requests_per_minute=60, daily_quota=10, reserved=2):
+        def connection():
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            return closing(conn)
+
+        return RateBudget(
+            name="test",
+            requests_per_minute=requests_per_minute,
+            daily_quota=daily_quota,
+            reserved_for_trades=reserved,
+            limited_cooldown_second=60,
+            connection=connection,
+        )
+
+    def test_display_calls_cannot_spend_the_trade_reserve(self):
+        budget = self.make_budget()
+
+        self.assertEqual(budget.acquire(20, PRIORITY_DISPLAY), 8)
+        self.assertEqual(budget.acquire(1, PRIORITY_DISPLAY), 0)
+        self.assertEqual(budget.acquire(5, PRIORITY_TRADE), 2)
+        self.assertEqual(budget.stats()["used_today"], 10)
+
+    def test_budget_is_shared_between_instances(self):
+        first, second = self.make_budget(), self.make_budget()
+
+        self.assertEqual(first.acquire(5), 5)
+        self.assertEqual(second.acquire(5), 3)
+
+    def test_token_bucket_refills_over_time(self):
+        budget = self.make_budget(requests_per_minute=2, daily_quota=100)
+        now = time.time()
+
+        with mock.patch("time.time", return_value=now):
+            self.assertEqual(budget.acquire(5), 2)
+            self.assertEqual(budget.acquire(1), 0)
+        with mock.patch("time.time", return_value=now + 30):
+            self.assertEqual(budget.acquire(5), 1)
+
+    def test_upstream_refusal_blocks_the_budget(self):
+        budget = self.make_budget()
+        budget.mark_exhausted()
+
+        self.assertEqual(budget.acquire(1, PRIORITY_TRADE), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
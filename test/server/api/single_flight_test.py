@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from internal.server.api.single_flight import QuoteLeases, SingleFlight
+from internal.server.model.migrations import migrate
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def slow_fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return 42
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(flight.do("AAPL", slow_fetch))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [42] * 8)
+
+    def test_errors_are_shared_with_followers(self):
+        flight = SingleFlight()
+        call, _ = flight.begin("AAPL")
+        follower, is_leader = flight.begin("AAPL")
+        self.assertFalse(is_leader)
+
+        flight.finish("AAPL", error=ValueError("boom"))
+
+        self.assertIsInstance(follower.wait(1)[1], ValueError)
+        self.assertTrue(flight.begin("AAPL")[1])
+
+
+class TestQuoteLeases(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.db_path)
+        migrate(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.db_path)
+
+    def test_lease_is_exclusive_until_released(self):
+        first = QuoteLeases(lease_second=30, owner="worker-1")
+        second = QuoteLeases(lease_second=30, owner="worker-2")
+
+        self.assertEqual(
+            first.acquire(self.conn, ["AAPL", "MSFT"]), (["AAPL", "MSFT"], [])
+        )
+        self.assertEqual(
+            second.acquire(self.conn, ["AAPL", "NVDA"]), (["NVDA"], ["AAPL"])
+        )
+
+        first.release(self.conn, ["AAPL"])
+        self.assertEqual(second.acquire(self.conn, ["AAPL"]), (["AAPL"], []))
+
+    def test_held_leases(self):
+        first = QuoteLeases(lease_second=30, owner="worker-1")
+        first.acquire(self.conn, ["AAPL", "MSFT"])
+        first.release(self.conn, ["MSFT"])
+
+        self.assertEqual(first.held(self.conn, ["AAPL", "MSFT", "NVDA"]), {"AAPL"})
+        with mock.patch("time.time", return_value=time.time() + 60):
+            self.assertEqual(first.held(self.conn, ["AAPL"]), set())
+
+    def test_expired_lease_can_be_taken_over(self):
+        first = QuoteLeases(lease_second=30, owner="worker-1")
+        second = QuoteLeases(lease_second=30, owner="worker-2")
+        first.acquire(self.conn, ["AAPL"])
+
+        with mock.patch("time.time", return_value=time.time() + 60):
+            self.assertEqual(second.acquire(self.conn, ["AAPL"]), (["AAPL"], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
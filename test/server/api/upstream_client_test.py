@@ -0,0 +1,77 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from internal.server.api.upstream_client import StubTransport, UpstreamClient
+
+
+def make_client(base_url, transport=None, max_retries=0):
+    return UpstreamClient(
+        base_url=base_url,
+        pool_size=2,
+        max_retries=max_retries,
+        retry_backoff_second=0,
+        connect_timeout_second=1,
+        read_timeout_second=1,
+        transport=transport,
+    )
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Fails with 503 until `failures` requests have been seen."""
+
+    failures = 0
+    seen = 0
+
+    def do_GET(self):
+        FlakyHandler.seen += 1
+        status = 503 if FlakyHandler.seen <= FlakyHandler.failures else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestUpstreamClient(unittest.TestCase):
+
+    def test_stub_transport_serves_canned_json(self):
+        transport = StubTransport(lambda request: {"echo": request.url})
+        client = make_client("http://upstream.test/query", transport)
+
+        data = client.get_json({"function": "GLOBAL_QUOTE", "symbol": "AAPL"})
+
+        self.assertIn("symbol=AAPL", data["echo"])
+        self.assertEqual(len(transport.requests), 1)
+
+    def test_stub_transport_error_status_raises(self):
+        client = make_client(
+            "http://upstream.test/query", StubTransport(lambda request: (500, ""))
+        )
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.get({})
+
+    def test_server_errors_are_retried_on_a_pooled_connection(self):
+        FlakyHandler.failures, FlakyHandler.seen = 2, 0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = make_client(
+                f"http://127.0.0.1:{server.server_port}/query", max_retries=2
+            )
+            self.assertEqual(client.get_json({}), {"ok": True})
+            self.assertEqual(FlakyHandler.seen, 3)
+            client.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
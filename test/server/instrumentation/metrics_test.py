@@ -0,0 +1,131 @@
+import sqlite3
+import time
+import unittest
+
+from internal.server.instrumentation.metrics import (
+    REQUEST_DURATION,
+    REQUEST_LATENCY,
+    SPAN_DB,
+    Histogram,
+    InstrumentedConnection,
+    MetricsRegistry,
+    begin_request,
+    end_request,
+    record_span,
+    span,
+)
+from internal.server.instrumentation.profiler import SamplingProfiler
+
+
+class HistogramTest(unittest.TestCase):
+    def test_quantile_interpolates_inside_bucket(self):
+        histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+        for value in (0.5, 1.5, 1.5, 3.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [1, 2, 1, 0])
+        self.assertAlmostEqual(histogram.quantile(0.5), 1.5)
+        self.assertAlmostEqual(histogram.quantile(1.0), 4.0)
+
+    def test_quantile_of_empty_histogram(self):
+        self.assertIsNone(Histogram().quantile(0.5))
+
+    def test_quantile_beyond_last_bucket(self):
+        histogram = Histogram(buckets=(1.0,))
+        histogram.observe(30.0)
+
+        self.assertEqual(histogram.quantile(0.99), 1.0)
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        labels = (("route", "/home"), ("method", "GET"))
+        registry.observe(REQUEST_DURATION, labels, 0.05)
+        registry.observe(REQUEST_DURATION, labels, 0.5)
+
+        text = registry.render([("finance_db_pool_idle", "Idle.", 2)])
+        lines = text.splitlines()
+
+        self.assertIn(f"# TYPE {REQUEST_DURATION} histogram", lines)
+        self.assertIn(
+            f'{REQUEST_DURATION}_bucket{{route="/home",method="GET",le="0.1"}} 1',
+            lines,
+        )
+        self.assertIn(
+            f'{REQUEST_DURATION}_bucket{{route="/home",method="GET",le="+Inf"}} 2',
+            lines,
+        )
+        self.assertIn(
+            f'{REQUEST_DURATION}_count{{route="/home",method="GET"}} 2', lines
+        )
+        self.assertIn(f"# TYPE {REQUEST_LATENCY} summary", lines)
+        self.assertIn(
+            f'{REQUEST_LATENCY}{{route="/home",method="GET",quantile="0.5"}} 0.1',
+            lines,
+        )
+        self.assertIn("finance_db_pool_idle 2.0", lines)
+
+    def test_render_escapes_label_values(self):
+        registry = MetricsRegistry(buckets=(1.0,))
+        registry.observe("metric", (("route", 'a"b'),), 0.5)
+
+        self.assertIn('metric_count{route="a\\"b"} 1', registry.render())
+
+
+class SpanTest(unittest.TestCase):
+    def tearDown(self):
+        end_request()
+
+    def test_spans_accumulate_within_request(self):
+        begin_request()
+        with span("quote.db"):
+            time.sleep(0.001)
+        record_span("quote.db", 1.0)
+
+        spans = end_request()
+
+        self.assertGreater(spans["quote.db"], 1.0)
+        self.assertEqual(end_request(), {})
+
+    def test_spans_outside_request_are_ignored(self):
+        with span("quote.db"):
+            pass
+
+        self.assertEqual(end_request(), {})
+
+    def test_instrumented_connection_records_db_span(self):
+        conn = sqlite3.connect(":memory:", factory=InstrumentedConnection)
+        try:
+            begin_request()
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+            conn.commit()
+            spans = end_request()
+
+            self.assertIn(SPAN_DB, spans)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 2)
+        finally:
+            conn.close()
+
+
+class SamplingProfilerTest(unittest.TestCase):
+    def test_samples_running_threads(self):
+        profiler = SamplingProfiler(interval_second=0.001)
+        profiler.start()
+        self.assertTrue(profiler.running)
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        profiler.stop()
+
+        self.assertFalse(profiler.running)
+        collapsed = profiler.collapsed()
+        self.assertIn("metrics_test.py:test_samples_running_threads", collapsed)
+
+        profiler.reset()
+        self.assertEqual(profiler.collapsed(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
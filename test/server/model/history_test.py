@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import sqlite3
+import unittest
+
+from internal.server.model.history import (
+    decode_cursor,
+    history_to_csv,
+    history_to_ndjson,
+    iter_history,
+    iter_trades,
+    load_history_page,
+)
+from internal.server.model.migrations import migrate
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        migrate(self.conn)
+        trades = [
+            (1, "buy", "AAPL", 10.0, 1, f"2024-01-0{day} 10:00:00.000000")
+            for day in range(1, 6)
+        ]
+        # Two trades with the same timestamp are ordered by id
+        trades.append((1, "sell", "AAPL", 11.0, 1, "2024-01-05 10:00:00.000000"))
+        trades.append((2, "buy", "MSFT", 20.0, 1, "2024-01-03 10:00:00.000000"))
+        self.conn.executemany(
+            "INSERT INTO history_logs "
+            "(user_id, type, stock_symbol, stock_price, shares_amount, time) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            trades,
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_pages_cover_history_once_in_order(self):
+        ids, cursor, pages = [], None, 0
+        while True:
+            rows, cursor = load_history_page(self.conn, 1, 2, cursor)
+            ids.extend(row["id"] for row in rows)
+            pages += 1
+            if cursor is None:
+                break
+
+        self.assertEqual(ids, [6, 5, 4, 3, 2, 1])
+        self.assertEqual(pages, 3)
+
+    def test_last_page_has_no_cursor(self):
+        rows, cursor = load_history_page(self.conn, 2, 1)
+
+        self.assertEqual([row["stock_symbol"] for row in rows], ["MSFT"])
+        self.assertIsNone(cursor)
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not a cursor")
+        with self.assertRaises(ValueError):
+            load_history_page(self.conn, 1, 2, "bm8tc2VwYXJhdG9y")
+
+    def test_pages_use_the_history_index(self):
+        rows, cursor = load_history_page(self.conn, 1, 2)
+        time, row_id = decode_cursor(cursor)
+
+        plan = " ".join(
+            row[3]
+            for row in self.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM history_logs "
+                "WHERE user_id = ? AND (time, id) < (?, ?) "
+                "ORDER BY time DESC, id DESC LIMIT 3",
+                (1, time, row_id),
+            )
+        )
+        self.assertIn("idx_history_logs_user_time", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_exports_stream_every_row(self):
+        rows = list(iter_history(self.conn, 1, 4))
+        self.assertEqual(len(rows), 6)
+
+        lines = list(history_to_csv(iter(rows)))
+        self.assertEqual(len(lines), 7)
+        parsed = list(csv.DictReader(io.StringIO("".join(lines))))
+        self.assertEqual(parsed[0]["type"], "sell")
+
+        records = [json.loads(line) for line in history_to_ndjson(iter(rows))]
+        self.assertEqual([record["id"] for record in records], [6, 5, 4, 3, 2, 1])
+
+    def test_trades_stream_oldest_first_after_a_key(self):
+        rows = list(iter_trades(self.conn, 1, batch_size=2))
+        self.assertEqual([row["id"] for row in rows], [1, 2, 3, 4, 5, 6])
+
+        after = (rows[3]["time"], rows[3]["id"])
+        rows = list(iter_trades(self.conn, 1, after, batch_size=2))
+        self.assertEqual([row["id"] for row in rows], [5, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import sqlite3
+import unittest
+
+from internal.core.trade import TRADE_BUY, TRADE_SELL, execute_trade
+from internal.server.model.leaderboard import (
+    load_rank,
+    load_top,
+    refresh_user_total,
+    shift_holder_totals,
+)
+from internal.server.model.migrations import migrate
+
+UPSERT_PRICE = (
+    "INSERT OR REPLACE INTO stock_status (stock_symbol, stock_price, time) "
+    "VALUES (?, ?, '2024-01-01 10:00:00')"
+)
+
+
+class TestLeaderboard(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        migrate(self.conn)
+        for user_id, name in ((1, "alice"), (2, "bob"), (3, "carol")):
+            self.conn.execute(
+                "INSERT INTO users (id, username, hash, cash) VALUES (?, ?, '', 1000)",
+                (user_id, name),
+            )
+            refresh_user_total(self.conn, user_id)
+        self.conn.execute(UPSERT_PRICE, ("AAPL", 100.0))
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def totals(self):
+        return {
+            row["user_id"]: row["total"]
+            for row in self.conn.execute("SELECT * FROM leaderboard")
+        }
+
+    def set_price(self, symbol, price):
+        quotes = [{"symbol": symbol, "price": price}]
+        shift_holder_totals(self.conn, quotes)
+        self.conn.execute(UPSERT_PRICE, (symbol, price))
+        self.conn.commit()
+
+    def test_trades_keep_totals_current(self):
+        execute_trade(self.conn, TRADE_BUY, 1, "AAPL", 90.0, 5)
+        self.assertEqual(self.totals(), {1: 1050.0, 2: 1000.0, 3: 1000.0})
+
+        execute_trade(self.conn, TRADE_SELL, 1, "AAPL", 110.0, 2)
+        self.assertEqual(self.totals()[1], 1070.0)
+
+    def test_price_changes_shift_holder_totals(self):
+        execute_trade(self.conn, TRADE_BUY, 1, "AAPL", 100.0, 5)
+        execute_trade(self.conn, TRADE_BUY, 2, "AAPL", 100.0, 1)
+
+        self.set_price("AAPL", 120.0)
+        self.assertEqual(self.totals(), {1: 1100.0, 2: 1020.0, 3: 1000.0})
+
+        # A symbol priced for the first time counts from zero
+        execute_trade(self.conn, TRADE_BUY, 3, "MSFT", 50.0, 2)
+        self.assertEqual(self.totals()[3], 900.0)
+        self.set_price("MSFT", 60.0)
+        self.assertEqual(self.totals()[3], 1020.0)
+
+    def test_top_and_rank(self):
+        execute_trade(self.conn, TRADE_BUY, 2, "AAPL", 100.0, 1)
+        self.set_price("AAPL", 150.0)
+
+        top = load_top(self.conn, 10)
+        self.assertEqual(
+            [(row["rank"], row["username"]) for row in top],
+            [(1, "bob"), (2, "alice"), (2, "carol")],
+        )
+        self.assertEqual(len(load_top(self.conn, 1)), 1)
+        self.assertEqual(load_rank(self.conn, 3)["rank"], 2)
+        self.assertIsNone(load_rank(self.conn, 42))
+
+    def test_queries_use_the_total_index(self):
+        for query in (
+            "SELECT * FROM leaderboard ORDER BY total DESC, user_id LIMIT 10",
+            "SELECT COUNT(*) FROM leaderboard WHERE total > 5",
+        ):
+            plan = " ".join(
+                row[3] for row in self.conn.execute("EXPLAIN QUERY PLAN " + query)
+            )
+            self.assertIn("idx_leaderboard_total", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from internal.server.model.migrations import (
+    applied_versions,
+    discover_migrations,
+    migrate,
+)
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.migrations_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.migrations_dir)
+
+    def write_migration(self, filename, script):
+        with open(os.path.join(self.migrations_dir, filename), "w") as file:
+            file.write(script)
+
+    def test_repo_migrations_create_schema_and_indexes(self):
+        applied = migrate(self.conn)
+
+        self.assertEqual(applied, sorted(applied))
+        self.assertEqual(set(applied), applied_versions(self.conn))
+        indexes = {
+            row[0]
+            for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        self.assertIn("idx_history_logs_user_time", indexes)
+        self.assertIn("idx_user_stocks_symbol", indexes)
+
+    def test_history_query_uses_covering_index(self):
+        migrate(self.conn)
+
+        plan = " ".join(
+            row[3]
+            for row in self.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM history_logs "
+                "WHERE user_id = ? ORDER BY time DESC, id DESC",
+                (1,),
+            )
+        )
+        self.assertIn("idx_history_logs_user_time", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_migrations_run_in_order_and_only_once(self):
+        self.write_migration("0002_add_column.sql", "ALTER TABLE t ADD COLUMN y;")
+        self.write_migration("0001_create.sql", "CREATE TABLE t (x);")
+        self.write_migration("README.md", "not a migration")
+
+        self.assertEqual(migrate(self.conn, self.migrations_dir), [1, 2])
+        self.assertEqual(migrate(self.conn, self.migrations_dir), [])
+
+        self.write_migration("0003_index.sql", "CREATE INDEX idx_t_y ON t (y);")
+        self.assertEqual(migrate(self.conn, self.migrations_dir), [3])
+
+    def test_failed_migration_is_rolled_back(self):
+        self.write_migration("0001_create.sql", "CREATE TABLE t (x);")
+        self.write_migration(
+            "0002_broken.sql", "CREATE TABLE u (x); INSERT INTO missing VALUES (1);"
+        )
+
+        with self.assertRaises(sqlite3.OperationalError):
+            migrate(self.conn, self.migrations_dir)
+
+        self.assertEqual(applied_versions(self.conn), {1})
+        tables = {
+            row[0]
+            for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        self.assertNotIn("u", tables)
+
+    def test_duplicate_versions_are_rejected(self):
+        self.write_migration("0001_a.sql", "")
+        self.write_migration("0001_b.sql", "")
+
+        with self.assertRaises(ValueError):
+            discover_migrations(self.migrations_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import sqlite3
+import unittest
+
+from internal.server.model.migrations import migrate
+from internal.server.model.portfolio import (
+    invalidate_holder_valuations,
+    load_portfolio,
+    load_valuation,
+    value_portfolio,
+)
+
+FIXTURES = """
+INSERT INTO users (id, username, hash, cash) VALUES (1, 'holder', '', 1000), (2, 'empty', '', 500);
+INSERT INTO positions (user_id, stock_symbol, shares, avg_cost, realized_pnl) VALUES
+    (1, 'AAPL', 2, 8, 0), (1, 'MSFT', 3, 25, 4), (1, 'NVDA', 1, 5, 0), (1, 'IBM', 0, 0, 6);
+INSERT INTO stock_status VALUES
+    ('AAPL', 10, '2024-01-01 00:00:00'),
+    ('MSFT', 20, '2024-01-01 00:00:00');
+"""
+
+
+class TestPortfolio(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        migrate(self.conn)
+        self.conn.executescript(FIXTURES)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def cached_users(self):
+        return [
+            row[0]
+            for row in self.conn.execute("SELECT user_id FROM portfolio_valuations")
+        ]
+
+    def test_load_portfolio_joins_open_positions_and_prices(self):
+        portfolio = load_portfolio(self.conn, 1)
+
+        self.assertEqual(portfolio["cash"], 1000.0)
+        self.assertEqual(
+            [(h["symbol"], h["shares"], h["price"]) for h in portfolio["holdings"]],
+            [("AAPL", 2, 10), ("MSFT", 3, 20), ("NVDA", 1, None)],
+        )
+
+    def test_load_portfolio_without_holdings(self):
+        self.assertEqual(load_portfolio(self.conn, 2), {"cash": 500.0, "holdings": []})
+        self.assertIsNone(load_portfolio(self.conn, 3))
+
+    def test_value_portfolio_skips_unpriced_holdings(self):
+        valuation = value_portfolio(load_portfolio(self.conn, 1))
+
+        self.assertEqual(
+            [stock["symbol"] for stock in valuation["stocks"]], ["AAPL", "MSFT"]
+        )
+        self.assertEqual(valuation["stocks"][1]["total"], 60.0)
+        self.assertEqual(valuation["stocks"][1]["pnl"], -15.0)
+        self.assertEqual(valuation["grand_total"], 1080.0)
+
+    def test_cached_valuation_matches_and_includes_closed_positions(self):
+        cached = load_valuation(self.conn, 1)
+        valuation = value_portfolio(load_portfolio(self.conn, 1), cached)
+
+        self.assertEqual(valuation["grand_total"], 1080.0)
+        self.assertEqual(valuation["cost_basis"], 91.0)
+        self.assertEqual(valuation["unrealized_pnl"], -11.0)
+        self.assertEqual(valuation["realized_pnl"], 10.0)
+        self.assertEqual(self.cached_users(), [1])
+        self.assertEqual(
+            load_valuation(self.conn, 1)["computed_at"], cached["computed_at"]
+        )
+
+    def test_only_price_changes_of_held_symbols_invalidate(self):
+        load_valuation(self.conn, 1)
+        load_valuation(self.conn, 2)
+
+        invalidate_holder_valuations(
+            self.conn,
+            [{"symbol": "AAPL", "price": 10.0}, {"symbol": "TSLA", "price": 1}],
+        )
+        self.assertEqual(self.cached_users(), [1, 2])
+
+        invalidate_holder_valuations(self.conn, [{"symbol": "MSFT", "price": 21.0}])
+        self.assertEqual(self.cached_users(), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from internal.server.model.sqlite_connection import ConnectionPool
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(
+            os.path.join(self.tmp_dir.name, "pool.db"),
+            max_size=1,
+            timeout_second=5,
+            cache_size_kib=1024,
+            mmap_size_bytes=0,
+        )
+
+    def tearDown(self):
+        self.pool.close_all()
+        self.tmp_dir.cleanup()
+
+    def test_connections_are_reused(self):
+        first = self.pool.acquire()
+        self.pool.release(first)
+        second = self.pool.acquire()
+
+        self.assertIs(first, second)
+        self.assertEqual(self.pool.stats()["created"], 1)
+        self.assertEqual(self.pool.stats()["reused"], 1)
+        self.pool.release(second)
+
+    def test_pragmas_are_applied(self):
+        conn = self.pool.acquire()
+
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -1024)
+        self.pool.release(conn)
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        conn = self.pool.acquire()
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        self.pool.release(conn)
+
+        conn = self.pool.acquire()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        self.pool.release(conn)
+
+    def test_overflow_connections_are_closed(self):
+        first, second = self.pool.acquire(), self.pool.acquire()
+        self.assertEqual(self.pool.stats()["in_use"], 2)
+
+        self.pool.release(first)
+        self.pool.release(second)
+
+        stats = self.pool.stats()
+        self.assertEqual(
+            (stats["idle"], stats["in_use"], stats["discarded"]), (1, 0, 1)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
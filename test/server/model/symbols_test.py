@@ -0,0 +1,72 @@
+import sqlite3
+import unittest
+
+from internal.server.model.migrations import migrate
+from internal.server.model.symbols import (
+    is_listed,
+    parse_listing_csv,
+    store_symbols,
+)
+
+LISTING_CSV = [
+    "symbol,name,exchange,assetType,ipoDate,delistingDate,status",
+    "A,Agilent Technologies Inc,NYSE,Stock,1999-11-18,null,Active",
+    "aapl,Apple Inc,NASDAQ,Stock,1980-12-12,null,Active",
+    "",
+    "SPY,SPDR S&P 500 ETF Trust,NYSE ARCA,ETF,1993-01-22,null,Active",
+]
+
+
+class TestSymbols(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        migrate(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_parse_listing(self):
+        rows = list(parse_listing_csv(LISTING_CSV))
+
+        self.assertEqual(
+            rows[1], ("AAPL", "Apple Inc", "NASDAQ", "Stock", "1980-12-12", "Active")
+        )
+        self.assertEqual([row[0] for row in rows], ["A", "AAPL", "SPY"])
+        with self.assertRaises(ValueError):
+            list(parse_listing_csv(["symbol,name", "A,Agilent"]))
+
+    def test_every_symbol_is_listed_until_the_universe_is_loaded(self):
+        self.assertTrue(is_listed(self.conn, "ANYTHING"))
+
+        store_symbols(
+            self.conn, parse_listing_csv(LISTING_CSV), "2024-01-01 00:00:00", 2
+        )
+
+        self.assertTrue(is_listed(self.conn, "aapl"))
+        self.assertFalse(is_listed(self.conn, "ANYTHING"))
+
+    def test_reload_prunes_symbols_missing_from_the_listing(self):
+        store_symbols(
+            self.conn, parse_listing_csv(LISTING_CSV), "2024-01-01 00:00:00", 2
+        )
+        stored = store_symbols(
+            self.conn,
+            parse_listing_csv(LISTING_CSV[:2] + LISTING_CSV[4:]),
+            "2024-01-02 00:00:00",
+            2,
+        )
+
+        self.assertEqual(stored, 2)
+        self.assertFalse(is_listed(self.conn, "AAPL"))
+        row = self.conn.execute("SELECT * FROM symbols WHERE symbol = 'SPY'").fetchone()
+        self.assertEqual((row["exchange"], row["asset_type"]), ("NYSE ARCA", "ETF"))
+
+        # An empty download keeps the previous universe
+        store_symbols(self.conn, iter(()), "2024-01-03 00:00:00", 2)
+        self.assertTrue(is_listed(self.conn, "SPY"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from flask import Flask
+from werkzeug.security import generate_password_hash
+from werkzeug.test import Client
+
+from internal.core.trade import OrderQueue, order_queue
+from internal.server.api import API_handlers
+from internal.server.api.quote_cache import quote_cache
+from internal.server.model import sqlite_connection
+from internal.server.model.migrations import migrate
+from internal.server.model.symbols import store_symbols
+from internal.server.routes.auth.auth_routes import auth_bp
+from internal.server.routes.portfolio import portforlio_routes
+from internal.server.routes.portfolio.portforlio_routes import portfolio_bp
+from internal.server.utils.utils import usd
+
+TEMPLATES = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../../frontend/templates")
+)
+
+
+class TestTradeRoutes(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        conn = sqlite3.connect(self.db_path)
+        migrate(conn)
+        stale = (
+            datetime.now() - timedelta(seconds=API_handlers.API_TIME_TO_UPDATE + 60)
+        ).strftime(API_handlers.STOCK_TIME_FORMAT)
+        conn.execute(
+            "INSERT INTO users (username, hash, cash) VALUES (?, ?, ?)",
+            ("trader", generate_password_hash("secret"), 10000),
+        )
+        conn.execute(
+            "INSERT INTO user_stocks (user_id, stock_symbol, shares_amount) "
+            "VALUES (1, 'MSFT', 5)"
+        )
+        conn.execute("INSERT INTO stock_status VALUES ('MSFT', 20.0, ?)", (stale,))
+        conn.commit()
+        conn.close()
+
+        self.db_patch = mock.patch.object(sqlite_connection, "DB_PATH", self.db_path)
+        self.db_patch.start()
+        # The shared budget is exhausted: no upstream call is granted
+        self.budget_patch = mock.patch.object(
+            API_handlers.rate_budget, "acquire", return_value=0
+        )
+        self.budget_patch.start()
+        quote_cache.clear()
+
+        app = Flask(__name__, template_folder=TEMPLATES)
+        app.config["SECRET_KEY"] = "test"
+        app.jinja_env.filters["usd"] = usd
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(portfolio_bp)
+        app.teardown_appcontext(sqlite_connection.close_db)
+        self.app = app
+        self.client = Client(app)
+        self.client.post("/login", data={"username": "trader", "password": "secret"})
+
+    def tearDown(self):
+        self.budget_patch.stop()
+        self.db_patch.stop()
+        quote_cache.clear()
+        os.remove(self.db_path)
+
+    def history_count(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM history_logs").fetchone()[0]
+        finally:
+            conn.close()
+
+    def refresh_price(self):
+        conn = sqlite3.connect(self.db_path)
+        fresh = datetime.now().strftime(API_handlers.STOCK_TIME_FORMAT)
+        conn.execute("UPDATE stock_status SET time = ?", (fresh,))
+        conn.commit()
+        conn.close()
+
+    def test_failed_queued_order_renders_an_apology(self):
+        self.refresh_price()
+        orders = OrderQueue(
+            sqlite_connection.connect,
+            max_batch_size=8,
+            max_latency_second=0.01,
+            max_pending=8,
+        )
+        self.app.extensions["order_queue"] = orders
+        orders.start()
+        try:
+            with mock.patch.object(
+                order_queue, "apply_trade", side_effect=RuntimeError("boom")
+            ), mock.patch.object(portforlio_routes.logger, "error") as error:
+                response = self.client.post(
+                    "/buy", data={"symbol": "msft", "shares": 1}
+                )
+        finally:
+            orders.stop(5)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(b"Transaction-failed", response.data)
+        self.assertEqual(
+            error.call_args.args[0], portforlio_routes.LOG_BUY_TRANSACTION_FAIL
+        )
+        self.assertEqual(self.history_count(), 0)
+
+    def list_only_apple(self):
+        conn = sqlite3.connect(self.db_path)
+        store_symbols(
+            conn, [("AAPL", "Apple Inc", "NASDAQ", "Stock", None, "Active")], 0, 100
+        )
+        conn.close()
+
+    def test_held_symbol_can_be_sold_once_delisted(self):
+        self.refresh_price()
+        self.list_only_apple()
+
+        response = self.client.post("/sell", data={"symbol": "msft", "shares": 1})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.history_count(), 1)
+
+    def test_unlisted_symbol_that_is_not_held_cannot_be_sold(self):
+        self.list_only_apple()
+
+        response = self.client.post("/sell", data={"symbol": "nvda", "shares": 1})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.history_count(), 0)
+
+    def test_rate_limited_buy_is_refused(self):
+        response = self.client.post("/buy", data={"symbol": "msft", "shares": 1})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.history_count(), 0)
+
+    def test_rate_limited_sell_is_refused(self):
+        response = self.client.post("/sell", data={"symbol": "msft", "shares": 1})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.history_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask, session
+from werkzeug.test import Client
+
+from internal.server.model import sqlite_connection
+from internal.server.model.migrations import migrate
+from internal.server.model.sessions import load_session
+from internal.server.session.sqlite_session import (
+    SessionSweeper,
+    SqliteSessionInterface,
+)
+
+LIFETIME_SECOND = 3600
+
+
+class TestSqliteSession(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        conn = sqlite3.connect(self.db_path)
+        migrate(conn)
+        conn.close()
+        self.db_patch = mock.patch.object(sqlite_connection, "DB_PATH", self.db_path)
+        self.db_patch.start()
+
+        self.interface = SqliteSessionInterface(
+            lifetime_second=LIFETIME_SECOND, cache_max_size=16, cache_ttl_second=30
+        )
+        app = Flask(__name__)
+        app.session_interface = self.interface
+        app.teardown_appcontext(sqlite_connection.close_db)
+
+        @app.route("/login/<int:user_id>")
+        def login(user_id):
+            session.clear()
+            session["user_id"] = user_id
+            return "ok"
+
+        @app.route("/me")
+        def me():
+            return str(session.get("user_id"))
+
+        @app.route("/static-page")
+        def static_page():
+            return "static"
+
+        @app.route("/login-in-transaction/<int:user_id>")
+        def login_in_transaction(user_id):
+            # Left open on purpose: saving the session must not commit it
+            sqlite_connection.get_db().execute("BEGIN")
+            return login(user_id)
+
+        @app.teardown_request
+        def record_transaction(exception):
+            self.left_in_transaction = sqlite_connection.get_db().in_transaction
+
+        @app.route("/logout")
+        def logout():
+            session.clear()
+            return "bye"
+
+        self.client = Client(app)
+
+    def tearDown(self):
+        self.db_patch.stop()
+        os.remove(self.db_path)
+
+    def rows(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT id, data, expires_at FROM sessions").fetchall()
+        finally:
+            conn.close()
+
+    def sid(self):
+        cookie = self.client.get_cookie("session")
+        return cookie.value if cookie else None
+
+    def test_session_is_stored_server_side(self):
+        self.client.get("/login/7")
+
+        rows = self.rows()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][0], self.sid())
+        self.assertNotIn("user_id", self.sid())
+        self.assertEqual(self.client.get("/me").get_data(as_text=True), "7")
+
+    def test_session_write_leaves_the_request_transaction_open(self):
+        self.client.get("/login-in-transaction/7")
+
+        self.assertTrue(self.left_in_transaction)
+        self.assertEqual(len(self.rows()), 1)
+
+    def test_no_session_no_write(self):
+        response = self.client.get("/static-page")
+
+        self.assertNotIn("Set-Cookie", response.headers)
+        self.assertEqual(self.rows(), [])
+
+    def test_unchanged_session_is_not_written(self):
+        self.client.get("/login/7")
+        self.interface.cache.clear()
+
+        with mock.patch(
+            "internal.server.session.sqlite_session.save_session"
+        ) as save, mock.patch(
+            "internal.server.session.sqlite_session.touch_session"
+        ) as touch:
+            response = self.client.get("/me")
+
+        self.assertEqual(response.get_data(as_text=True), "7")
+        self.assertNotIn("Set-Cookie", response.headers)
+        save.assert_not_called()
+        touch.assert_not_called()
+
+    def test_reads_are_served_from_cache(self):
+        self.client.get("/login/7")
+
+        with mock.patch("internal.server.session.sqlite_session.load_session") as load:
+            self.assertEqual(self.client.get("/me").get_data(as_text=True), "7")
+        load.assert_not_called()
+
+    def test_login_regenerates_the_id(self):
+        self.client.get("/login/7")
+        first = self.sid()
+
+        self.client.get("/login/8")
+
+        self.assertNotEqual(self.sid(), first)
+        self.assertEqual([row[0] for row in self.rows()], [self.sid()])
+
+    def test_logout_deletes_the_session(self):
+        self.client.get("/login/7")
+
+        self.client.get("/logout")
+
+        self.assertEqual(self.rows(), [])
+        self.assertIsNone(self.sid())
+        self.assertEqual(self.client.get("/me").get_data(as_text=True), "None")
+
+    def test_expiry_is_pushed_back_after_half_the_lifetime(self):
+        self.client.get("/login/7")
+        expires_at = self.rows()[0][2]
+
+        later = time.time() + LIFETIME_SECOND * 0.75
+        with mock.patch("time.time", return_value=later):
+            self.client.get("/me")
+
+        self.assertAlmostEqual(self.rows()[0][2], later + LIFETIME_SECOND, places=3)
+        self.assertGreater(self.rows()[0][2], expires_at)
+
+    def test_sweeper_deletes_expired_sessions(self):
+        self.client.get("/login/7")
+        sid = self.sid()
+        self.interface.cache.clear()
+
+        sweeper = SessionSweeper(interval_second=60, batch_size=1)
+        self.assertEqual(sweeper.sweep_once(), 0)
+        self.assertEqual(sweeper.sweep_once(time.time() + LIFETIME_SECOND + 1), 1)
+
+        self.assertEqual(self.rows(), [])
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.assertIsNone(load_session(conn, sid, time.time()))
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import time
+import unittest
+from internal.server.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = TTLCache(max_size=2, ttl_second=60)
+
+    def test_hit_and_miss_counters(self):
+        self.assertIsNone(self.cache.get("AAPL"))
+        self.cache.put("AAPL", {"symbol": "AAPL", "price": 10.0})
+        self.assertEqual(self.cache.get("AAPL")["price"], 10.0)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertAlmostEqual(stats["hit_ratio"], 0.5)
+
+    def test_expired_entry_is_a_miss(self):
+        self.cache.put("AAPL", {"symbol": "AAPL", "price": 10.0}, time.time() + 0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get("AAPL"))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put("AAPL", {"symbol": "AAPL", "price": 1.0})
+        self.cache.put("MSFT", {"symbol": "MSFT", "price": 2.0})
+        self.cache.get("AAPL")
+        self.cache.put("NVDA", {"symbol": "NVDA", "price": 3.0})
+
+        self.assertIsNone(self.cache.get("MSFT"))
+        self.assertIsNotNone(self.cache.get("AAPL"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_returned_value_is_a_copy(self):
+        self.cache.put("AAPL", {"symbol": "AAPL", "price": 1.0})
+        self.cache.get("AAPL")["price"] = 99.0
+        self.assertEqual(self.cache.get("AAPL")["price"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()